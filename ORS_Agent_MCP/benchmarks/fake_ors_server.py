@@ -0,0 +1,315 @@
+"""
+Local stand-in for the OpenRouteService API, used by the offline benchmarks.
+
+Serves the endpoints the MCP server calls (directions, geocode, isochrones, pois,
+matrix, optimization) with realistic response shapes, configurable latency,
+error rates and payload sizes. No API key or network access is needed.
+
+Usage:
+    python benchmarks/fake_ors_server.py --port 8765 --latency-ms 80 --jitter-ms 20 --error-rate 0.01
+    python benchmarks/fake_ors_server.py --latency optimization=800 --latency matrix=150
+"""
+import sys
+import json
+import math
+import time
+import random
+import argparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict, Any, Optional
+
+ENDPOINTS = ("directions", "geocode", "isochrones", "pois", "matrix", "optimization")
+
+
+def encode_polyline(coordinates: List[List[float]], precision: int = 5) -> str:
+    """Google encoded polyline of (lon, lat) pairs, as returned by ORS json directions."""
+    factor = 10 ** precision
+    output = []
+    prev_lat = prev_lon = 0
+    for lon, lat in coordinates:
+        lat_i, lon_i = int(round(lat * factor)), int(round(lon * factor))
+        for delta in (lat_i - prev_lat, lon_i - prev_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                output.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            output.append(chr(value + 63))
+        prev_lat, prev_lon = lat_i, lon_i
+    return "".join(output)
+
+
+def _distance_m(a: List[float], b: List[float]) -> float:
+    dx = (b[0] - a[0]) * 111320 * math.cos(math.radians((a[1] + b[1]) / 2))
+    dy = (b[1] - a[1]) * 110540
+    return math.hypot(dx, dy) * 1.3
+
+
+def _interpolate(coordinates: List[List[float]], points: int) -> List[List[float]]:
+    """Densifies a waypoint list to roughly ``points`` vertices with small noise."""
+    legs = max(1, len(coordinates) - 1)
+    per_leg = max(2, points // legs)
+    line = []
+    for a, b in zip(coordinates, coordinates[1:]):
+        for k in range(per_leg):
+            t = k / per_leg
+            line.append([
+                round(a[0] + (b[0] - a[0]) * t + random.uniform(-1e-4, 1e-4), 6),
+                round(a[1] + (b[1] - a[1]) * t + random.uniform(-1e-4, 1e-4), 6),
+            ])
+    line.append(list(coordinates[-1]))
+    return line
+
+
+class FakeORS:
+    """Response factories for every emulated endpoint."""
+
+    def __init__(self, route_points: int, poi_count: int, geocode_results: int, polygon_points: int):
+        self.route_points = route_points
+        self.poi_count = poi_count
+        self.geocode_results = geocode_results
+        self.polygon_points = polygon_points
+
+    def directions(self, profile: str, fmt: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        coordinates = body["coordinates"]
+        legs = list(zip(coordinates, coordinates[1:]))
+        segments = [
+            {"distance": round(_distance_m(a, b), 1), "duration": round(_distance_m(a, b) / 11.1, 1), "steps": []}
+            for a, b in legs
+        ]
+        line = _interpolate(coordinates, self.route_points)
+        offset = 0
+        per_leg = max(1, (len(line) - 1) // max(1, len(legs)))
+        for segment in segments:
+            segment["steps"] = [{
+                "distance": segment["distance"], "duration": segment["duration"], "type": 11,
+                "instruction": "Head on", "name": "-", "way_points": [offset, offset + per_leg],
+            }]
+            offset += per_leg
+        way_points = [min(i * per_leg, len(line) - 1) for i in range(len(coordinates))]
+        route = {
+            "summary": {"distance": round(sum(s["distance"] for s in segments), 1), "duration": round(sum(s["duration"] for s in segments), 1)},
+            "segments": segments,
+            "bbox": [min(p[0] for p in line), min(p[1] for p in line), max(p[0] for p in line), max(p[1] for p in line)],
+            "way_points": way_points,
+        }
+        if fmt == "geojson":
+            route["geometry"] = {"type": "LineString", "coordinates": line}
+            return {"type": "FeatureCollection", "features": [{"type": "Feature", "properties": route, "geometry": route.pop("geometry")}],
+                    "metadata": {"query": body}}
+        route["geometry"] = encode_polyline(line)
+        return {"routes": [route], "metadata": {"query": {**body, "profile": profile}, "engine": {"version": "fake"}}}
+
+    def geocode(self, text: str) -> Dict[str, Any]:
+        features = []
+        for i in range(self.geocode_results):
+            lon, lat = 8.68 + random.uniform(-0.1, 0.1), 49.41 + random.uniform(-0.1, 0.1)
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [round(lon, 6), round(lat, 6)]},
+                "properties": {"id": f"fake:{i}", "label": f"{text} #{i}", "confidence": 1 - i * 0.1, "layer": "address"},
+            })
+        return {"geocoding": {"query": {"text": text}}, "type": "FeatureCollection", "features": features}
+
+    def isochrones(self, profile: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        values = body.get("range", [300])
+        if body.get("interval"):
+            # Like ORS: one polygon every `interval` up to the single range value
+            step = body["interval"]
+            values = [min(step * (k + 1), values[0]) for k in range(math.ceil(values[0] / step - 1e-9))]
+        features = []
+        for group_index, (lon, lat) in enumerate(body["locations"]):
+            for value in values:
+                radius = value * 8 if body.get("range_type", "time") == "time" else value
+                ring = []
+                for k in range(self.polygon_points):
+                    angle = 2 * math.pi * k / self.polygon_points
+                    r = radius * random.uniform(0.7, 1.0)
+                    ring.append([
+                        round(lon + r * math.cos(angle) / (111320 * math.cos(math.radians(lat))), 6),
+                        round(lat + r * math.sin(angle) / 110540, 6),
+                    ])
+                ring.append(ring[0])
+                features.append({
+                    "type": "Feature",
+                    "properties": {"group_index": group_index, "value": value, "center": [lon, lat]},
+                    "geometry": {"type": "Polygon", "coordinates": [ring]},
+                })
+        return {"type": "FeatureCollection", "features": features,
+                "metadata": {"query": {**body, "profile": profile}, "timestamp": int(time.time() * 1000)}}
+
+    def pois(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        geojson = body["geometry"]["geojson"]
+        # Corridor queries: POIs scattered around random vertices of the line
+        centers = geojson["coordinates"] if geojson["type"] == "LineString" else [geojson["coordinates"]]
+        buffer = body["geometry"].get("buffer", 1000)
+        count = min(self.poi_count, body.get("limit", self.poi_count))
+        features = []
+        for i in range(count):
+            lon, lat = random.choice(centers)
+            r, angle = buffer * math.sqrt(random.random()), random.uniform(0, 2 * math.pi)
+            features.append({
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [
+                    round(lon + r * math.cos(angle) / (111320 * math.cos(math.radians(lat))), 7),
+                    round(lat + r * math.sin(angle) / 110540, 7),
+                ]},
+                "properties": {"osm_id": random.randint(1, 10 ** 10), "osm_type": 1, "distance": round(r, 2),
+                               "category_ids": {"570": {"category_name": "restaurant", "category_group": "sustenance"}},
+                               "osm_tags": {"name": f"POI {i}"}},
+            })
+        return {"type": "FeatureCollection", "features": features, "information": {"query": body}}
+
+    def matrix(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        locations = body["locations"]
+        sources = body.get("sources") or list(range(len(locations)))
+        destinations = body.get("destinations") or list(range(len(locations)))
+        distances = [[round(_distance_m(locations[i], locations[j]), 2) for j in destinations] for i in sources]
+        response: Dict[str, Any] = {"metadata": {"query": {"locations": len(locations)}}}
+        metrics = body.get("metrics", ["duration"])
+        if "duration" in metrics:
+            response["durations"] = [[round(d / 11.1, 2) for d in row] for row in distances]
+        if "distance" in metrics:
+            response["distances"] = distances
+        return response
+
+    def optimization(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        vehicles = body["vehicles"]
+        routes = []
+        tasks = [("job", job) for job in body.get("jobs", [])]
+        buckets = [tasks[i::len(vehicles)] for i in range(len(vehicles))]
+        for vehicle, bucket in zip(vehicles, buckets):
+            if not bucket:
+                continue
+            steps = []
+            arrival = 0
+            position = vehicle.get("start")
+            if position is not None:
+                steps.append({"type": "start", "location": position, "arrival": 0, "duration": 0, "service": 0})
+            for kind, job in bucket:
+                location = job.get("location", position or [0, 0])
+                arrival += int(_distance_m(position or location, location) / 11.1)
+                steps.append({"type": kind, "id": job["id"], "location": location, "arrival": arrival,
+                              "duration": arrival, "service": job.get("service", 0), "waiting_time": 0})
+                arrival += job.get("service", 0)
+                position = location
+            if vehicle.get("end") is not None:
+                arrival += int(_distance_m(position, vehicle["end"]) / 11.1)
+                steps.append({"type": "end", "location": vehicle["end"], "arrival": arrival, "duration": arrival, "service": 0})
+            routes.append({"vehicle": vehicle["id"], "cost": arrival, "service": 0, "duration": arrival,
+                           "waiting_time": 0, "priority": 0, "steps": steps})
+        return {
+            "code": 0,
+            "summary": {"cost": sum(r["cost"] for r in routes), "routes": len(routes), "unassigned": 0,
+                        "service": 0, "duration": sum(r["duration"] for r in routes), "waiting_time": 0,
+                        "priority": 0, "computing_times": {"loading": 1, "solving": 1, "routing": 0}},
+            "unassigned": [],
+            "routes": routes,
+        }
+
+
+def make_handler(fake: FakeORS, latency_ms: Dict[str, float], jitter_ms: float, error_rate: float, max_waypoints: int = 50):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _handle(self, endpoint: str, produce):
+            delay = latency_ms.get(endpoint, latency_ms["default"]) + random.uniform(-jitter_ms, jitter_ms)
+            time.sleep(max(0.0, delay) / 1000)
+            if random.random() < error_rate:
+                status = random.choice((429, 500, 503))
+                # Like the real API, quota errors tell the client when to come back
+                headers = {"Retry-After": "1"} if status == 429 else None
+                self._reply(status, {"error": {"code": status, "message": "injected failure"}}, headers)
+                return
+            self._reply(200, produce())
+
+        def do_GET(self):
+            from urllib.parse import urlparse, parse_qs
+            url = urlparse(self.path)
+            if url.path == "/geocode/search":
+                text = parse_qs(url.query).get("text", [""])[0]
+                self._handle("geocode", lambda: fake.geocode(text))
+            else:
+                self._reply(404, {"error": "unknown endpoint"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            parts = self.path.strip("/").split("/")
+            if parts[:2] == ["v2", "directions"] and len(body.get("coordinates", [])) > max_waypoints:
+                # Same answer as the public API for oversized itineraries
+                self._reply(400, {"error": {"code": 2004, "message": (
+                    "Request parameters exceed the server configuration limits. "
+                    f"The specified number of waypoints must not be greater than {max_waypoints}."
+                )}})
+            elif parts[:2] == ["v2", "directions"]:
+                self._handle("directions", lambda: fake.directions(parts[2], parts[3] if len(parts) > 3 else "json", body))
+            elif parts[:2] == ["v2", "isochrones"]:
+                self._handle("isochrones", lambda: fake.isochrones(parts[2], body))
+            elif parts[:2] == ["v2", "matrix"]:
+                self._handle("matrix", lambda: fake.matrix(body))
+            elif parts[0] == "pois":
+                self._handle("pois", lambda: fake.pois(body))
+            elif parts[0] == "optimization":
+                self._handle("optimization", lambda: fake.optimization(body))
+            else:
+                self._reply(404, {"error": "unknown endpoint"})
+
+    return Handler
+
+
+def parse_latencies(default_ms: float, overrides: List[str]) -> Dict[str, float]:
+    latency = {"default": default_ms}
+    for item in overrides or []:
+        name, _, value = item.partition("=")
+        if name not in ENDPOINTS:
+            raise SystemExit(f"Unknown endpoint '{name}', expected one of {ENDPOINTS}")
+        latency[name] = float(value)
+    return latency
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake OpenRouteService API for offline benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Default response latency")
+    parser.add_argument("--latency", action="append", metavar="ENDPOINT=MS", help="Per-endpoint latency override")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429/500/503")
+    parser.add_argument("--route-points", type=int, default=500, help="Vertices per directions geometry")
+    parser.add_argument("--max-waypoints", type=int, default=50, help="Waypoints accepted per directions request")
+    parser.add_argument("--poi-count", type=int, default=100)
+    parser.add_argument("--geocode-results", type=int, default=10)
+    parser.add_argument("--polygon-points", type=int, default=200, help="Vertices per isochrone polygon")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    fake = FakeORS(args.route_points, args.poi_count, args.geocode_results, args.polygon_points)
+    handler = make_handler(fake, parse_latencies(args.latency_ms, args.latency), args.jitter_ms, args.error_rate, args.max_waypoints)
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    server.daemon_threads = True
+    print(f"Fake ORS listening on http://{args.host}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
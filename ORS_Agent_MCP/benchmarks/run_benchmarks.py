@@ -0,0 +1,287 @@
+"""
+Offline benchmark suite for the OpenRouteService MCP server.
+
+Starts ``fake_ors_server.py`` as a subprocess, points the server at it through
+ORS_BASE_URL and drives every tool through an in-memory MCP client, so the
+numbers include argument validation and result serialization. For each tool and
+concurrency level it reports p50/p95/p99 latency, throughput, errors by type,
+mean response size and the process' peak RSS.
+
+Usage (from ORS_Agent_MCP/; server logs go to stderr):
+    python benchmarks/run_benchmarks.py 2>/dev/null
+    python benchmarks/run_benchmarks.py --tools get_directions,get_pois --concurrency 1,16 --requests 200
+    python benchmarks/run_benchmarks.py --latency-ms 150 --error-rate 0.05 --json results.json
+    python benchmarks/run_benchmarks.py --distinct 10      # repeat 10 inputs to exercise the caches
+
+Inputs are seeded per tool, concurrency level and request, so a level never
+reuses the inputs (and warm caches) of the level before it.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from typing import Dict, Any, List, Callable, Optional, Awaitable
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCHMARK_DIR)
+
+CENTER = (8.681495, 49.41461)
+
+
+def _point(rng: random.Random, spread: float = 0.05) -> List[float]:
+    return [round(CENTER[0] + rng.uniform(-spread, spread), 6), round(CENTER[1] + rng.uniform(-spread, spread), 6)]
+
+
+def _points(rng: random.Random, n: int, spread: float = 0.05) -> List[List[float]]:
+    return [_point(rng, spread) for _ in range(n)]
+
+
+def _vrp_problem(rng: random.Random, n_jobs: int, n_vehicles: int) -> Dict[str, Any]:
+    depot = _point(rng, 0.01)
+    return {
+        "jobs": [{"id": i + 1, "location": location, "service": 300, "delivery": [1]}
+                 for i, location in enumerate(_points(rng, n_jobs))],
+        "vehicles": [{"id": v + 1, "profile": "driving-car", "start": depot, "end": depot, "capacity": [n_jobs]}
+                     for v in range(n_vehicles)],
+    }
+
+
+# Tool name -> factory of call arguments from a seeded RNG and the use_cache flag
+SCENARIOS: Dict[str, Callable[[random.Random, bool], Dict[str, Any]]] = {
+    "get_directions": lambda rng, cache: {"locations": _points(rng, rng.randint(2, 5)), "use_cache": cache},
+    "geocode_address": lambda rng, cache: {"text": f"{rng.randint(1, 200)} Hauptstrasse, Heidelberg {rng.random():.6f}", "use_cache": cache},
+    "geocode_addresses": lambda rng, cache: {"texts": [f"{rng.randint(1, 200)} Bergstrasse {rng.random():.6f}" for _ in range(10)], "use_cache": cache},
+    "get_isochrones": lambda rng, cache: {"locations": [_point(rng)], "range": [300, 600, 900]},
+    "render_isochrone_map": lambda rng, cache: {"output_filename": f"benchmark_{rng.randint(0, 9)}.html"},
+    "get_pois": lambda rng, cache: {"coordinates": _point(rng), "buffer": 500, "limit": 100, "use_cache": cache},
+    "get_poi_names": lambda rng, cache: {"coordinates": _point(rng), "buffer": 500, "limit": 20},
+    "get_distance_matrix": lambda rng, cache: {"locations": _points(rng, 50)},
+    "estimate_distances": lambda rng, cache: {"origins": _points(rng, 300, 0.5), "destinations": _points(rng, 300, 0.5)},
+    "optimize_vehicle_routes": lambda rng, cache: _vrp_problem(rng, 30, 3),
+    "optimize_traveling_salesman": lambda rng, cache: {"locations": _points(rng, 40), "solver": "local", "matrix_source": "haversine"},
+    "get_pois_along_route": lambda rng, cache: {"locations": _points(rng, 3, 0.2), "buffer": 500, "use_cache": cache},
+    "find_reachable_candidates": lambda rng, cache: {"origins": _points(rng, 10), "candidates": _points(rng, 300, 0.3), "max_range": 600},
+    "find_poi_categories": lambda rng, cache: {"query": rng.choice(["hotel", "fuel", "restarant", "charging", "sustenance", "596"])},
+    "create_simple_delivery_problem": lambda rng, cache: {"delivery_locations": _points(rng, 20), "depot_location": _point(rng, 0.01), "service_times": [300]},
+    "reoptimize_routes": lambda rng, cache: {"added_jobs": [{"id": 1000, "location": _point(rng)}], "removed_job_ids": [1]},
+    "submit_optimization": lambda rng, cache: _vrp_problem(rng, 30, 3),
+    "get_optimization_status": lambda rng, cache: {},
+    "get_optimization_result": lambda rng, cache: {"wait_seconds": 30},
+    "cancel_optimization": lambda rng, cache: {},
+}
+
+
+async def call_json(client, tool: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    result = await client.call_tool(tool, arguments)
+    return json.loads(result[0].text)
+
+
+async def _isochrone_result(client, rng: random.Random) -> Dict[str, Any]:
+    isochrones = await call_json(client, "get_isochrones", {"locations": [_point(rng)], "range": [300, 600, 900]})
+    return {"result_id": isochrones["result_id"]}
+
+
+async def _solved_problem(client, rng: random.Random) -> Dict[str, Any]:
+    solution = await call_json(client, "optimize_vehicle_routes", _vrp_problem(rng, 30, 3))
+    return {"solution_id": solution["solution_id"]}
+
+
+async def _submitted_job(client, rng: random.Random) -> Dict[str, Any]:
+    job = await call_json(client, "submit_optimization", _vrp_problem(rng, 30, 3))
+    return {"job_id": job["job_id"]}
+
+
+# Tools that need server state (an isochrone result, a stored solution, a submitted job): an
+# untimed step run before each request, whose result is merged into the request arguments
+PREPARE: Dict[str, Callable[[Any, random.Random], Awaitable[Dict[str, Any]]]] = {
+    "render_isochrone_map": _isochrone_result,
+    "reoptimize_routes": _solved_problem,
+    "get_optimization_status": _submitted_job,
+    "get_optimization_result": _submitted_job,
+    "cancel_optimization": _submitted_job,
+}
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_server(port: int, fake_args: List[str]) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(BENCHMARK_DIR, "fake_ors_server.py"), "--port", str(port), *fake_args],
+        stdout=subprocess.PIPE, text=True,
+    )
+    # The server prints one line once it is listening
+    line = process.stdout.readline()
+    if not line:
+        raise RuntimeError("Fake ORS server failed to start")
+    return process
+
+
+def summarize(tool: str, concurrency: int, latencies: List[float], sizes: List[int], errors: Dict[str, int], wall: float) -> Dict[str, Any]:
+    ok = np.array(latencies) * 1000 if latencies else np.array([np.nan])
+    total = len(latencies) + sum(errors.values())
+    return {
+        "tool": tool,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": dict(errors),
+        "error_rate": round(sum(errors.values()) / total, 4) if total else 0.0,
+        "p50_ms": round(float(np.percentile(ok, 50)), 2),
+        "p95_ms": round(float(np.percentile(ok, 95)), 2),
+        "p99_ms": round(float(np.percentile(ok, 99)), 2),
+        "mean_ms": round(float(np.mean(ok)), 2),
+        "throughput_rps": round(total / wall, 2) if wall > 0 else None,
+        "mean_response_bytes": int(np.mean(sizes)) if sizes else 0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def run_scenario(client, tool: str, make_args, requests: int, concurrency: int, distinct: int, seed: int, use_cache: bool,
+                       prepare=None) -> Dict[str, Any]:
+    latencies: List[float] = []
+    sizes: List[int] = []
+    errors: Dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        # With --distinct, inputs repeat so cache hit rates can be measured
+        key = i % distinct if distinct else i
+        rng = random.Random(f"{seed}:{tool}:{concurrency}:{key}")
+        async with semaphore:
+            arguments = make_args(rng, use_cache)
+            if prepare is not None:
+                try:
+                    arguments.update(await prepare(client, rng))
+                except Exception as e:
+                    errors[f"prepare:{type(e).__name__}"] = errors.get(f"prepare:{type(e).__name__}", 0) + 1
+                    return
+            started = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, arguments)
+            except Exception as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                return
+            latencies.append(time.perf_counter() - started)
+        sizes.append(sum(len(getattr(part, "text", "") or "") for part in result))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return summarize(tool, concurrency, latencies, sizes, errors, time.perf_counter() - started)
+
+
+def print_table(results: List[Dict[str, Any]]):
+    header = f"{'tool':<32} {'conc':>4} {'reqs':>5} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'resp KB':>8} {'RSS MB':>7}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['tool']:<32} {r['concurrency']:>4} {r['requests']:>5} {r['error_rate'] * 100:>6.1f} "
+            f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['throughput_rps'] or 0:>8.1f} "
+            f"{r['mean_response_bytes'] / 1024:>8.1f} {r['peak_rss_mb'] or 0:>7.1f}"
+        )
+        if r["errors"]:
+            print(f"{'':<32} errors: {r['errors']}")
+
+
+async def run(args) -> List[Dict[str, Any]]:
+    from fastmcp import Client
+    import ors_mcp_server
+
+    tools = args.tools.split(",") if args.tools else list(SCENARIOS)
+    unknown = [tool for tool in tools if tool not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown tools {unknown}, expected any of {list(SCENARIOS)}")
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    results = []
+    try:
+        async with Client(ors_mcp_server.mcp) as client:
+            for tool in tools:
+                for concurrency in levels:
+                    results.append(await run_scenario(
+                        client, tool, SCENARIOS[tool], args.requests, concurrency,
+                        args.distinct, args.seed, not args.no_cache, PREPARE.get(tool),
+                    ))
+    finally:
+        await ors_mcp_server.ors_client.aclose()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the ORS MCP server")
+    parser.add_argument("--tools", default=None, help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per tool and concurrency level")
+    parser.add_argument("--distinct", type=int, default=0, help="Number of distinct inputs to cycle through (0 = all distinct)")
+    parser.add_argument("--no-cache", action="store_true", help="Pass use_cache=False to tools that support it")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", default=None, help="Also write results to this JSON file")
+    parser.add_argument("--port", type=int, default=0, help="Fake server port (0 = pick a free one)")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency", action="append", default=[], metavar="ENDPOINT=MS")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--route-points", type=int, default=500)
+    parser.add_argument("--poi-count", type=int, default=100)
+    parser.add_argument("--polygon-points", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    port = args.port or free_port()
+    fake_args = [
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate), "--route-points", str(args.route_points),
+        "--poi-count", str(args.poi_count), "--polygon-points", str(args.polygon_points),
+        "--seed", str(args.seed),
+    ]
+    for override in args.latency:
+        fake_args += ["--latency", override]
+
+    workdir = tempfile.mkdtemp(prefix="ors_bench_")
+    os.environ["ORS_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ.setdefault("OPENROUTE_SERVICE_API", "benchmark-key")
+    os.environ["ORS_GEOCODE_CACHE_PATH"] = os.path.join(workdir, "geocode_cache.sqlite3")
+    sys.path.insert(0, PROJECT_DIR)
+    json_path = os.path.abspath(args.json) if args.json else None
+    # Logs and generated maps are written relative to the working directory
+    os.chdir(workdir)
+
+    fake = start_fake_server(port, fake_args)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        fake.terminate()
+        fake.wait()
+
+    print_table(results)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+        print(f"\nWrote {json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,746 @@
+import os
+import re
+import json
+import math
+import hashlib
+import time
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List, Tuple, Optional, Dict, Any, Callable, Hashable, Sequence
+
+import numpy as np
+
+from ors_geo import haversine_m, circle_bbox, disk_covered
+
+
+class TTLCache:
+    """
+    Bounded in-process cache with per-entry TTL and LRU eviction.
+
+    Entries expire ``ttl`` seconds after they were stored. When ``maxsize`` is
+    reached the least recently used entry is evicted. Hit/miss/eviction counters
+    are kept so cache effectiveness can be reported.
+
+    Cached values are returned as-is (no copy), so callers must treat them as read-only.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            maxsize: Maximum number of entries kept in memory.
+            ttl: Time-to-live of an entry in seconds.
+            clock: Monotonic time source, overridable for testing.
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive integer")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached value for ``key`` or ``default`` if absent or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Stores ``value`` under ``key``, evicting the least recently used entry if full."""
+        with self._lock:
+            expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns size, capacity and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+def quantize_coordinates(coordinates: Sequence[Sequence[float]], precision: int = 5) -> Tuple[Tuple[float, float], ...]:
+    """
+    Rounds (longitude, latitude) pairs to ``precision`` decimals.
+
+    5 decimals is roughly 1 m at the equator, which is well below the snapping
+    tolerance of the routing graph, so quantized keys do not change the route.
+    """
+    return tuple((round(float(lon), precision), round(float(lat), precision)) for lon, lat in coordinates)
+
+
+def directions_cache_key(
+    locations: Sequence[Sequence[float]],
+    profile: str,
+    preference: str,
+    optimize_waypoints: bool,
+    precision: int = 5,
+) -> Tuple[Any, ...]:
+    """Builds the cache key of a ``get_directions`` request."""
+    return (profile, preference, bool(optimize_waypoints), quantize_coordinates(locations, precision))
+
+
+def _canonical_value(value: Any) -> Any:
+    # Numbers compare by value (1 == 1.0)
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return round(float(value), 6)
+    if isinstance(value, dict):
+        return {str(key): _canonical_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical_value(item) for item in value]
+    return str(value)
+
+
+def _canonical_id(value: Any) -> Any:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return value
+    return int(number) if number.is_integer() else value
+
+
+def _normalize_ids(item: Dict[str, Any]) -> Dict[str, Any]:
+    normalized = {**item}
+    if "id" in normalized:
+        normalized["id"] = _canonical_id(normalized["id"])
+    for step in ("pickup", "delivery"):
+        if isinstance(normalized.get(step), dict) and "id" in normalized[step]:
+            normalized[step] = {**normalized[step], "id": _canonical_id(normalized[step]["id"])}
+    return normalized
+
+
+def optimization_cache_key(
+    jobs: Sequence[Dict[str, Any]],
+    vehicles: Sequence[Dict[str, Any]],
+    shipments: Optional[Sequence[Dict[str, Any]]] = None,
+    matrices: Optional[Dict[str, Any]] = None,
+    **options: Any,
+) -> str:
+    """
+    SHA-256 of the canonical form of an optimization problem.
+
+    Ids are normalized (``"3"``, ``3.0`` and ``3`` are the same id), dict key order
+    and the order of jobs, vehicles and shipments do not matter, and numbers are
+    compared by value. Extra ``options`` that change the solution (e.g. the
+    decomposition method) are part of the key.
+    """
+    def unordered(items: Optional[Sequence[Dict[str, Any]]]) -> List[str]:
+        return sorted(json.dumps(_canonical_value(_normalize_ids(item)), sort_keys=True) for item in items or [])
+
+    problem = {
+        "jobs": unordered(jobs),
+        "vehicles": unordered(vehicles),
+        "shipments": unordered(shipments),
+        "matrices": _canonical_value(matrices or {}),
+        "options": _canonical_value(options),
+    }
+    encoded = json.dumps(problem, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def normalize_geocode_query(text: str) -> str:
+    """
+    Normalizes a free-text geocoding query so trivially different spellings share a key.
+
+    Applies Unicode NFKC folding, case folding, whitespace collapsing and
+    canonical comma spacing, e.g. ``"  Brandenburg Gate ,BERLIN "`` becomes
+    ``"brandenburg gate, berlin"``.
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = re.sub(r"\s*,\s*", ", ", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" ,;.")
+
+
+class SQLiteGeocodeCache:
+    """
+    Persistent geocoding cache stored in a SQLite database in WAL mode.
+
+    WAL lets any number of server worker processes read concurrently while one
+    writes, and ``busy_timeout`` makes writers wait instead of failing on lock
+    contention. Each thread gets its own connection, so the blocking calls can be
+    pushed to a thread pool with ``asyncio.to_thread``.
+
+    Entries older than ``ttl`` seconds are treated as missing. When the table
+    grows beyond ``max_entries`` the least recently used rows are deleted.
+
+    Hits do not write: their access times are collected in memory and flushed in
+    one transaction at most every ``touch_interval`` seconds (and before pruning),
+    so a read-heavy workload does not serialize on the WAL writer lock.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS geocode_cache (
+            query_key   TEXT PRIMARY KEY,
+            response    TEXT NOT NULL,
+            created_at  REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )
+    """
+
+    def __init__(self, path: str, ttl: float = 30 * 24 * 3600.0, max_entries: int = 50000, busy_timeout_ms: int = 5000,
+                 touch_interval: float = 30.0):
+        """
+        Args:
+            path: Location of the SQLite database file. Parent directories are created.
+            ttl: Time-to-live of an entry in seconds (default 30 days).
+            max_entries: Maximum number of rows before LRU eviction kicks in.
+            busy_timeout_ms: How long a connection waits for a competing writer.
+            touch_interval: Minimum seconds between flushes of buffered access times.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.busy_timeout_ms = busy_timeout_ms
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._last_flush = time.monotonic()
+        self._local = threading.local()
+        self._writes_since_prune = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(self._SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_geocode_accessed ON geocode_cache (accessed_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+        return conn
+
+    def get(self, query: str) -> Optional[Any]:
+        """Returns the cached response for ``query`` (normalized) or None."""
+        key = normalize_geocode_query(query)
+        now = time.time()
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT response, created_at FROM geocode_cache WHERE query_key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] + self.ttl <= now:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self._touched[key] = now
+            due = time.monotonic() - self._last_flush >= self.touch_interval
+        if due:
+            self.flush_access_times()
+        return json.loads(row[0])
+
+    def flush_access_times(self):
+        """Writes the buffered access times of cache hits in one transaction."""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+            self._last_flush = time.monotonic()
+        if not touched:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "UPDATE geocode_cache SET accessed_at = MAX(accessed_at, ?) WHERE query_key = ?",
+                [(accessed_at, key) for key, accessed_at in touched.items()],
+            )
+
+    def set(self, query: str, response: Any):
+        """Stores ``response`` for ``query`` and prunes expired or excess rows periodically."""
+        key = normalize_geocode_query(query)
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache (query_key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(response, separators=(",", ":")), now, now),
+            )
+        with self._lock:
+            self._touched.pop(key, None)
+            self._writes_since_prune += 1
+            due = self._writes_since_prune >= 100
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Deletes expired rows and evicts least recently used rows beyond ``max_entries``."""
+        with self._lock:
+            self._writes_since_prune = 0
+        self.flush_access_times()
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM geocode_cache WHERE created_at <= ?", (time.time() - self.ttl,))
+            conn.execute(
+                """
+                DELETE FROM geocode_cache WHERE query_key IN (
+                    SELECT query_key FROM geocode_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM geocode_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns on-disk size and this process's hit/miss counters."""
+        size = self._connection().execute("SELECT COUNT(*) FROM geocode_cache").fetchone()[0]
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "path": self.path,
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class TravelTimeStore:
+    """
+    Persistent store of pairwise travel durations and distances in SQLite (WAL).
+
+    Pairs are keyed by profile and the quantized source and destination
+    coordinates, so matrices of different problems that share locations reuse each
+    other's cells. Connections are per thread like ``SQLiteGeocodeCache``, so the
+    blocking calls can run in ``asyncio.to_thread``.
+
+    Only reachable pairs are stored; unreachable pairs are fetched again next time.
+    Pairs older than ``ttl`` seconds are treated as missing.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS travel_times (
+            profile     TEXT NOT NULL,
+            source      TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            duration    REAL NOT NULL,
+            distance    REAL NOT NULL,
+            created_at  REAL NOT NULL,
+            PRIMARY KEY (profile, source, destination)
+        ) WITHOUT ROWID
+    """
+
+    # Sources per lookup query, well below SQLite's bound-parameter limit
+    _QUERY_CHUNK = 400
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 7 * 24 * 3600.0,
+        max_entries: int = 2000000,
+        precision: int = 5,
+        busy_timeout_ms: int = 5000,
+    ):
+        """
+        Args:
+            path: Location of the SQLite database file. Parent directories are created.
+            ttl: Time-to-live of a pair in seconds (default 7 days).
+            max_entries: Maximum number of stored pairs before the oldest are deleted.
+            precision: Decimals the coordinates are rounded to for the key (5 is about 1 m).
+            busy_timeout_ms: How long a connection waits for a competing writer.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.precision = precision
+        self.busy_timeout_ms = busy_timeout_ms
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes_since_prune = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(self._SCHEMA)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_travel_times_created ON travel_times (created_at)")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+        return conn
+
+    def _keys(self, points: Sequence[Sequence[float]]) -> List[str]:
+        return [f"{lon:.{self.precision}f},{lat:.{self.precision}f}" for lon, lat in quantize_coordinates(points, self.precision)]
+
+    def lookup(
+        self,
+        profile: str,
+        sources: Sequence[Sequence[float]],
+        destinations: Optional[Sequence[Sequence[float]]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (durations, distances) arrays of shape (len(sources), len(destinations)).
+
+        Pairs that are not stored (or expired) are NaN. ``destinations`` defaults to
+        ``sources`` (a square matrix).
+        """
+        source_keys = self._keys(sources)
+        destination_keys = source_keys if destinations is None else self._keys(destinations)
+        durations = np.full((len(source_keys), len(destination_keys)), np.nan)
+        distances = np.full_like(durations, np.nan)
+        source_index: Dict[str, List[int]] = {}
+        for i, key in enumerate(source_keys):
+            source_index.setdefault(key, []).append(i)
+        destination_index: Dict[str, List[int]] = {}
+        for j, key in enumerate(destination_keys):
+            destination_index.setdefault(key, []).append(j)
+
+        conn = self._connection()
+        cutoff = time.time() - self.ttl
+        distinct_sources = list(source_index)
+        for start in range(0, len(distinct_sources), self._QUERY_CHUNK):
+            chunk = distinct_sources[start:start + self._QUERY_CHUNK]
+            rows = conn.execute(
+                f"SELECT source, destination, duration, distance FROM travel_times "
+                f"WHERE profile = ? AND created_at > ? AND source IN ({','.join('?' * len(chunk))})",
+                (profile, cutoff, *chunk),
+            )
+            for source, destination, duration, distance in rows:
+                columns = destination_index.get(destination)
+                if columns is None:
+                    continue
+                for i in source_index[source]:
+                    durations[i, columns] = duration
+                    distances[i, columns] = distance
+
+        found = int(np.count_nonzero(~np.isnan(durations)))
+        with self._lock:
+            self.hits += found
+            self.misses += durations.size - found
+        return durations, distances
+
+    def store(
+        self,
+        profile: str,
+        sources: Sequence[Sequence[float]],
+        destinations: Sequence[Sequence[float]],
+        durations: np.ndarray,
+        distances: np.ndarray,
+    ):
+        """Stores every reachable (non-NaN) pair of a sources x destinations matrix."""
+        source_keys = self._keys(sources)
+        destination_keys = self._keys(destinations)
+        now = time.time()
+        rows = [
+            (profile, source_keys[i], destination_keys[j], float(durations[i, j]), float(distances[i, j]), now)
+            for i, j in zip(*np.nonzero(~(np.isnan(durations) | np.isnan(distances))))
+        ]
+        if not rows:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO travel_times (profile, source, destination, duration, distance, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        with self._lock:
+            self._writes_since_prune += 1
+            due = self._writes_since_prune >= 20
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Deletes expired pairs and the oldest pairs beyond ``max_entries``."""
+        with self._lock:
+            self._writes_since_prune = 0
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM travel_times WHERE created_at <= ?", (time.time() - self.ttl,))
+            excess = conn.execute("SELECT COUNT(*) FROM travel_times").fetchone()[0] - self.max_entries
+            if excess > 0:
+                # Exactly ``excess`` rows: a whole batch shares one created_at, so a cutoff time would overshoot
+                conn.execute(
+                    """
+                    DELETE FROM travel_times WHERE (profile, source, destination) IN (
+                        SELECT profile, source, destination FROM travel_times ORDER BY created_at LIMIT ?
+                    )
+                    """,
+                    (excess,),
+                )
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM travel_times")
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the number of stored pairs and this process's pair hit/miss counters."""
+        size = self._connection().execute("SELECT COUNT(*) FROM travel_times").fetchone()[0]
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "path": self.path,
+            "size": size,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "precision": self.precision,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class _CachedPoiQuery:
+    """A complete POI response for one query circle."""
+
+    __slots__ = ("center", "radius_m", "filter_key", "features", "expires_at", "tiles")
+
+    def __init__(self, center, radius_m, filter_key, features, expires_at, tiles):
+        self.center = center
+        self.radius_m = radius_m
+        self.filter_key = filter_key
+        self.features = features
+        self.expires_at = expires_at
+        self.tiles = tiles
+
+    def covers(self, lon: float, lat: float, margin_m: float = 0.0) -> bool:
+        return haversine_m(self.center[0], self.center[1], lon, lat) + margin_m <= self.radius_m
+
+
+def poi_filter_key(filters: Optional[Dict[str, Any]]) -> str:
+    """Canonical string for a POI filters dict (key order and id order do not matter)."""
+    if not filters:
+        return ""
+    canonical = {
+        key: sorted(value) if isinstance(value, list) else value
+        for key, value in filters.items()
+    }
+    return json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+
+
+def _poi_identity(feature: Dict[str, Any]) -> Tuple[Any, Any]:
+    properties = feature.get("properties", {})
+    osm_id = properties.get("osm_id")
+    if osm_id is None:
+        return ("coords", tuple(feature.get("geometry", {}).get("coordinates", ())))
+    return (properties.get("osm_type"), osm_id)
+
+
+class PoiTileCache:
+    """
+    Spatial cache for ``/pois`` responses backed by a uniform lon/lat grid index.
+
+    Every stored query circle is registered in each grid tile its bounding box
+    touches, under its category filter. A new query is answered locally when it is
+    contained in one cached circle, or when the union of the overlapping cached
+    circles provably covers it (``disk_covered``, an exact test rather than
+    sampled points, so gaps between circles are never missed). The answer is the
+    cached features filtered by point-in-radius and deduplicated by OSM id.
+
+    Only responses that were not truncated by ``limit`` are stored, since a
+    truncated response cannot prove that no other POI exists in the circle.
+    """
+
+    def __init__(
+        self,
+        tile_deg: float = 0.02,
+        ttl: float = 1800.0,
+        max_entries: int = 256,
+        max_union_circles: int = 32,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            tile_deg: Edge length of a grid tile in degrees (0.02 is about 2 km).
+            ttl: Time-to-live of a cached query circle in seconds.
+            max_entries: Maximum number of cached query circles (LRU eviction).
+            max_union_circles: Most overlapping circles (nearest first) combined to cover one query.
+            clock: Monotonic time source, overridable for testing.
+        """
+        self.tile_deg = tile_deg
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_union_circles = max_union_circles
+        self._clock = clock
+        self._entries: "OrderedDict[int, _CachedPoiQuery]" = OrderedDict()
+        self._grid: Dict[Tuple[str, int, int], set] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _tiles_for_bbox(self, bbox: Tuple[float, float, float, float]) -> List[Tuple[int, int]]:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        x0, x1 = math.floor(min_lon / self.tile_deg), math.floor(max_lon / self.tile_deg)
+        y0, y1 = math.floor(min_lat / self.tile_deg), math.floor(max_lat / self.tile_deg)
+        return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+    def _remove(self, entry_id: int):
+        entry = self._entries.pop(entry_id)
+        for tile in entry.tiles:
+            bucket = self._grid.get((entry.filter_key, *tile))
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._grid[(entry.filter_key, *tile)]
+
+    def _candidates(self, filter_key: str, bbox: Tuple[float, float, float, float]) -> List[_CachedPoiQuery]:
+        now = self._clock()
+        ids = set()
+        for tile in self._tiles_for_bbox(bbox):
+            ids.update(self._grid.get((filter_key, *tile), ()))
+        candidates = []
+        for entry_id in ids:
+            entry = self._entries[entry_id]
+            if entry.expires_at <= now:
+                self._remove(entry_id)
+                continue
+            self._entries.move_to_end(entry_id)
+            candidates.append(entry)
+        return candidates
+
+    def lookup(self, center: Sequence[float], radius_m: float, limit: int, filters: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Answers a POI query from cached circles, or returns None if they do not cover it.
+
+        The returned FeatureCollection mirrors the ORS response shape; each feature's
+        ``distance`` property is recomputed relative to the new center.
+        """
+        lon, lat = float(center[0]), float(center[1])
+        filter_key = poi_filter_key(filters)
+        with self._lock:
+            candidates = self._candidates(filter_key, circle_bbox(lon, lat, radius_m))
+            containing = next((entry for entry in candidates if entry.covers(lon, lat, margin_m=radius_m)), None)
+            if containing is not None:
+                sources = [containing]
+            else:
+                gaps = [haversine_m(entry.center[0], entry.center[1], lon, lat) for entry in candidates]
+                overlapping = sorted(
+                    (index for index, entry in enumerate(candidates) if gaps[index] < entry.radius_m + radius_m),
+                    key=gaps.__getitem__
+                )
+                sources = [candidates[index] for index in overlapping[:self.max_union_circles]]
+                disks = [(entry.center[0], entry.center[1], entry.radius_m) for entry in sources]
+                if len(sources) < 2 or not disk_covered((lon, lat), radius_m, disks):
+                    self.misses += 1
+                    return None
+            self.hits += 1
+
+        # Overlapping circles hold the same POIs; keep each OSM object once
+        seen = set()
+        features = []
+        for entry in sources:
+            for feature in entry.features:
+                identity = _poi_identity(feature)
+                if identity in seen:
+                    continue
+                point_lon, point_lat = feature["geometry"]["coordinates"][:2]
+                distance = haversine_m(lon, lat, point_lon, point_lat)
+                if distance > radius_m:
+                    continue
+                seen.add(identity)
+                features.append({**feature, "properties": {**feature.get("properties", {}), "distance": round(distance, 2)}})
+        if len(sources) > 1:
+            features.sort(key=lambda feature: feature["properties"]["distance"])
+        features = features[:limit]
+
+        return {
+            "type": "FeatureCollection",
+            "features": features,
+            "information": {
+                "source": "tile-cache",
+                "cached_queries_used": len(sources),
+                "query": {"center": [lon, lat], "buffer": radius_m, "limit": limit, "filters": filters}
+            }
+        }
+
+    def store(self, center: Sequence[float], radius_m: float, limit: int, filters: Optional[Dict[str, Any]], response: Dict[str, Any]):
+        """Indexes a fresh ORS response; truncated responses (len == limit) are ignored."""
+        features = response.get("features", []) if isinstance(response, dict) else []
+        if len(features) >= limit:
+            return
+        lon, lat = float(center[0]), float(center[1])
+        filter_key = poi_filter_key(filters)
+        tiles = self._tiles_for_bbox(circle_bbox(lon, lat, radius_m))
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = _CachedPoiQuery(
+                (lon, lat), float(radius_m), filter_key, features, self._clock() + self.ttl, tiles
+            )
+            for tile in tiles:
+                self._grid.setdefault((filter_key, *tile), set()).add(entry_id)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._grid.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "cached_queries": len(self._entries),
+            "indexed_tiles": len(self._grid),
+            "max_entries": self.max_entries,
+            "tile_deg": self.tile_deg,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
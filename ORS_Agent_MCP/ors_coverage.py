@@ -0,0 +1,172 @@
+import math
+from typing import List, Dict, Any, Sequence, Tuple
+
+import numpy as np
+
+from ors_geo import EARTH_RADIUS_M
+
+# Default raster resolution of coverage analysis: cells along the longer side of the covered area
+COVERAGE_GRID_SIZE = 512
+
+
+def polygon_rings(geometry: Dict[str, Any]) -> List[List[Sequence[Sequence[float]]]]:
+    """Polygons of a GeoJSON Polygon / MultiPolygon, each as [outer ring, *holes]."""
+    if geometry.get("type") == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry.get("type") == "MultiPolygon":
+        return list(geometry["coordinates"])
+    return []
+
+
+def ring_area_m2(ring: Sequence[Sequence[float]]) -> float:
+    """Unsigned shoelace area in square meters, in a local equirectangular frame around the ring."""
+    points = np.asarray(ring, dtype=float)[:, :2]
+    if len(points) < 3:
+        return 0.0
+    xy = np.radians(points) * EARTH_RADIUS_M
+    xy[:, 0] *= math.cos(math.radians(float(points[:, 1].mean())))
+    x, y = xy[:, 0], xy[:, 1]
+    return abs(float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))) / 2
+
+
+def geometry_area_m2(geometry: Dict[str, Any]) -> float:
+    """Area of a Polygon / MultiPolygon in square meters (outer rings minus holes)."""
+    return sum(
+        ring_area_m2(rings[0]) - sum(ring_area_m2(hole) for hole in rings[1:])
+        for rings in polygon_rings(geometry)
+        if rings
+    )
+
+
+def _edges(geometry: Dict[str, Any]) -> np.ndarray:
+    # (n, 4) array of x1, y1, x2, y2 over every ring; closing edges are added for open rings
+    edges = []
+    for rings in polygon_rings(geometry):
+        for ring in rings:
+            points = np.asarray(ring, dtype=float)[:, :2]
+            if len(points) < 3:
+                continue
+            if not np.array_equal(points[0], points[-1]):
+                points = np.vstack([points, points[:1]])
+            edges.append(np.hstack([points[:-1], points[1:]]))
+    return np.vstack(edges) if edges else np.empty((0, 4))
+
+
+def rasterize(geometry: Dict[str, Any], lon0: float, lat0: float, dlon: float, dlat: float, shape: Tuple[int, int]) -> np.ndarray:
+    """
+    Boolean mask of the grid cells whose centers lie inside ``geometry``.
+
+    The grid starts at (``lon0``, ``lat0``) with cells of ``dlon`` x ``dlat``
+    degrees. Even-odd scanlines over all rings at once, so holes are excluded.
+    Only the rows inside the geometry's bounding box are scanned, all of them in
+    one vectorized pass over (rows x edges).
+    """
+    rows, columns = shape
+    mask = np.zeros(shape, dtype=bool)
+    edges = _edges(geometry)
+    if len(edges) == 0:
+        return mask
+    x1, y1, x2, y2 = edges.T
+    row0 = max(0, int(math.floor((min(y1.min(), y2.min()) - lat0) / dlat - 0.5)))
+    row1 = min(rows, int(math.ceil((max(y1.max(), y2.max()) - lat0) / dlat + 0.5)))
+    if row0 >= row1:
+        return mask
+    y = lat0 + (np.arange(row0, row1) + 0.5) * dlat
+    yy = y[:, None]
+    crossing = (y1[None, :] <= yy) != (y2[None, :] <= yy)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = x1 + (yy - y1) * (x2 - x1) / (y2 - y1)
+    x = np.sort(np.where(crossing, x, np.inf), axis=1)
+    if x.shape[1] % 2:
+        x = np.hstack([x, np.full((len(x), 1), np.inf)])
+    # Crossings pair up per row: [x0, x1), [x2, x3), ...; unused slots are inf and sort last
+    starts, ends = x[:, 0::2], x[:, 1::2]
+    valid = np.isfinite(ends)
+    first = np.clip(np.ceil((starts - lon0) / dlon - 0.5), 0, columns).astype(np.int64)
+    last = np.clip(np.ceil((ends - lon0) / dlon - 0.5), 0, columns).astype(np.int64)
+    row_index = np.broadcast_to(np.arange(row1 - row0)[:, None], valid.shape)
+    diff = np.zeros((row1 - row0, columns + 1), dtype=np.int32)
+    np.add.at(diff, (row_index[valid], first[valid]), 1)
+    np.add.at(diff, (row_index[valid], last[valid]), -1)
+    mask[row0:row1] = np.cumsum(diff[:, :columns], axis=1) > 0
+    return mask
+
+
+def _grid(geometries: List[Dict[str, Any]], grid_size: int) -> Tuple[float, float, float, float, Tuple[int, int], float]:
+    # Square cells in meters over the joint bounding box
+    edges = np.vstack([_edges(geometry) for geometry in geometries])
+    xs, ys = edges[:, [0, 2]], edges[:, [1, 3]]
+    min_lon, max_lon, min_lat, max_lat = xs.min(), xs.max(), ys.min(), ys.max()
+    k = math.cos(math.radians((min_lat + max_lat) / 2))
+    meters_per_degree = math.radians(1) * EARTH_RADIUS_M
+    width_m = (max_lon - min_lon) * meters_per_degree * k
+    height_m = (max_lat - min_lat) * meters_per_degree
+    cell_m = max(width_m, height_m, 1.0) / grid_size
+    dlat = cell_m / meters_per_degree
+    dlon = cell_m / (meters_per_degree * max(k, 1e-12))
+    shape = (max(1, math.ceil((max_lat - min_lat) / dlat)), max(1, math.ceil((max_lon - min_lon) / dlon)))
+    return min_lon, min_lat, dlon, dlat, shape, cell_m
+
+
+def coverage_analysis(features: List[Dict[str, Any]], grid_size: int = COVERAGE_GRID_SIZE) -> List[Dict[str, Any]]:
+    """
+    Union / intersection / overlap areas of isochrone polygons, computed locally.
+
+    Features are grouped by their range ``value``; within a group each feature
+    belongs to the location of its ``group_index``. Individual areas are exact
+    (shoelace); the combined areas come from rasterizing every polygon onto one
+    shared grid of about ``grid_size`` cells along its longer side, so their
+    error is on the order of perimeter x cell size.
+
+    Returns:
+        One dict per range value (ascending) with the summed, union, intersection
+        (covered by every location) and overlap (covered by 2+ locations) areas in
+        km2, the largest number of overlapping locations, the area each location
+        covers alone, and the raster cell size in meters.
+    """
+    groups: Dict[float, List[Dict[str, Any]]] = {}
+    for feature in features:
+        groups.setdefault(feature.get("properties", {}).get("value"), []).append(feature)
+
+    analysis = []
+    for value in sorted(groups, key=lambda v: (v is None, v)):
+        group = [feature for feature in groups[value] if len(_edges(feature["geometry"]))]
+        if not group:
+            continue
+        locations = sorted({feature["properties"].get("group_index", i) for i, feature in enumerate(group)})
+        location_slot = {location: slot for slot, location in enumerate(locations)}
+        lon0, lat0, dlon, dlat, shape, cell_m = _grid([feature["geometry"] for feature in group], grid_size)
+
+        # Per-row cell area, cells shrink with latitude
+        row_lat = lat0 + (np.arange(shape[0]) + 0.5) * dlat
+        meters_per_degree = math.radians(1) * EARTH_RADIUS_M
+        row_area = (dlat * meters_per_degree) * (dlon * meters_per_degree * np.cos(np.radians(row_lat)))
+        cell_area = np.broadcast_to(row_area[:, None], shape)
+
+        count = np.zeros(shape, dtype=np.int32)
+        # With count == 1 the sum of covering slots is the slot of the only covering location
+        owner = np.zeros(shape, dtype=np.int64)
+        areas = np.zeros(len(locations))
+        for i, feature in enumerate(group):
+            slot = location_slot[feature["properties"].get("group_index", i)]
+            mask = rasterize(feature["geometry"], lon0, lat0, dlon, dlat, shape)
+            count += mask
+            owner += mask * slot
+            areas[slot] += geometry_area_m2(feature["geometry"])
+
+        covered = count > 0
+        alone = count == 1
+        unique = np.bincount(owner[alone], weights=cell_area[alone], minlength=len(locations))
+        analysis.append({
+            "value": value,
+            "locations": len(locations),
+            "area_sum_km2": round(float(areas.sum()) / 1e6, 4),
+            "union_area_km2": round(float(cell_area[covered].sum()) / 1e6, 4),
+            "intersection_area_km2": round(float(cell_area[count >= len(locations)].sum()) / 1e6, 4),
+            "overlap_area_km2": round(float(cell_area[count >= 2].sum()) / 1e6, 4),
+            "max_overlap": int(count.max()),
+            "location_areas_km2": {str(location): round(float(areas[slot]) / 1e6, 4) for location, slot in location_slot.items()},
+            "unique_areas_km2": {str(location): round(float(unique[slot]) / 1e6, 4) for location, slot in location_slot.items()},
+            "cell_size_m": round(float(cell_m), 1),
+        })
+    return analysis
@@ -0,0 +1,295 @@
+import math
+from typing import List, Tuple, Optional, Sequence
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371008.8
+
+
+def haversine_m(lon1: float, lat1: float, lon2: float, lat2: float) -> float:
+    """Great-circle distance in meters between two (longitude, latitude) points."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def offset_point(lon: float, lat: float, dx_m: float, dy_m: float) -> Tuple[float, float]:
+    """Moves a point by ``dx_m`` meters east and ``dy_m`` meters north (local flat-earth approximation)."""
+    dlat = math.degrees(dy_m / EARTH_RADIUS_M)
+    dlon = math.degrees(dx_m / (EARTH_RADIUS_M * max(math.cos(math.radians(lat)), 1e-12)))
+    return lon + dlon, lat + dlat
+
+
+def circle_bbox(lon: float, lat: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """Returns (min_lon, min_lat, max_lon, max_lat) of a circle of ``radius_m`` meters."""
+    min_lon, min_lat = offset_point(lon, lat, -radius_m, -radius_m)
+    max_lon, max_lat = offset_point(lon, lat, radius_m, radius_m)
+    return min_lon, min_lat, max_lon, max_lat
+
+
+def disk_covered(center: Sequence[float], radius_m: float, disks: Sequence[Tuple[float, float, float]], tolerance_m: float = 0.5) -> bool:
+    """
+    Whether the union of ``disks`` (lon, lat, radius in meters) covers the disk of
+    ``radius_m`` around ``center``.
+
+    The test is exact (up to ``tolerance_m``), not sampled: an uncovered part of
+    the query disk is bounded by circle arcs, so one of its corners (an
+    intersection of two circles) or, when it has none, any point of a whole
+    bounding circle lies inside the query disk but inside no other disk. Every
+    such candidate point is checked, in a local planar frame around ``center``.
+    """
+    if not disks:
+        return False
+    lon0, lat0 = float(center[0]), float(center[1])
+    lonlat = np.array([[lon0, lat0]] + [[lon, lat] for lon, lat, _ in disks], dtype=float)
+    xy = _local_xy(lonlat, lat0)
+    xy -= xy[0]
+    radii = np.array([radius_m] + [r for _, _, r in disks], dtype=float)
+
+    i, j = np.triu_indices(len(xy), k=1)
+    delta = xy[j] - xy[i]
+    d = np.hypot(delta[:, 0], delta[:, 1])
+    crossing = (d > 0) & (d < radii[i] + radii[j]) & (d > np.abs(radii[i] - radii[j]))
+    i, j, delta, d = i[crossing], j[crossing], delta[crossing], d[crossing]
+    a = (d ** 2 + radii[i] ** 2 - radii[j] ** 2) / (2 * d)
+    h = np.sqrt(np.maximum(radii[i] ** 2 - a ** 2, 0.0))
+    unit = delta / d[:, None]
+    base = xy[i] + a[:, None] * unit
+    normal = np.column_stack((-unit[:, 1], unit[:, 0])) * h[:, None]
+    # One point per circle stands in for circles that cross nothing
+    candidates = np.vstack((base + normal, base - normal, xy + np.column_stack((radii, np.zeros(len(radii))))))
+
+    candidates = candidates[np.hypot(candidates[:, 0], candidates[:, 1]) <= radius_m + tolerance_m]
+    to_disks = np.hypot(candidates[:, None, 0] - xy[None, 1:, 0], candidates[:, None, 1] - xy[None, 1:, 1])
+    return bool((to_disks < radii[None, 1:] - tolerance_m).any(axis=1).all())
+
+
+# Rough average network speeds (m/s) used to turn straight-line distances into travel-time estimates
+PROFILE_SPEEDS_MPS = {
+    "driving-car": 11.1,
+    "driving-hgv": 9.7,
+    "cycling-regular": 4.2,
+    "cycling-road": 5.5,
+    "cycling-mountain": 3.9,
+    "cycling-electric": 5.0,
+    "foot-walking": 1.4,
+    "foot-hiking": 1.2,
+    "wheelchair": 1.0,
+}
+
+# Typical ratio between road-network and straight-line distance
+DETOUR_FACTOR = 1.3
+
+# Upper bounds on network speed (m/s): a pair farther apart than speed x time cannot be reached in that time
+PROFILE_MAX_SPEEDS_MPS = {
+    "driving-car": 41.7,
+    "driving-hgv": 25.0,
+    "cycling-regular": 8.3,
+    "cycling-road": 11.1,
+    "cycling-mountain": 8.3,
+    "cycling-electric": 8.3,
+    "foot-walking": 2.0,
+    "foot-hiking": 2.0,
+    "wheelchair": 2.0,
+}
+
+
+def as_lonlat_array(points: Sequence[Sequence[float]]) -> np.ndarray:
+    """Converts (longitude, latitude) pairs to a float array of shape (n, 2)."""
+    array = np.asarray(points, dtype=float)
+    if array.size == 0:
+        return array.reshape(0, 2)
+    if array.ndim != 2 or array.shape[1] < 2:
+        raise ValueError("Expected a list of (longitude, latitude) pairs")
+    return array[:, :2]
+
+
+def haversine_matrix(points_a: Sequence[Sequence[float]], points_b: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    Great-circle distances in meters between every point of ``points_a`` (rows)
+    and ``points_b`` (columns), computed with NumPy broadcasting.
+    """
+    a = np.radians(as_lonlat_array(points_a))
+    b = np.radians(as_lonlat_array(points_b))
+    lat_a, lat_b = a[:, 1:2], b[:, 1][None, :]
+    dlat = lat_b - lat_a
+    dlon = b[:, 0][None, :] - a[:, 0:1]
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat_a) * np.cos(lat_b) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+def equirectangular_matrix(points_a: Sequence[Sequence[float]], points_b: Sequence[Sequence[float]]) -> np.ndarray:
+    """
+    Equirectangular approximation of the distance matrix in meters.
+
+    About twice as fast as haversine and accurate to well under 1% for
+    distances up to a few hundred kilometers, which is plenty for pre-filtering.
+    """
+    a = np.radians(as_lonlat_array(points_a))
+    b = np.radians(as_lonlat_array(points_b))
+    mean_lat = (a[:, 1:2] + b[:, 1][None, :]) / 2
+    x = (b[:, 0][None, :] - a[:, 0:1]) * np.cos(mean_lat)
+    y = b[:, 1][None, :] - a[:, 1:2]
+    return EARTH_RADIUS_M * np.hypot(x, y)
+
+
+DISTANCE_KERNELS = {
+    "haversine": haversine_matrix,
+    "equirectangular": equirectangular_matrix,
+}
+
+
+def distance_matrix(points_a: Sequence[Sequence[float]], points_b: Sequence[Sequence[float]], method: str = "haversine") -> np.ndarray:
+    """Straight-line distance matrix in meters using the ``method`` kernel."""
+    try:
+        kernel = DISTANCE_KERNELS[method]
+    except KeyError:
+        raise ValueError(f"Unknown distance method '{method}', expected one of {sorted(DISTANCE_KERNELS)}")
+    return kernel(points_a, points_b)
+
+
+def nearest_k(
+    queries: Sequence[Sequence[float]],
+    candidates: Sequence[Sequence[float]],
+    k: int,
+    method: str = "haversine",
+    chunk_rows: int = 1024,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the ``k`` nearest candidates of every query point.
+
+    Query rows are processed in chunks of ``chunk_rows`` so memory stays bounded
+    for large inputs; ``argpartition`` keeps each chunk O(rows x candidates).
+
+    Returns:
+        (indices, distances), both of shape (len(queries), min(k, len(candidates))),
+        sorted by increasing distance.
+    """
+    queries = as_lonlat_array(queries)
+    candidates = as_lonlat_array(candidates)
+    k = min(k, len(candidates))
+    indices = np.empty((len(queries), k), dtype=np.int64)
+    distances = np.empty((len(queries), k), dtype=float)
+    if k == 0:
+        return indices, distances
+    for row0 in range(0, len(queries), chunk_rows):
+        block = distance_matrix(queries[row0:row0 + chunk_rows], candidates, method)
+        if k < block.shape[1]:
+            part = np.argpartition(block, k - 1, axis=1)[:, :k]
+        else:
+            part = np.broadcast_to(np.arange(block.shape[1]), block.shape).copy()
+        part_distances = np.take_along_axis(block, part, axis=1)
+        order = np.argsort(part_distances, axis=1)
+        indices[row0:row0 + len(block)] = np.take_along_axis(part, order, axis=1)
+        distances[row0:row0 + len(block)] = np.take_along_axis(part_distances, order, axis=1)
+    return indices, distances
+
+
+def estimate_travel_matrices(
+    points_a: Sequence[Sequence[float]],
+    points_b: Optional[Sequence[Sequence[float]]] = None,
+    profile: str = "driving-car",
+    method: str = "haversine",
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Estimates (durations in s, distances in m) between points without calling ORS.
+
+    Straight-line distance is scaled by ``DETOUR_FACTOR`` and divided by the
+    average speed of the profile. ``points_b`` defaults to ``points_a``.
+    """
+    speed = PROFILE_SPEEDS_MPS.get(profile, PROFILE_SPEEDS_MPS["driving-car"])
+    distances = distance_matrix(points_a, points_a if points_b is None else points_b, method) * DETOUR_FACTOR
+    return distances / speed, distances
+
+
+def _local_xy(points: np.ndarray, lat0: np.ndarray) -> np.ndarray:
+    # Equirectangular meters; lat0 sets the longitude scale (per point or per edge)
+    xy = np.radians(points) * EARTH_RADIUS_M
+    xy[..., 0] *= np.cos(np.radians(lat0))
+    return xy
+
+
+def line_cumulative_m(line: Sequence[Sequence[float]]) -> np.ndarray:
+    """Distance in meters from the start of ``line`` to each of its vertices."""
+    points = as_lonlat_array(line)
+    if len(points) < 2:
+        return np.zeros(len(points))
+    a, b = np.radians(points[:-1]), np.radians(points[1:])
+    h = np.sin((b[:, 1] - a[:, 1]) / 2) ** 2 + np.cos(a[:, 1]) * np.cos(b[:, 1]) * np.sin((b[:, 0] - a[:, 0]) / 2) ** 2
+    edges = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+    return np.concatenate(([0.0], np.cumsum(edges)))
+
+
+def split_line(line: Sequence[Sequence[float]], segment_m: float) -> List[List[List[float]]]:
+    """
+    Cuts ``line`` into consecutive pieces of at most ``segment_m`` meters.
+
+    Cut points are interpolated on the edge where the length runs out, so long
+    straight edges are split too; consecutive pieces share their cut point.
+    """
+    points = as_lonlat_array(line)
+    cumulative = line_cumulative_m(points)
+    total = float(cumulative[-1]) if len(points) else 0.0
+    if len(points) < 2 or total <= segment_m:
+        return [points.tolist()]
+    cuts = np.arange(segment_m, total, segment_m)
+    edges = np.clip(np.searchsorted(cumulative, cuts, side="right") - 1, 0, len(points) - 2)
+    lengths = cumulative[edges + 1] - cumulative[edges]
+    fractions = np.divide(cuts - cumulative[edges], lengths, out=np.zeros_like(cuts), where=lengths > 0)
+    cut_points = points[edges] + (points[edges + 1] - points[edges]) * fractions[:, None]
+
+    pieces = []
+    start_point, start_vertex = points[0], 1
+    for edge, cut_point in zip(edges, cut_points):
+        pieces.append([start_point.tolist(), *points[start_vertex:edge + 1].tolist(), cut_point.tolist()])
+        start_point, start_vertex = cut_point, edge + 1
+    pieces.append([start_point.tolist(), *points[start_vertex:].tolist()])
+    return pieces
+
+
+def project_onto_line(
+    points: Sequence[Sequence[float]],
+    line: Sequence[Sequence[float]],
+    chunk_cells: int = 2_000_000,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Projects each point onto its closest edge of ``line``.
+
+    Every edge is measured in its own local equirectangular frame, so the result
+    stays accurate along routes of any length. Points are processed in chunks of
+    at most ``chunk_cells`` point x edge cells.
+
+    Returns:
+        (along_m, offset_m): distance along the line to the projection, and the
+        distance from the point to the line, both in meters.
+    """
+    points = as_lonlat_array(points)
+    vertices = as_lonlat_array(line)
+    along = np.zeros(len(points))
+    offset = np.zeros(len(points))
+    if len(points) == 0 or len(vertices) == 0:
+        return along, offset
+    if len(vertices) == 1:
+        return along, haversine_matrix(points, vertices)[:, 0]
+    cumulative = line_cumulative_m(vertices)
+    a, b = vertices[:-1], vertices[1:]
+    edge_lat = a[:, 1]
+    a_xy, b_xy = _local_xy(a, edge_lat), _local_xy(b, edge_lat)
+    ab = b_xy - a_xy
+    ab_len2 = np.maximum((ab ** 2).sum(axis=1), 1e-12)
+    rows = max(1, chunk_cells // len(a))
+    for row0 in range(0, len(points), rows):
+        block = points[row0:row0 + rows]
+        # (points, edges, 2): each point in the frame of each edge
+        p_xy = _local_xy(np.broadcast_to(block[:, None, :], (len(block), len(a), 2)).copy(), edge_lat[None, :])
+        ap = p_xy - a_xy[None, :, :]
+        t = np.clip((ap * ab[None, :, :]).sum(axis=2) / ab_len2[None, :], 0.0, 1.0)
+        nearest = a_xy[None, :, :] + t[:, :, None] * ab[None, :, :]
+        distances = np.hypot(*(p_xy - nearest).transpose(2, 0, 1))
+        best = np.argmin(distances, axis=1)
+        idx = np.arange(len(block))
+        offset[row0:row0 + len(block)] = distances[idx, best]
+        along[row0:row0 + len(block)] = cumulative[best] + t[idx, best] * (cumulative[best + 1] - cumulative[best])
+    return along, offset
@@ -0,0 +1,382 @@
+import json
+import math
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ors_geo import EARTH_RADIUS_M
+
+# Web Mercator ground resolution at the equator for zoom 0, in meters per pixel
+METERS_PER_PIXEL_Z0 = 156543.03392
+
+# Douglas-Peucker tolerance in screen pixels at the requested zoom
+SIMPLIFY_PIXEL_TOLERANCE = 1.0
+
+GEOMETRY_FORMATS = ("coordinates", "polyline")
+
+
+def encode_polyline(coordinates: Sequence[Sequence[float]], precision: int = 5) -> str:
+    """Encodes (longitude, latitude) pairs with the Google polyline algorithm used by ORS."""
+    factor = 10 ** precision
+    output = []
+    prev_lat = prev_lon = 0
+    for coord in coordinates:
+        lat, lon = int(round(coord[1] * factor)), int(round(coord[0] * factor))
+        for delta in (lat - prev_lat, lon - prev_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                output.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            output.append(chr(value + 63))
+        prev_lat, prev_lon = lat, lon
+    return "".join(output)
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> List[List[float]]:
+    """Decodes a Google polyline (as returned by ORS JSON directions) into [longitude, latitude] pairs."""
+    factor = 10 ** precision
+    coordinates = []
+    index = lat = lon = 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        coordinates.append([lon / factor, lat / factor])
+    return coordinates
+
+
+def tolerance_for_zoom(zoom: float, latitude: float, pixels: float = SIMPLIFY_PIXEL_TOLERANCE) -> float:
+    """Ground distance in meters covered by ``pixels`` screen pixels at a Web Mercator ``zoom`` level."""
+    return pixels * METERS_PER_PIXEL_Z0 * math.cos(math.radians(latitude)) / (2 ** zoom)
+
+
+def simplify_indices(coordinates: Sequence[Sequence[float]], tolerance_m: float, keep: Sequence[int] = ()) -> np.ndarray:
+    """
+    Douglas-Peucker simplification; returns the sorted indices of the vertices to keep.
+
+    Points are projected to local meters (equirectangular around the mean latitude),
+    so ``tolerance_m`` is a ground distance. Endpoints and every index in ``keep``
+    (e.g. route way points) are always preserved, which lets callers remap indices
+    that refer into the original line.
+    """
+    points = np.asarray(coordinates, dtype=float)[:, :2]
+    n = len(points)
+    if n <= 2 or tolerance_m <= 0:
+        return np.arange(n)
+    mean_lat = math.radians(float(points[:, 1].mean()))
+    xy = np.radians(points) * EARTH_RADIUS_M
+    xy[:, 0] *= math.cos(mean_lat)
+
+    kept = np.zeros(n, dtype=bool)
+    anchors = sorted({0, n - 1, *(i for i in keep if 0 <= i < n)})
+    kept[anchors] = True
+    stack = list(zip(anchors, anchors[1:]))
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = xy[start + 1:end]
+        a, b = xy[start], xy[end]
+        ab = b - a
+        length = math.hypot(ab[0], ab[1])
+        if length == 0:
+            distances = np.hypot(segment[:, 0] - a[0], segment[:, 1] - a[1])
+        else:
+            # Perpendicular distance to the chord through a and b
+            distances = np.abs(ab[0] * (segment[:, 1] - a[1]) - ab[1] * (segment[:, 0] - a[0])) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance_m:
+            split = start + 1 + farthest
+            kept[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return np.flatnonzero(kept)
+
+
+def round_coordinates(coordinates: Sequence[Sequence[float]], precision: Optional[int]) -> List[List[float]]:
+    """Rounds every coordinate component to ``precision`` decimals (5 decimals is about 1 m)."""
+    if precision is None:
+        return [list(coord) for coord in coordinates]
+    return [[round(value, precision) for value in coord] for coord in coordinates]
+
+
+def json_size(data: Any) -> int:
+    """Size in bytes of the compact JSON encoding of ``data``."""
+    return len(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
+
+
+def _check_format(geometry_format: Optional[str]):
+    if geometry_format is not None and geometry_format not in GEOMETRY_FORMATS:
+        raise ValueError(f"Unknown geometry_format '{geometry_format}', expected one of {GEOMETRY_FORMATS}")
+
+
+def compact_directions(
+    response: Dict[str, Any],
+    zoom: Optional[float] = None,
+    precision: Optional[int] = None,
+    geometry_format: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Returns a compacted copy of an ORS JSON directions response.
+
+    Route geometries are simplified for ``zoom`` (way points are kept, and
+    ``way_points`` of routes and steps are remapped to the simplified line),
+    rounded to ``precision`` decimals and emitted as coordinate arrays or as an
+    encoded polyline (``geometry_format``; default keeps the input form). Polylines
+    always use the standard precision of 5. The input is not modified. A
+    "compaction" report with the byte savings is added.
+    """
+    _check_format(geometry_format)
+    routes = []
+    vertices_before = vertices_after = 0
+    for route in response.get("routes", []):
+        geometry = route.get("geometry")
+        if geometry is None:
+            routes.append(route)
+            continue
+        if isinstance(geometry, str):
+            line, input_format = decode_polyline(geometry), "polyline"
+        elif isinstance(geometry, dict):
+            line, input_format = geometry.get("coordinates", []), "geojson"
+        else:
+            line, input_format = geometry, "coordinates"
+        way_points = list(route.get("way_points", []))
+        step_points = [i for segment in route.get("segments", []) for step in segment.get("steps", []) for i in step.get("way_points", [])]
+
+        if zoom is not None and line:
+            latitude = sum(coord[1] for coord in line) / len(line)
+            kept = simplify_indices(line, tolerance_for_zoom(zoom, latitude), keep=way_points + step_points)
+        else:
+            kept = np.arange(len(line))
+        simplified = round_coordinates([line[i] for i in kept], precision)
+        vertices_before += len(line)
+        vertices_after += len(simplified)
+
+        def remap(index: int) -> int:
+            # Way points are always kept, so their new index is their rank among the kept vertices
+            return int(np.searchsorted(kept, index))
+
+        new_route = {**route}
+        output_format = geometry_format or input_format
+        if output_format == "polyline":
+            new_route["geometry"] = encode_polyline(simplified)
+        elif output_format == "geojson":
+            new_route["geometry"] = {**geometry, "coordinates": simplified}
+        else:
+            new_route["geometry"] = simplified
+        if way_points:
+            new_route["way_points"] = [remap(i) for i in way_points]
+        if "segments" in route:
+            new_route["segments"] = [
+                {**segment, "steps": [
+                    {**step, "way_points": [remap(i) for i in step["way_points"]]} if "way_points" in step else step
+                    for step in segment.get("steps", [])
+                ]}
+                for segment in route["segments"]
+            ]
+        routes.append(new_route)
+
+    compacted = {**response, "routes": routes}
+    compacted["compaction"] = _report(response, compacted, vertices_before, vertices_after, zoom, precision, geometry_format)
+    return compacted
+
+
+def split_waypoints(count: int, max_waypoints: int) -> List[Tuple[int, int]]:
+    """
+    Splits ``count`` waypoints into half-open (start, end) chunks of at most
+    ``max_waypoints``, where each chunk starts at the last waypoint of the previous
+    one, so the chunk routes join exactly.
+    """
+    if max_waypoints < 2:
+        raise ValueError("max_waypoints must be at least 2")
+    chunks = []
+    start = 0
+    while start < count - 1:
+        end = min(start + max_waypoints, count)
+        chunks.append((start, end))
+        start = end - 1
+    return chunks or [(0, count)]
+
+
+def _union_bbox(boxes: List[Sequence[float]]) -> List[float]:
+    # [min_lon, min_lat, (min_ele,) max_lon, max_lat, (max_ele)]
+    half = len(boxes[0]) // 2
+    return [min(box[i] for box in boxes) for i in range(half)] + [max(box[i] for box in boxes) for i in range(half, 2 * half)]
+
+
+def stitch_directions(responses: List[Dict[str, Any]], locations: Sequence[Sequence[float]]) -> Dict[str, Any]:
+    """
+    Joins the ORS JSON directions responses of consecutive waypoint chunks (see
+    ``split_waypoints``) into one response for the whole itinerary.
+
+    The first route of each chunk is used. Geometries are concatenated without the
+    duplicated joint vertex, ``way_points`` of the route and of every step are
+    shifted into the combined line, segments are concatenated and summary values
+    (distance, duration, ascent, descent) and bounding boxes are combined.
+    """
+    line: List[List[float]] = []
+    way_points: List[int] = []
+    segments: List[Dict[str, Any]] = []
+    summary: Dict[str, float] = {}
+    boxes = []
+    warnings = []
+    input_format = "polyline"
+    for chunk, response in enumerate(responses):
+        route = response["routes"][0]
+        geometry = route.get("geometry", [])
+        if isinstance(geometry, str):
+            chunk_line = decode_polyline(geometry)
+        else:
+            input_format = "coordinates"
+            chunk_line = list(geometry.get("coordinates", []) if isinstance(geometry, dict) else geometry)
+        # Chunks share their joint waypoint, so the first vertex repeats the previous last one
+        offset = len(line) - 1 if chunk else 0
+        line.extend(chunk_line[1:] if chunk else chunk_line)
+        chunk_points = route.get("way_points", [])
+        way_points.extend(i + offset for i in (chunk_points[1:] if chunk else chunk_points))
+        for segment in route.get("segments", []):
+            segments.append({**segment, "steps": [
+                {**step, "way_points": [i + offset for i in step["way_points"]]} if "way_points" in step else step
+                for step in segment.get("steps", [])
+            ]})
+        for key, value in route.get("summary", {}).items():
+            if isinstance(value, (int, float)):
+                summary[key] = summary.get(key, 0) + value
+        if route.get("bbox"):
+            boxes.append(route["bbox"])
+        warnings.extend(route.get("warnings", []))
+
+    stitched_route: Dict[str, Any] = {
+        "summary": {key: round(value, 1) for key, value in summary.items()},
+        "segments": segments,
+        "way_points": way_points,
+        "geometry": encode_polyline(line) if input_format == "polyline" else line,
+    }
+    if boxes:
+        stitched_route["bbox"] = _union_bbox(boxes)
+    if warnings:
+        stitched_route["warnings"] = warnings
+
+    first = responses[0]
+    metadata = dict(first.get("metadata", {}))
+    metadata["query"] = {**metadata.get("query", {}), "coordinates": [list(location) for location in locations]}
+    metadata["chunks"] = len(responses)
+    stitched = {**first, "routes": [stitched_route], "metadata": metadata}
+    if boxes:
+        stitched["bbox"] = stitched_route["bbox"]
+    return stitched
+
+
+def merge_isochrones(responses: List[Dict[str, Any]], chunk_starts: Sequence[int], locations: Sequence[Sequence[float]]) -> Dict[str, Any]:
+    """
+    Joins the isochrone responses of consecutive location chunks into one
+    FeatureCollection. Each feature's ``group_index`` is shifted by its chunk's
+    first location index so it refers into the full ``locations`` list.
+    """
+    features = []
+    for response, start in zip(responses, chunk_starts):
+        for feature in response.get("features", []):
+            properties = feature.get("properties", {})
+            if "group_index" in properties:
+                properties = {**properties, "group_index": properties["group_index"] + start}
+            features.append({**feature, "properties": properties})
+
+    first = responses[0]
+    metadata = dict(first.get("metadata", {}))
+    metadata["query"] = {**metadata.get("query", {}), "locations": [list(location) for location in locations]}
+    metadata["chunks"] = len(responses)
+    merged = {**first, "features": features, "metadata": metadata}
+    boxes = [response["bbox"] for response in responses if response.get("bbox")]
+    if boxes:
+        merged["bbox"] = _union_bbox(boxes)
+    return merged
+
+
+def _compact_ring(ring: List[List[float]], tolerance_m: Optional[float], precision: Optional[int]) -> List[List[float]]:
+    if tolerance_m is not None and len(ring) > 4:
+        kept = simplify_indices(ring, tolerance_m)
+        # A closed ring needs at least 4 positions (3 distinct corners)
+        if len(kept) >= 4:
+            ring = [ring[i] for i in kept]
+    return round_coordinates(ring, precision)
+
+
+def compact_isochrones(
+    response: Dict[str, Any],
+    zoom: Optional[float] = None,
+    precision: Optional[int] = None,
+    geometry_format: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Returns a compacted copy of an ORS isochrones GeoJSON response.
+
+    Polygon rings are simplified for ``zoom`` and rounded to ``precision`` decimals.
+    With ``geometry_format="polyline"`` each ring becomes an encoded polyline string
+    and the geometry gets ``"encoding": "polyline"`` (no longer plain GeoJSON).
+    The input is not modified. A "compaction" report with the byte savings is added.
+    """
+    _check_format(geometry_format)
+    features = []
+    vertices_before = vertices_after = 0
+    for feature in response.get("features", []):
+        geometry = feature.get("geometry") or {}
+        if geometry.get("type") not in ("Polygon", "MultiPolygon"):
+            features.append(feature)
+            continue
+        polygons = geometry["coordinates"] if geometry["type"] == "MultiPolygon" else [geometry["coordinates"]]
+        new_polygons = []
+        for polygon in polygons:
+            new_rings = []
+            for ring in polygon:
+                tolerance = None
+                if zoom is not None and ring:
+                    tolerance = tolerance_for_zoom(zoom, sum(coord[1] for coord in ring) / len(ring))
+                new_ring = _compact_ring(ring, tolerance, precision)
+                vertices_before += len(ring)
+                vertices_after += len(new_ring)
+                if geometry_format == "polyline":
+                    new_ring = encode_polyline(new_ring)
+                new_rings.append(new_ring)
+            new_polygons.append(new_rings)
+        new_geometry = {**geometry, "coordinates": new_polygons if geometry["type"] == "MultiPolygon" else new_polygons[0]}
+        if geometry_format == "polyline":
+            new_geometry["encoding"] = "polyline"
+        features.append({**feature, "geometry": new_geometry})
+
+    compacted = {**response, "features": features}
+    compacted["compaction"] = _report(response, compacted, vertices_before, vertices_after, zoom, precision, geometry_format)
+    return compacted
+
+
+def _report(
+    original: Dict[str, Any],
+    compacted: Dict[str, Any],
+    vertices_before: int,
+    vertices_after: int,
+    zoom: Optional[float],
+    precision: Optional[int],
+    geometry_format: Optional[str],
+) -> Dict[str, Any]:
+    bytes_before = json_size(original)
+    bytes_after = json_size(compacted)
+    return {
+        "simplify_zoom": zoom,
+        "coordinate_precision": precision,
+        "geometry_format": geometry_format,
+        "vertices_before": vertices_before,
+        "vertices_after": vertices_after,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "bytes_saved": bytes_before - bytes_after,
+        "reduction": round(1 - bytes_after / bytes_before, 4) if bytes_before else 0.0,
+    }
@@ -0,0 +1,340 @@
+import os
+import time
+import asyncio
+from typing import List, Tuple, Optional, Dict, Any
+
+import httpx
+from openrouteservice import exceptions as ors_exceptions
+from loguru import logger
+
+from ors_metrics import ServerMetrics, upstream_endpoint
+from ors_ratelimit import RateLimiter, RetryPolicy, ORS_STANDARD_QUOTAS, parse_quotas, parse_retry_after
+
+ORS_BASE_URL = "https://api.openrouteservice.org"
+
+
+class ORSApiError(ors_exceptions.ApiError):
+    """``ApiError`` that also carries the response's Retry-After delay in seconds, if any."""
+
+    def __init__(self, status: int, message: Any = None, retry_after: Optional[float] = None):
+        super().__init__(status, message)
+        self.retry_after = retry_after
+
+
+class ORSTransportError(ors_exceptions.HTTPError):
+    """No response was received (connection refused or reset, protocol error); ``cause`` is the httpx error."""
+
+    def __init__(self, cause: httpx.TransportError):
+        super().__init__(0)
+        self.cause = cause
+
+    def __str__(self):
+        return f"Transport error: {self.cause!r}"
+
+
+# Failures that happen before the request reaches ORS, so even a POST is safe to resend
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class ORSHttpClient:
+    """
+    Shared, pooled async HTTP client for the OpenRouteService REST API.
+
+    Mirrors the subset of ``openrouteservice.Client`` methods used by the MCP server
+    (directions, pelias_search, isochrones, pois, optimization) but never blocks the
+    event loop. A single ``httpx.AsyncClient`` is created lazily on first use so that
+    connections are kept alive and reused across every tool call.
+
+    Errors are raised as ``openrouteservice.exceptions`` types so callers can keep
+    handling ``ApiError`` exactly as they did with the synchronous client.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = ORS_BASE_URL,
+        timeout: float = 60.0,
+        connect_timeout: float = 10.0,
+        pool_timeout: float = 30.0,
+        optimization_timeout: float = 120.0,
+        max_connections: int = 50,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        metrics: Optional[ServerMetrics] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """
+        Args:
+            api_key: OpenRouteService API key, sent as the Authorization header.
+            base_url: Base URL of the ORS API, without trailing slash.
+            timeout: Default read/write timeout in seconds for a single request.
+            connect_timeout: Timeout in seconds for establishing a connection.
+            pool_timeout: How long a request may wait for a free pooled connection.
+            optimization_timeout: Read timeout used for the (slow) optimization endpoint.
+            max_connections: Maximum number of concurrent connections to the ORS host.
+            max_keepalive_connections: Number of idle connections kept open for reuse.
+            keepalive_expiry: Seconds an idle keep-alive connection is retained.
+            metrics: Optional metrics sink recording latency, status and body sizes per endpoint.
+            rate_limiter: Optional per-endpoint quota limiter; requests wait for a slot before being sent.
+            retry_policy: Optional backoff policy for 429/5xx answers (None sends every request once).
+        """
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.optimization_timeout = optimization_timeout
+        self.metrics = metrics
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        # Every request goes to the single ORS host, so the pool limits are per-host limits.
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._timeout = httpx.Timeout(timeout, connect=connect_timeout, pool=pool_timeout)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @classmethod
+    def from_env(cls, api_key: str, metrics: Optional[ServerMetrics] = None) -> "ORSHttpClient":
+        """
+        Builds a client using the ``ORS_HTTP_*`` environment variables for tuning.
+
+        Rate limiting defaults to the standard plan quotas when talking to the public
+        API and is off for self-hosted instances; ``ORS_RATE_LIMITS`` (e.g.
+        ``"directions=40/2000,matrix=40/500"``) overrides the quotas and
+        ``ORS_RATE_LIMIT_ENABLED=0/1`` forces it off or on.
+        """
+        base_url = os.getenv("ORS_BASE_URL", ORS_BASE_URL)
+        quotas = dict(ORS_STANDARD_QUOTAS)
+        quotas.update(parse_quotas(os.getenv("ORS_RATE_LIMITS", "")))
+        enabled = os.getenv("ORS_RATE_LIMIT_ENABLED")
+        if enabled is None:
+            limited = base_url.rstrip("/") == ORS_BASE_URL or bool(os.getenv("ORS_RATE_LIMITS"))
+        else:
+            limited = enabled.lower() in ("1", "true", "yes", "on")
+        return cls(
+            api_key=api_key,
+            base_url=base_url,
+            timeout=float(os.getenv("ORS_HTTP_TIMEOUT", "60")),
+            connect_timeout=float(os.getenv("ORS_HTTP_CONNECT_TIMEOUT", "10")),
+            pool_timeout=float(os.getenv("ORS_HTTP_POOL_TIMEOUT", "30")),
+            optimization_timeout=float(os.getenv("ORS_OPTIMIZATION_TIMEOUT", "120")),
+            max_connections=int(os.getenv("ORS_HTTP_MAX_CONNECTIONS", "50")),
+            max_keepalive_connections=int(os.getenv("ORS_HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("ORS_HTTP_KEEPALIVE_EXPIRY", "30")),
+            metrics=metrics,
+            rate_limiter=RateLimiter(
+                quotas,
+                max_queue=int(os.getenv("ORS_RATE_LIMIT_MAX_QUEUE", "100")),
+                max_wait=float(os.getenv("ORS_RATE_LIMIT_MAX_WAIT", "60"))
+            ) if limited else None,
+            retry_policy=RetryPolicy(
+                max_retries=int(os.getenv("ORS_HTTP_MAX_RETRIES", "3")),
+                base_delay=float(os.getenv("ORS_HTTP_RETRY_BASE_DELAY", "0.5")),
+                max_delay=float(os.getenv("ORS_HTTP_RETRY_MAX_DELAY", "30"))
+            ),
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The underlying ``httpx.AsyncClient``, created on first access."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "Authorization": self.api_key,
+                    "Content-Type": "application/json",
+                    "Accept": "application/json, application/geo+json",
+                },
+                limits=self._limits,
+                timeout=self._timeout,
+            )
+        return self._client
+
+    async def aclose(self):
+        """Closes all pooled connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Sends a request to ORS and returns the decoded JSON body.
+
+        With a rate limiter the request first waits for a slot of its endpoint; with
+        a retry policy 429/5xx answers are retried after a jittered backoff that
+        honors Retry-After (a 429 also pauses the endpoint's limiter). Timeouts and
+        network errors are retried for GETs, and for any method when the request
+        never left (connection or pool failures).
+
+        Raises:
+            openrouteservice.exceptions.ApiError: The API answered with a non-200 status
+                (after retries), or the local rate limit queue is full.
+            openrouteservice.exceptions.HTTPError: A 200 response body was not valid JSON,
+                or no response arrived (``ORSTransportError``).
+            openrouteservice.exceptions.Timeout: The request timed out.
+        """
+        endpoint = upstream_endpoint(path)
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                waited = await self.rate_limiter.acquire(endpoint)
+                if waited and self.metrics is not None:
+                    self.metrics.rate_limited(endpoint, waited)
+            try:
+                return await self._request_once(method, path, endpoint, params, payload, timeout)
+            except ORSApiError as e:
+                delay = self.retry_policy.delay(attempt, e.status, e.retry_after) if self.retry_policy else None
+                if e.status == 429 and e.retry_after and self.rate_limiter is not None:
+                    limiter = self.rate_limiter.get(endpoint)
+                    if limiter is not None:
+                        limiter.pause(e.retry_after)
+                if delay is None:
+                    raise
+                logger.warning(f"ORS {endpoint} answered {e.status}, retry {attempt + 1} in {delay:.2f}s")
+                if self.metrics is not None:
+                    self.metrics.upstream_retried(endpoint, e.status)
+            except (ors_exceptions.Timeout, ORSTransportError) as e:
+                retryable = method == "GET" or isinstance(e.__cause__, _NOT_SENT_ERRORS)
+                delay = self.retry_policy.transport_delay(attempt) if self.retry_policy and retryable else None
+                if delay is None:
+                    raise
+                logger.warning(f"ORS {endpoint} request failed ({e.__cause__!r}), retry {attempt + 1} in {delay:.2f}s")
+                if self.metrics is not None:
+                    self.metrics.upstream_retried(endpoint, type(e.__cause__).__name__)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _request_once(
+        self,
+        method: str,
+        path: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        payload: Optional[Dict[str, Any]],
+        timeout: Optional[float],
+    ) -> Any:
+        request_timeout = httpx.Timeout(timeout, connect=self._timeout.connect, pool=self._timeout.pool) if timeout else None
+        if self.metrics is not None:
+            self.metrics.upstream_started(endpoint)
+        started = time.perf_counter()
+        response: Optional[httpx.Response] = None
+        error: Optional[BaseException] = None
+        try:
+            try:
+                response = await self.client.request(
+                    method,
+                    path,
+                    params=params,
+                    json=payload,
+                    **({"timeout": request_timeout} if request_timeout else {}),
+                )
+            except httpx.TimeoutException as e:
+                logger.warning(f"ORS request to {path} timed out: {e!r}")
+                raise ors_exceptions.Timeout() from e
+            except httpx.TransportError as e:
+                logger.warning(f"ORS request to {path} failed: {e!r}")
+                raise ORSTransportError(e) from e
+
+            # Status first: proxies answer 429/5xx with HTML bodies, which must still be retried
+            if response.status_code != 200:
+                try:
+                    message = response.json()
+                except ValueError:
+                    message = response.text[:500]
+                raise ORSApiError(response.status_code, message, parse_retry_after(response.headers.get("Retry-After")))
+            try:
+                return response.json()
+            except ValueError:
+                raise ors_exceptions.HTTPError(response.status_code)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.upstream_finished(
+                    endpoint,
+                    time.perf_counter() - started,
+                    status=response.status_code if response is not None else type(error).__name__,
+                    request_bytes=len(response.request.content) if response is not None else 0,
+                    response_bytes=len(response.content) if response is not None else 0,
+                    error=error,
+                )
+
+    async def post(self, path: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        return await self.request("POST", path, payload=payload, timeout=timeout)
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        return await self.request("GET", path, params=params, timeout=timeout)
+
+    # --- Endpoint helpers (same names as openrouteservice.Client) ---
+
+    async def directions(
+        self,
+        coordinates: List[List[float]],
+        profile: str = "driving-car",
+        preference: Optional[str] = None,
+        optimize_waypoints: bool = False,
+        format: str = "json",
+    ) -> Dict[str, Any]:
+        """Async equivalent of ``openrouteservice.Client.directions``."""
+        coordinates = [list(coord) for coord in coordinates]
+        # Same rules as the sync client: VROOM only reorders the via points of 4+ coordinates
+        if optimize_waypoints and len(coordinates) > 3 and preference != "shortest":
+            coordinates = await self._optimize_waypoint_order(coordinates, profile)
+
+        params: Dict[str, Any] = {"coordinates": coordinates}
+        if preference:
+            params["preference"] = preference
+        return await self.post(f"/v2/directions/{profile}/{format}", params)
+
+    async def _optimize_waypoint_order(self, coordinates: List[List[float]], profile: str) -> List[List[float]]:
+        payload = {
+            "jobs": [{"id": idx, "location": coord} for idx, coord in enumerate(coordinates[1:-1])],
+            "vehicles": [{"id": 0, "profile": profile, "start": coordinates[0], "end": coordinates[-1]}],
+        }
+        result = await self.optimization(payload)
+        return [step["location"] for step in result["routes"][0]["steps"]]
+
+    async def pelias_search(self, text: str, **extra_params: Any) -> Dict[str, Any]:
+        """Async equivalent of ``openrouteservice.Client.pelias_search``."""
+        return await self.get("/geocode/search", {"text": text, **extra_params})
+
+    async def isochrones(
+        self,
+        locations: List[Tuple[float, float]],
+        profile: str = "driving-car",
+        range: Optional[List[float]] = None,
+        range_type: str = "time",
+        interval: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Async equivalent of ``openrouteservice.Client.isochrones``."""
+        params: Dict[str, Any] = {
+            "locations": [list(location) for location in locations],
+            "profile": profile,
+            "range": range,
+        }
+        if range_type:
+            params["range_type"] = range_type
+        if interval:
+            params["interval"] = interval
+        return await self.post(f"/v2/isochrones/{profile}/geojson", params)
+
+    async def pois(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Posts a raw request body to the POIs endpoint."""
+        return await self.post("/pois", payload)
+
+    async def matrix(self, payload: Dict[str, Any], profile: str = "driving-car") -> Dict[str, Any]:
+        """Posts a raw request body to the matrix endpoint of ``profile``."""
+        return await self.post(f"/v2/matrix/{profile}/json", payload)
+
+    async def optimization(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Posts a raw VROOM problem to the optimization endpoint."""
+        return await self.post("/optimization", payload, timeout=self.optimization_timeout)
@@ -0,0 +1,174 @@
+import time
+import uuid
+import asyncio
+from typing import Optional, Dict, Any, Callable, Awaitable, List
+
+from loguru import logger
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class JobProgress:
+    """
+    Context-like progress sink handed to background work.
+
+    Implements the subset of ``fastmcp.Context`` the tools use (info, warning,
+    error, report_progress), so tool functions can run unchanged in the background
+    while their messages and progress are recorded on the job.
+    """
+
+    def __init__(self, job: "BackgroundJob"):
+        self._job = job
+
+    async def info(self, message: str, **kwargs: Any):
+        self._job.message = message
+
+    async def warning(self, message: str, **kwargs: Any):
+        self._job.message = message
+
+    async def error(self, message: str, **kwargs: Any):
+        self._job.message = message
+
+    async def report_progress(self, progress: float, total: Optional[float] = None, message: Optional[str] = None):
+        self._job.progress = min(1.0, progress / total) if total else progress
+        if message:
+            self._job.message = message
+
+
+class BackgroundJob:
+    """State of one submitted background job."""
+
+    def __init__(self, job_id: str, kind: str, summary: Dict[str, Any]):
+        self.job_id = job_id
+        self.kind = kind
+        self.summary = summary
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message: Optional[str] = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.done = asyncio.Event()
+
+    def to_status(self) -> Dict[str, Any]:
+        """JSON-serializable status without the (possibly large) result."""
+        now = time.time()
+        elapsed_from = self.started_at or self.submitted_at
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "message": self.message,
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round((self.finished_at or now) - elapsed_from, 3),
+            "summary": self.summary,
+        }
+
+
+class BackgroundJobManager:
+    """
+    Runs long jobs (e.g. optimizations) on a bounded pool of asyncio workers.
+
+    At most ``max_workers`` jobs run at once; up to ``max_pending`` unfinished jobs
+    may be queued. Finished jobs, including their results, are kept for
+    ``result_ttl`` seconds so they can be fetched after the submitting request ended.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 100, result_ttl: float = 3600.0):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._jobs: Dict[str, BackgroundJob] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _prune(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.status in FINISHED_STATES and job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def pending_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status not in FINISHED_STATES)
+
+    def submit(
+        self,
+        kind: str,
+        work: Callable[[JobProgress], Awaitable[Any]],
+        summary: Optional[Dict[str, Any]] = None,
+    ) -> BackgroundJob:
+        """
+        Schedules ``work(progress)`` and returns its job immediately.
+
+        Raises:
+            RuntimeError: If ``max_pending`` unfinished jobs already exist.
+        """
+        self._prune()
+        if self.pending_count() >= self.max_pending:
+            raise RuntimeError(f"Too many pending jobs ({self.max_pending}), try again later")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+
+        job = BackgroundJob(uuid.uuid4().hex, kind, summary or {})
+        self._jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job, work))
+        return job
+
+    async def _run(self, job: BackgroundJob, work: Callable[[JobProgress], Awaitable[Any]]):
+        try:
+            async with self._semaphore:
+                job.status = RUNNING
+                job.started_at = time.time()
+                job.result = await work(JobProgress(job))
+                job.status = SUCCEEDED
+                job.progress = 1.0
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except Exception as e:
+            logger.error(f"Background job {job.job_id} ({job.kind}) failed: {e}")
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            job.done.set()
+
+    def get(self, job_id: str) -> Optional[BackgroundJob]:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Requests cancellation; returns False if the job is unknown or already finished."""
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED_STATES or job.task is None:
+            return False
+        job.task.cancel()
+        return True
+
+    async def wait(self, job: BackgroundJob, timeout: float) -> bool:
+        """Waits up to ``timeout`` seconds for the job to finish; returns whether it did."""
+        if timeout <= 0:
+            return job.done.is_set()
+        try:
+            await asyncio.wait_for(asyncio.shield(job.done.wait()), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job.done.is_set()
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        self._prune()
+        return [job.to_status() for job in self._jobs.values()]
@@ -0,0 +1,183 @@
+import os
+import sys
+import json
+import glob
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Any, Sequence, Optional
+
+from loguru import logger
+
+LOG_PROFILES = ("development", "production")
+
+CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+FILE_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+JSON_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}"
+
+# Per-call records at these levels may be sampled; warnings and errors are always kept
+SAMPLED_LEVELS = ("INFO", "SUCCESS")
+
+
+def sampling_patcher(rate: float, levels: Sequence[str] = SAMPLED_LEVELS) -> Optional[Callable[[Dict[str, Any]], None]]:
+    """
+    Loguru patcher deciding once per record whether to keep roughly ``rate`` of the
+    high-volume per-call records.
+
+    Only records bound to a tool (``function`` in ``extra``) at one of ``levels``
+    are sampled; dropped ones get ``extra["sampled"] = False`` so that every sink
+    filtering with ``sampled`` drops the same records. Returns None (no patcher)
+    when ``rate`` >= 1.
+    """
+    if rate >= 1:
+        return None
+    levels = frozenset(levels)
+
+    def patch(record: Dict[str, Any]):
+        if record["level"].name in levels and "function" in record["extra"] and random.random() >= rate:
+            record["extra"]["sampled"] = False
+
+    return patch
+
+
+def _keep_all(record: Dict[str, Any]):
+    pass
+
+
+def sampled(record: Dict[str, Any]) -> bool:
+    """Loguru filter dropping the records ``sampling_patcher`` sampled out."""
+    return record["extra"].get("sampled", True)
+
+
+class JsonLinesSink:
+    """
+    Daily-rotated JSON-lines file sink.
+
+    Meant to be added with ``enqueue=True`` and ``format="{message}"``: loguru then
+    only queues the record on the calling thread, and this sink encodes the compact
+    JSON line and writes it from loguru's background worker.
+    """
+
+    def __init__(self, directory: str, prefix: str = "ors_mcp_server", retention_days: int = 30):
+        self.directory = directory
+        self.prefix = prefix
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._date: Optional[str] = None
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _open(self, date: str):
+        if self._file is not None:
+            self._file.close()
+        self._date = date
+        self._file = open(os.path.join(self.directory, f"{self.prefix}_{date}.jsonl"), "a", encoding="utf-8")
+        self._prune()
+
+    def _prune(self):
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        for path in glob.glob(os.path.join(self.directory, f"{self.prefix}_*.jsonl")):
+            date = os.path.basename(path)[len(self.prefix) + 1:-len(".jsonl")]
+            if date < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def write(self, message):
+        record = message.record
+        entry = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "message": record["message"],
+            "module": record["name"],
+            "function": record["extra"].get("function", record["function"]),
+            "line": record["line"],
+        }
+        extra = {key: value for key, value in record["extra"].items() if key != "function"}
+        if extra:
+            entry["extra"] = extra
+        if record["exception"] is not None:
+            entry["exception"] = f"{record['exception'].type.__name__}: {record['exception'].value}"
+        line = json.dumps(entry, default=str, ensure_ascii=False)
+        with self._lock:
+            date = record["time"].strftime("%Y-%m-%d")
+            if date != self._date:
+                self._open(date)
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def stop(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def configure_logging(
+    profile: str = "development",
+    log_dir: str = "logs",
+    level: Optional[str] = None,
+    sample_rate: Optional[float] = None,
+    retention_days: int = 30,
+):
+    """
+    Replaces loguru's handlers with the sinks of a logging profile.
+
+    development: colored console (INFO), DEBUG text file and serialized JSON file,
+        as before, but every sink is enqueued so file I/O happens off the request path.
+    production: plain console for warnings, plus one enqueued JSON-lines file whose
+        encoding happens on loguru's worker thread; per-call INFO/SUCCESS records are
+        sampled at 10% unless ``sample_rate`` says otherwise.
+
+    Args:
+        profile: One of ``LOG_PROFILES``.
+        log_dir: Directory of the log files.
+        level: Minimum level of the file sinks (default DEBUG in development, INFO in production).
+        sample_rate: Fraction of per-call INFO/SUCCESS records to keep (1.0 keeps all).
+        retention_days: Days of log files to keep.
+    """
+    if profile not in LOG_PROFILES:
+        raise ValueError(f"Unknown log profile '{profile}', expected one of {LOG_PROFILES}")
+    logger.remove()
+    default_rate = 0.1 if profile == "production" else 1.0
+    # The patcher runs once per record on the calling thread, before any sink sees it.
+    # configure() ignores patcher=None, so a no-op replaces the patcher of an earlier call
+    patcher = sampling_patcher(default_rate if sample_rate is None else sample_rate)
+    logger.configure(patcher=patcher or _keep_all)
+
+    if profile == "production":
+        logger.add(sys.stderr, format=FILE_FORMAT, level="WARNING", colorize=False, filter=sampled, enqueue=True)
+        logger.add(
+            JsonLinesSink(log_dir, retention_days=retention_days),
+            format="{message}",
+            level=level or "INFO",
+            filter=sampled,
+            enqueue=True
+        )
+        return
+
+    logger.add(sys.stderr, format=CONSOLE_FORMAT, level="INFO", colorize=True, filter=sampled, enqueue=True)
+    logger.add(
+        os.path.join(log_dir, "ors_mcp_server_{time:YYYY-MM-DD}.log"),
+        format=FILE_FORMAT,
+        level=level or "DEBUG",
+        rotation="1 day",
+        retention=f"{retention_days} days",
+        compression="zip",
+        filter=sampled,
+        enqueue=True
+    )
+    logger.add(
+        os.path.join(log_dir, "ors_mcp_server_{time:YYYY-MM-DD}.json"),
+        format=JSON_FORMAT,
+        level="INFO",
+        rotation="1 day",
+        retention=f"{retention_days} days",
+        serialize=True,
+        filter=sampled,
+        enqueue=True
+    )
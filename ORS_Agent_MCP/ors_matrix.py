@@ -0,0 +1,327 @@
+import asyncio
+import math
+from typing import List, Tuple, Optional, Dict, Any, Sequence
+
+import numpy as np
+from openrouteservice import exceptions as ors_exceptions
+
+from ors_http import ORSHttpClient
+from ors_cache import TravelTimeStore
+from ors_singleflight import gather_or_cancel
+
+# Public ORS API limit on sources x destinations per matrix request
+DEFAULT_MAX_ELEMENTS = 3500
+
+
+def plan_matrix_tiles(n_sources: int, n_destinations: int, max_elements: int = DEFAULT_MAX_ELEMENTS) -> List[Tuple[int, int, int, int]]:
+    """
+    Splits an ``n_sources x n_destinations`` matrix into tiles of at most ``max_elements`` cells.
+
+    Tiles are as square as the limit allows, which minimizes the number of
+    locations sent per request. Returns (src_start, src_end, dst_start, dst_end)
+    half-open ranges.
+    """
+    if n_sources == 0 or n_destinations == 0:
+        return []
+    side = max(1, int(math.isqrt(max_elements)))
+    src_step = min(n_sources, side)
+    # Use the remaining element budget on the destination axis when sources are few
+    dst_step = min(n_destinations, max(1, max_elements // src_step))
+    return [
+        (s0, min(s0 + src_step, n_sources), d0, min(d0 + dst_step, n_destinations))
+        for s0 in range(0, n_sources, src_step)
+        for d0 in range(0, n_destinations, dst_step)
+    ]
+
+
+def _to_array(rows: Optional[List[List[Optional[float]]]], shape: Tuple[int, int]) -> np.ndarray:
+    if rows is None:
+        return np.full(shape, np.nan)
+    # ORS reports unreachable pairs as null
+    return np.array([[np.nan if value is None else value for value in row] for row in rows], dtype=float)
+
+
+async def fetch_matrix(
+    client: ORSHttpClient,
+    sources: Sequence[Sequence[float]],
+    destinations: Sequence[Sequence[float]],
+    profile: str = "driving-car",
+    metrics: Sequence[str] = ("duration", "distance"),
+    max_elements: int = DEFAULT_MAX_ELEMENTS,
+    concurrency: int = 4,
+) -> Dict[str, Any]:
+    """
+    Fetches a dense sources x destinations matrix from the ORS matrix endpoint.
+
+    The matrix is split with ``plan_matrix_tiles``, tiles are requested concurrently
+    (at most ``concurrency`` at once) and written into preallocated NumPy arrays.
+    Unreachable pairs are NaN.
+
+    Returns:
+        A dict with one ``(len(sources), len(destinations))`` float array per metric
+        under "durations" / "distances", plus "tiles" (number of requests made).
+    """
+    n_sources, n_destinations = len(sources), len(destinations)
+    metrics = list(metrics)
+    result = {f"{metric}s": np.full((n_sources, n_destinations), np.nan) for metric in metrics}
+    tiles = plan_matrix_tiles(n_sources, n_destinations, max_elements)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch_tile(s0: int, s1: int, d0: int, d1: int):
+        tile_sources = [list(map(float, point)) for point in sources[s0:s1]]
+        tile_destinations = [list(map(float, point)) for point in destinations[d0:d1]]
+        payload = {
+            "locations": tile_sources + tile_destinations,
+            "sources": list(range(len(tile_sources))),
+            "destinations": list(range(len(tile_sources), len(tile_sources) + len(tile_destinations))),
+            "metrics": metrics,
+        }
+        async with semaphore:
+            response = await client.matrix(payload, profile=profile)
+        for metric in metrics:
+            key = f"{metric}s"
+            result[key][s0:s1, d0:d1] = _to_array(response.get(key), (s1 - s0, d1 - d0))
+
+    await gather_or_cancel(*(fetch_tile(*tile) for tile in tiles))
+    result["tiles"] = len(tiles)
+    return result
+
+
+def _uncached_points(missing: np.ndarray) -> np.ndarray:
+    """
+    Greedy vertex cover of the missing pairs: indices of points whose rows and
+    columns together contain every True cell of the square ``missing`` mask.
+
+    Points with the most missing pairs are taken first. Once half of the points
+    would be needed, fetching everything is about as cheap, so all are returned.
+    """
+    n = len(missing)
+    remaining = missing.copy()
+    new = []
+    while remaining.any():
+        if len(new) >= n // 2:
+            return np.arange(n)
+        degree = remaining.sum(axis=0) + remaining.sum(axis=1)
+        i = int(np.argmax(degree))
+        new.append(i)
+        remaining[i, :] = False
+        remaining[:, i] = False
+    return np.array(sorted(new), dtype=int)
+
+
+async def fetch_matrix_with_store(
+    client: ORSHttpClient,
+    store: TravelTimeStore,
+    points: Sequence[Sequence[float]],
+    profile: str = "driving-car",
+    max_elements: int = DEFAULT_MAX_ELEMENTS,
+    concurrency: int = 4,
+    fetch_missing: bool = True,
+    known: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    max_tiles: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Square duration/distance matrix between ``points``, filled from ``store`` first.
+
+    ``known`` may hold the (durations, distances) of the first ``m`` points from an
+    earlier call; then only the pairs involving the later points are looked up.
+
+    Missing pairs are covered with a small set of "new" points (see
+    ``_uncached_points``) so that every pair between the remaining points is stored.
+    Only the new rows (new x all) and the new columns of the old rows (old x new)
+    are requested, so adding k locations to a known set of n costs about 2 * k * n
+    cells instead of n * n. Fetched pairs are written back to the store. With
+    ``fetch_missing=False`` nothing is requested and missing pairs stay NaN.
+    When the missing pairs need more than ``max_tiles`` matrix requests, nothing
+    is requested either and an ``ApiError`` with status 429 is raised.
+
+    Returns:
+        A dict with "durations" / "distances" arrays (unreachable or missing pairs
+        are NaN), "tiles" (matrix requests made), "cached_pairs" and "fetched_pairs".
+    """
+    n = len(points)
+    if known is None:
+        durations, distances = await asyncio.to_thread(store.lookup, profile, points)
+    else:
+        m = len(known[0])
+        durations, distances = np.full((n, n), np.nan), np.full((n, n), np.nan)
+        durations[:m, :m], distances[:m, :m] = known
+        if n > m:
+            rows = await asyncio.to_thread(store.lookup, profile, points[m:], points)
+            columns = await asyncio.to_thread(store.lookup, profile, points[:m], points[m:])
+            durations[m:], distances[m:] = rows
+            durations[:m, m:], distances[:m, m:] = columns
+    missing = np.isnan(durations) | np.isnan(distances)
+    # The diagonal is always zero, no need to ask for it
+    np.fill_diagonal(durations, 0.0)
+    np.fill_diagonal(distances, 0.0)
+    np.fill_diagonal(missing, False)
+    cached_pairs = n * n - n - int(missing.sum())
+    result = {"durations": durations, "distances": distances, "tiles": 0, "cached_pairs": cached_pairs, "fetched_pairs": 0}
+    if not missing.any() or not fetch_missing:
+        return result
+
+    new = _uncached_points(missing)
+    old = np.setdiff1d(np.arange(n), new)
+    blocks = [(new, np.arange(n))]
+    if len(old):
+        blocks.append((old, new))
+    planned = sum(len(plan_matrix_tiles(len(rows), len(columns), max_elements)) for rows, columns in blocks)
+    if max_tiles is not None and planned > max_tiles:
+        raise ors_exceptions.ApiError(429, {"error": {"code": 429, "message": (
+            f"Filling {int(missing.sum())} missing pairs needs {planned} matrix requests, "
+            f"but only {max_tiles} remain in the matrix quota"
+        )}})
+
+    async def fetch_block(rows: np.ndarray, columns: np.ndarray) -> Dict[str, Any]:
+        sources = [points[i] for i in rows]
+        destinations = [points[j] for j in columns]
+        block = await fetch_matrix(
+            client, sources, destinations, profile=profile,
+            max_elements=max_elements, concurrency=concurrency
+        )
+        await asyncio.to_thread(store.store, profile, sources, destinations, block["durations"], block["distances"])
+        return block
+
+    fetched = await gather_or_cancel(*(fetch_block(rows, columns) for rows, columns in blocks))
+    for (rows, columns), block in zip(blocks, fetched):
+        durations[np.ix_(rows, columns)] = block["durations"]
+        distances[np.ix_(rows, columns)] = block["distances"]
+        result["tiles"] += block["tiles"]
+        result["fetched_pairs"] += len(rows) * len(columns)
+    return result
+
+
+async def fetch_sparse_matrix(
+    client: ORSHttpClient,
+    store: TravelTimeStore,
+    sources: Sequence[Sequence[float]],
+    destinations: Sequence[Sequence[float]],
+    wanted: np.ndarray,
+    profile: str = "driving-car",
+    max_elements: int = DEFAULT_MAX_ELEMENTS,
+    concurrency: int = 4,
+) -> Dict[str, Any]:
+    """
+    Durations/distances for the pairs marked in the boolean ``wanted`` mask only.
+
+    Pairs found in ``store`` are not requested. The sources with missing pairs are
+    taken in groups of about sqrt(max_elements); each group only requests the
+    destinations that one of its sources still needs, in tiles of at most
+    ``max_elements`` cells, all tiles concurrently. Fetched pairs are stored.
+
+    Returns:
+        A dict with "durations" / "distances" arrays of shape (len(sources),
+        len(destinations)), NaN where a pair was not wanted or is unreachable, plus
+        "tiles", "cached_pairs" and "fetched_pairs" (cells requested, including the
+        unwanted ones a rectangular tile carries along).
+    """
+    durations, distances = await asyncio.to_thread(store.lookup, profile, sources, destinations)
+    missing = wanted & (np.isnan(durations) | np.isnan(distances))
+    result = {
+        "durations": np.where(wanted, durations, np.nan),
+        "distances": np.where(wanted, distances, np.nan),
+        "tiles": 0,
+        "cached_pairs": int(wanted.sum() - missing.sum()),
+        "fetched_pairs": 0,
+    }
+    rows = np.flatnonzero(missing.any(axis=1))
+    if len(rows) == 0:
+        return result
+
+    group = max(1, min(len(rows), int(math.isqrt(max_elements))))
+    tiles = []
+    for r0 in range(0, len(rows), group):
+        row_block = rows[r0:r0 + group]
+        columns = np.flatnonzero(missing[row_block].any(axis=0))
+        step = max(1, max_elements // len(row_block))
+        tiles.extend((row_block, columns[c0:c0 + step]) for c0 in range(0, len(columns), step))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def fetch_tile(row_block: np.ndarray, columns: np.ndarray) -> Dict[str, Any]:
+        tile_sources = [sources[i] for i in row_block]
+        tile_destinations = [destinations[j] for j in columns]
+        async with semaphore:
+            tile = await fetch_matrix(
+                client, tile_sources, tile_destinations, profile=profile,
+                max_elements=max_elements, concurrency=1
+            )
+        await asyncio.to_thread(store.store, profile, tile_sources, tile_destinations, tile["durations"], tile["distances"])
+        return tile
+
+    fetched = await gather_or_cancel(*(fetch_tile(row_block, columns) for row_block, columns in tiles))
+    for (row_block, columns), tile in zip(tiles, fetched):
+        cells = np.ix_(row_block, columns)
+        keep = missing[cells]
+        result["durations"][cells] = np.where(keep, tile["durations"], result["durations"][cells])
+        result["distances"][cells] = np.where(keep, tile["distances"], result["distances"][cells])
+        result["tiles"] += tile["tiles"]
+        result["fetched_pairs"] += len(row_block) * len(columns)
+    return result
+
+
+def matrix_to_json(matrix: np.ndarray, decimals: int = 2) -> List[List[Optional[float]]]:
+    """Converts a float matrix to nested lists, with NaN (unreachable) as None."""
+    rounded = np.round(matrix, decimals)
+    return [[None if math.isnan(value) else value for value in row] for row in rounded.tolist()]
+
+
+def to_optimization_matrix(matrix: np.ndarray) -> Optional[List[List[int]]]:
+    """
+    Converts a square float matrix to the integer form expected by VROOM.
+
+    Returns None if any pair is unreachable, because VROOM has no way to express
+    a missing edge and the caller should let ORS compute the matrix instead.
+    """
+    if np.isnan(matrix).any():
+        return None
+    return np.rint(matrix).astype(np.int64).tolist()
+
+
+def collect_problem_locations(
+    jobs: List[Dict[str, Any]],
+    vehicles: List[Dict[str, Any]],
+    shipments: Optional[List[Dict[str, Any]]] = None,
+) -> List[Tuple[float, float]]:
+    """Returns the distinct locations referenced by an optimization problem, in first-seen order."""
+    seen: Dict[Tuple[float, float], int] = {}
+
+    def add(location: Optional[Sequence[float]]):
+        if location is not None:
+            seen.setdefault((float(location[0]), float(location[1])), len(seen))
+
+    for vehicle in vehicles:
+        add(vehicle.get("start"))
+        add(vehicle.get("end"))
+    for job in jobs:
+        add(job.get("location"))
+    for shipment in shipments or []:
+        add(shipment.get("pickup", {}).get("location"))
+        add(shipment.get("delivery", {}).get("location"))
+    return list(seen)
+
+
+def attach_location_indices(
+    jobs: List[Dict[str, Any]],
+    vehicles: List[Dict[str, Any]],
+    shipments: Optional[List[Dict[str, Any]]],
+    locations: List[Tuple[float, float]],
+):
+    """Sets ``location_index`` / ``start_index`` / ``end_index`` so VROOM uses a custom matrix."""
+    index = {location: i for i, location in enumerate(locations)}
+
+    def lookup(location: Sequence[float]) -> int:
+        return index[(float(location[0]), float(location[1]))]
+
+    for vehicle in vehicles:
+        if vehicle.get("start") is not None:
+            vehicle["start_index"] = lookup(vehicle["start"])
+        if vehicle.get("end") is not None:
+            vehicle["end_index"] = lookup(vehicle["end"])
+    for job in jobs:
+        if job.get("location") is not None:
+            job["location_index"] = lookup(job["location"])
+    for shipment in shipments or []:
+        for step in ("pickup", "delivery"):
+            if shipment.get(step, {}).get("location") is not None:
+                shipment[step]["location_index"] = lookup(shipment[step]["location"])
@@ -1,49 +1,63 @@
 import os
 import sys
+import asyncio
+import builtins
+import sqlite3
+import math
+import time
+import uuid
 from dotenv import load_dotenv
 import random 
 import openrouteservice
-import requests
 from fastmcp import FastMCP,Context
+from fastmcp.tools.tool import default_serializer
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 from typing import List, Tuple, Optional, Dict, Any, Union
 from loguru import logger
 import json
+import numpy as np
 from datetime import datetime
 
+from ors_http import ORSHttpClient
+from ors_matrix import (
+    fetch_matrix, fetch_matrix_with_store, fetch_sparse_matrix, matrix_to_json, to_optimization_matrix,
+    collect_problem_locations, attach_location_indices
+)
+from ors_solver import (
+    solve_tsp, build_route, build_solution, cheapest_insertion, improve_route,
+    sweep_partition, kmeans_partition, assign_clusters, merge_solutions
+)
+from ors_geo import (
+    estimate_travel_matrices, nearest_k, distance_matrix, split_line, project_onto_line,
+    DETOUR_FACTOR, PROFILE_SPEEDS_MPS, PROFILE_MAX_SPEEDS_MPS
+)
+from ors_jobs import BackgroundJobManager, FINISHED_STATES, SUCCEEDED
+from ors_metrics import ServerMetrics
+from ors_logging import configure_logging
+from ors_singleflight import SingleFlight, canonical_key, gather_or_cancel
+from ors_geometry import (
+    compact_directions, compact_isochrones, split_waypoints, stitch_directions,
+    merge_isochrones, decode_polyline, simplify_indices, GEOMETRY_FORMATS
+)
+from ors_coverage import coverage_analysis
+from ors_poi_categories import POI_CATEGORIES, PoiCategoryIndex
+from ors_cache import (
+    TTLCache, SQLiteGeocodeCache, PoiTileCache, TravelTimeStore,
+    directions_cache_key, normalize_geocode_query, optimization_cache_key
+)
+
 # Load environment variables from .env file
 load_dotenv()
 
 # --- Configure Loguru Logger ---
-# Remove default handler
-logger.remove()
-
-# Add console handler with custom format
-logger.add(
-    sys.stderr,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-    level="INFO",
-    colorize=True
-)
-
-# Add file handler for persistent logging
-logger.add(
-    "logs/ors_mcp_server_{time:YYYY-MM-DD}.log",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-    level="DEBUG",
-    rotation="1 day",
-    retention="30 days",
-    compression="zip",
-    serialize=False
-)
-
-# Add JSON file handler for structured logs
-logger.add(
-    "logs/ors_mcp_server_{time:YYYY-MM-DD}.json",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{function}:{line} | {message}",
-    level="INFO",
-    rotation="1 day",
-    retention="30 days",
-    serialize=True
+# ORS_LOG_PROFILE=production keeps warnings on the console and compact JSON-lines logs on disk,
+# with per-call INFO/SUCCESS records sampled (ORS_LOG_SAMPLE_RATE); all sinks write off the request path
+configure_logging(
+    profile=os.getenv("ORS_LOG_PROFILE", "development"),
+    log_dir=os.getenv("ORS_LOG_DIR", "logs"),
+    level=os.getenv("ORS_LOG_LEVEL") or None,
+    sample_rate=float(os.environ["ORS_LOG_SAMPLE_RATE"]) if os.getenv("ORS_LOG_SAMPLE_RATE") else None
 )
 
 # Configure logger for this module
@@ -64,17 +78,122 @@ if not ORS_API_KEY:
 
 logger.success("ORS API key loaded successfully")
 
+# In-process metrics: tool and upstream latency, in-flight requests, errors and payload sizes
+# (not named `metrics`, which is a parameter of get_distance_matrix)
+server_metrics = ServerMetrics()
+
 try:
-    ors_client = openrouteservice.Client(key=ORS_API_KEY)
+    # Shared async client: pooled keep-alive connections, tuned via ORS_HTTP_* env vars
+    ors_client = ORSHttpClient.from_env(ORS_API_KEY, metrics=server_metrics)
     logger.success("OpenRouteService client initialized successfully")
 except Exception as e:
     logger.error(f"Failed to initialize OpenRouteService client: {e}")
     raise
 
+# --- Response Caches ---
+# Directions are keyed on profile, preference, optimize_waypoints and rounded coordinates
+DIRECTIONS_CACHE_PRECISION = int(os.getenv("ORS_DIRECTIONS_CACHE_PRECISION", "5"))
+directions_cache = TTLCache(
+    maxsize=int(os.getenv("ORS_DIRECTIONS_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("ORS_DIRECTIONS_CACHE_TTL", "3600"))
+)
+
+# Geocoding results persist on disk (SQLite/WAL) and are shared by all worker processes
+geocode_cache = SQLiteGeocodeCache(
+    path=os.getenv("ORS_GEOCODE_CACHE_PATH", os.path.join("cache", "geocode_cache.sqlite3")),
+    ttl=float(os.getenv("ORS_GEOCODE_CACHE_TTL", str(30 * 24 * 3600))),
+    max_entries=int(os.getenv("ORS_GEOCODE_CACHE_SIZE", "50000"))
+)
+
+# Pairwise travel times persist on disk, keyed by profile and rounded coordinates, and fill optimization matrices
+travel_time_store = TravelTimeStore(
+    path=os.getenv("ORS_TRAVEL_TIME_STORE_PATH", os.path.join("cache", "travel_times.sqlite3")),
+    ttl=float(os.getenv("ORS_TRAVEL_TIME_STORE_TTL", str(7 * 24 * 3600))),
+    max_entries=int(os.getenv("ORS_TRAVEL_TIME_STORE_SIZE", "2000000")),
+    precision=int(os.getenv("ORS_TRAVEL_TIME_STORE_PRECISION", "5"))
+)
+
+# Fetch missing pairs for every optimization and send the matrices, instead of only when fully cached.
+# Only while the fill needs at most ORS_TRAVEL_TIME_AUTOFILL_MAX_TILES matrix requests (and fits in the
+# matrix quota), so mostly-cached re-plans are filled while large cold problems are left to ORS
+TRAVEL_TIME_AUTOFILL = os.getenv("ORS_TRAVEL_TIME_AUTOFILL", "true").lower() in ("1", "true", "yes")
+TRAVEL_TIME_AUTOFILL_MAX_TILES = int(os.getenv("ORS_TRAVEL_TIME_AUTOFILL_MAX_TILES", "4"))
+
+# POI responses are indexed per grid tile and category filter so covered queries are answered locally
+poi_cache = PoiTileCache(
+    tile_deg=float(os.getenv("ORS_POI_CACHE_TILE_DEG", "0.02")),
+    ttl=float(os.getenv("ORS_POI_CACHE_TTL", "1800")),
+    max_entries=int(os.getenv("ORS_POI_CACHE_SIZE", "256"))
+)
+
+# Name/id index over the POI taxonomy, built once at startup for find_poi_categories
+poi_category_index = PoiCategoryIndex()
+
+# Solutions of optimize_vehicle_routes keyed by the canonical problem (returned with their readable times)
+optimization_cache = TTLCache(
+    maxsize=int(os.getenv("ORS_OPTIMIZATION_CACHE_SIZE", "128")),
+    ttl=float(os.getenv("ORS_OPTIMIZATION_CACHE_TTL", "1800"))
+)
+
+# Problems behind recent optimization solutions, by solution id, for incremental re-optimization
+optimization_results = TTLCache(
+    maxsize=int(os.getenv("ORS_OPTIMIZATION_RESULTS_SIZE", "64")),
+    ttl=float(os.getenv("ORS_OPTIMIZATION_RESULTS_TTL", "3600"))
+)
+
+# Identical concurrent upstream requests (same canonical arguments) share one ORS call
+inflight = SingleFlight()
+
+# Isochrone responses kept by result id so maps can be rendered on demand with render_isochrone_map
+isochrone_results = TTLCache(
+    maxsize=int(os.getenv("ORS_ISOCHRONE_RESULTS_SIZE", "64")),
+    ttl=float(os.getenv("ORS_ISOCHRONE_RESULTS_TTL", "3600"))
+)
+
+# Waypoint limit of one ORS directions request; longer itineraries are requested in chunks
+DIRECTIONS_MAX_WAYPOINTS = int(os.getenv("ORS_DIRECTIONS_MAX_WAYPOINTS", "50"))
+
+# Location limit of one ORS isochrones request; more centers are requested in chunks
+ISOCHRONES_MAX_LOCATIONS = int(os.getenv("ORS_ISOCHRONES_MAX_LOCATIONS", "5"))
+
+# Raster cells along the longer side of the area in isochrone coverage analysis
+COVERAGE_GRID_SIZE = int(os.getenv("ORS_COVERAGE_GRID_SIZE", "512"))
+
+# Default number of concurrent upstream requests for batch tools
+GEOCODE_BATCH_CONCURRENCY = int(os.getenv("ORS_GEOCODE_BATCH_CONCURRENCY", "5"))
+MATRIX_CONCURRENCY = int(os.getenv("ORS_MATRIX_CONCURRENCY", "4"))
+DIRECTIONS_CHUNK_CONCURRENCY = int(os.getenv("ORS_DIRECTIONS_CHUNK_CONCURRENCY", "4"))
+ISOCHRONE_CHUNK_CONCURRENCY = int(os.getenv("ORS_ISOCHRONE_CHUNK_CONCURRENCY", "4"))
+POI_ROUTE_CONCURRENCY = int(os.getenv("ORS_POI_ROUTE_CONCURRENCY", "4"))
+
+# ORS POI search limits: largest buffer and largest (buffered) search area of one request
+POI_MAX_BUFFER_M = int(os.getenv("ORS_POI_MAX_BUFFER_M", "2000"))
+POI_MAX_AREA_M2 = float(os.getenv("ORS_POI_MAX_AREA_KM2", "50")) * 1e6
+
+# Per-request element limit (sources x destinations) of the ORS matrix endpoint
+MATRIX_MAX_ELEMENTS = int(os.getenv("ORS_MATRIX_MAX_ELEMENTS", "3500"))
+
+# Largest full matrix estimate_distances returns (larger requests must use k)
+ESTIMATE_MAX_ELEMENTS = int(os.getenv("ORS_ESTIMATE_MAX_ELEMENTS", "250000"))
+
+# Number of decomposed VRP sub-problems solved concurrently
+DECOMPOSE_CONCURRENCY = int(os.getenv("ORS_DECOMPOSE_CONCURRENCY", "4"))
+
+# Background optimization jobs: bounded worker pool, results kept for later retrieval
+optimization_jobs = BackgroundJobManager(
+    max_workers=int(os.getenv("ORS_OPTIMIZATION_WORKERS", "2")),
+    max_pending=int(os.getenv("ORS_OPTIMIZATION_MAX_PENDING", "100")),
+    result_ttl=float(os.getenv("ORS_OPTIMIZATION_RESULT_TTL", "3600"))
+)
+
+# Default improvement time budget of the in-process TSP solver
+TSP_TIME_BUDGET_MS = int(os.getenv("ORS_TSP_TIME_BUDGET_MS", "200"))
+
 # --- Initialize FastMCP Server ---
 mcp = FastMCP(
     name="Openrouteservice MCP Server", 
-    description="Provides routing, geocoding, POI services, and vehicle routing optimization via Openrouteservice."
+    description="Provides routing, geocoding, POI services, and vehicle routing optimization via Openrouteservice.",
+    tool_serializer=server_metrics.serializer(default_serializer)
 )
 logger.info("FastMCP server initialized")
 
@@ -83,26 +202,20 @@ _optimization_tools = {}
 
 # --- Utility Functions for Enhanced Logging ---
 def log_request_details(func_name: str, **kwargs):
-    """Log request details in a structured format"""
-    logger.info(
-        f"API Request: {func_name}",
-        extra={
-            "function": func_name,
-            "parameters": {k: v for k, v in kwargs.items() if k != 'ctx'},
-            "timestamp": datetime.now().isoformat()
-        }
+    """Log request details in a structured format (parameters are only collected if a sink accepts INFO)"""
+    logger.bind(function=func_name).opt(lazy=True).info(
+        "API Request: {name}",
+        name=lambda: func_name,
+        parameters=lambda: {k: v for k, v in kwargs.items() if k != 'ctx'}
     )
 
 def log_response_summary(func_name: str, response: Dict[str, Any], success: bool = True):
     """Log response summary"""
     if success:
-        logger.success(
-            f"API Response: {func_name} completed successfully",
-            extra={
-                "function": func_name,
-                "response_keys": list(response.keys()) if isinstance(response, dict) else "non-dict",
-                "timestamp": datetime.now().isoformat()
-            }
+        logger.bind(function=func_name).opt(lazy=True).success(
+            "API Response: {name} completed successfully",
+            name=lambda: func_name,
+            response_keys=lambda: list(response.keys()) if isinstance(response, dict) else "non-dict"
         )
     else:
         logger.error(f"API Response: {func_name} failed")
@@ -272,14 +385,113 @@ def generate_leaflet_html(isochrone_data: Dict[str, Any], output_path: str = Non
     
     return full_path
 
+def isochrone_map_filename(locations: List[Tuple[float, float]]) -> str:
+    """Descriptive map filename based on the first location and the current time"""
+    location_str = f"loc_{locations[0][0]:.4f}_{locations[0][1]:.4f}"
+    time_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"isochrone_{location_str}_{time_str}.html"
+
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-flight
+_background_tasks = set()
+
+def render_map_in_background(isochrone_data: Dict[str, Any], map_filename: str):
+    """Renders the Leaflet map on a worker thread without delaying the tool response"""
+    task = asyncio.create_task(asyncio.to_thread(generate_leaflet_html, isochrone_data, map_filename))
+    _background_tasks.add(task)
+
+    def finished(task: asyncio.Task):
+        _background_tasks.discard(task)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error(f"Failed to generate map {map_filename}: {task.exception()}")
+        else:
+            logger.success("Generated interactive map at: {}", task.result())
+
+    task.add_done_callback(finished)
+
+# --- Define MCP Resources ---
+
+@mcp.resource("ors://cache/stats")
+def get_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters, sizes and TTLs of the server's response caches."""
+    return {
+        "directions": directions_cache.stats(),
+        "geocode": geocode_cache.stats(),
+        "travel_times": travel_time_store.stats(),
+        "pois": poi_cache.stats(),
+        "isochrone_results": isochrone_results.stats(),
+        "optimization": optimization_cache.stats(),
+        "singleflight": inflight.stats()
+    }
+
+@mcp.resource("ors://poi/categories")
+def get_poi_categories() -> Dict[str, Any]:
+    """The POI category taxonomy: group -> {"id", "children": {OSM key: {OSM value: category id}}}."""
+    return POI_CATEGORIES
+
+@mcp.resource("ors://metrics")
+def get_metrics() -> Dict[str, Any]:
+    """Latency histograms (with p50/p95/p99 estimates), in-flight gauges, error counters and payload sizes per tool and ORS endpoint."""
+    return server_metrics.registry.snapshot()
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """Prometheus scrape endpoint (available with the HTTP/SSE transports)."""
+    return PlainTextResponse(server_metrics.registry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 # --- Define MCP Tools ---
 
+async def _fetch_directions_in_chunks(
+    locations: List[Tuple[float, float]],
+    profile: str,
+    preference: str,
+    use_cache: bool
+) -> Dict[str, Any]:
+    """
+    Requests an itinerary longer than the ORS waypoint limit as overlapping chunks,
+    concurrently, and stitches them into one route. Each chunk is cached and
+    coalesced like a get_directions request of its own.
+    """
+    func_logger = logger.bind(function="get_directions")
+    chunks = split_waypoints(len(locations), DIRECTIONS_MAX_WAYPOINTS)
+    func_logger.info("Splitting {} waypoints into {} chunks", len(locations), len(chunks))
+    semaphore = asyncio.Semaphore(DIRECTIONS_CHUNK_CONCURRENCY)
+    
+    async def fetch_chunk(start: int, end: int) -> Dict[str, Any]:
+        chunk = locations[start:end]
+        chunk_key = directions_cache_key(chunk, profile, preference, False, precision=DIRECTIONS_CACHE_PRECISION)
+        if use_cache:
+            cached = directions_cache.get(chunk_key)
+            if cached is not None:
+                return cached
+        
+        async def fetch() -> Dict[str, Any]:
+            async with semaphore:
+                routes = await ors_client.directions(
+                    coordinates=tuple(tuple(coord) for coord in chunk),
+                    profile=profile,
+                    preference=preference
+                )
+            directions_cache.set(chunk_key, routes)
+            return routes
+        
+        return await inflight.run(("directions", chunk_key), fetch)
+    
+    responses = await gather_or_cancel(*(fetch_chunk(start, end) for start, end in chunks))
+    return stitch_directions(responses, locations)
+
 @mcp.tool
+@server_metrics.track_tool
 async def get_directions(
     locations: List[Tuple[float, float]],
     profile: str = "driving-car",
     preference: str = "fastest",
     optimize_waypoints: bool = False,
+    use_cache: bool = True,
+    simplify_zoom: Optional[float] = None,
+    coordinate_precision: Optional[int] = None,
+    geometry_format: Optional[str] = None,
     ctx: Context = None
 ) -> Dict[str, Any]:
     """
@@ -288,9 +500,21 @@ async def get_directions(
     Args:
         locations: A list of (longitude, latitude) tuples representing waypoints.
                    Example: [(8.34234, 48.23424), (8.34423, 48.26424)]
+                   Itineraries longer than the ORS waypoint limit (50) are split into
+                   overlapping chunks, requested concurrently and stitched into one route.
         profile: The routing profile to use (e.g., 'driving-car', 'cycling-regular', 'walking').
         preference: Route preference (e.g., 'fastest', 'shortest').
         optimize_waypoints: If True, optimizes the order of waypoints (Traveling Salesman Problem).
+                            Only within the waypoint limit; order longer itineraries with
+                            optimize_traveling_salesman first.
+        use_cache: If True (default), identical recent requests are answered from the
+                   in-process directions cache. Set False to force a fresh ORS request.
+        simplify_zoom: Optional map zoom level (e.g. 12 for a city, 8 for a region). The route
+                       geometry is simplified (Douglas-Peucker) to what is visible at that zoom;
+                       waypoints and step way_points are preserved and re-indexed.
+        coordinate_precision: Optional number of decimals to round coordinates to (5 is about 1 m).
+        geometry_format: Optional output form of the geometry: 'polyline' (encoded, default for
+                         ORS JSON responses) or 'coordinates' (list of [lon, lat] pairs).
         ctx: The MCP context object for logging.
 
     Returns:
@@ -298,6 +522,7 @@ async def get_directions(
         The response includes:
         - routes: List of routes with distance, duration, and geometry
         - metadata: Information about the request
+        - compaction: Bytes and vertices saved, when any of the geometry options is used
     """
     func_logger = logger.bind(function="get_directions")
     
@@ -307,31 +532,70 @@ async def get_directions(
         locations_count=len(locations),
         profile=profile,
         preference=preference,
-        optimize_waypoints=optimize_waypoints
+        optimize_waypoints=optimize_waypoints,
+        use_cache=use_cache,
+        simplify_zoom=simplify_zoom,
+        coordinate_precision=coordinate_precision,
+        geometry_format=geometry_format
     )
+    if geometry_format is not None and geometry_format not in GEOMETRY_FORMATS:
+        raise ValueError(f"Unknown geometry_format '{geometry_format}', expected one of {GEOMETRY_FORMATS}")
+    chunked = len(locations) > DIRECTIONS_MAX_WAYPOINTS
+    if chunked and optimize_waypoints:
+        raise ValueError(
+            f"optimize_waypoints supports at most {DIRECTIONS_MAX_WAYPOINTS} waypoints, "
+            "order longer itineraries with optimize_traveling_salesman first"
+        )
+    compact = simplify_zoom is not None or coordinate_precision is not None or geometry_format is not None
     
     # Dual logging: both loguru and MCP context
-    func_logger.info(f"Calculating directions for {safe_log_coordinates(locations)} with profile '{profile}'")
+    func_logger.info("Calculating directions for {} with profile '{}'", safe_log_coordinates(locations), profile)
     if ctx:
         await ctx.info(f"Calculating directions for {len(locations)} locations with profile '{profile}'...")
     
+    cache_key = directions_cache_key(
+        locations, profile, preference, optimize_waypoints, precision=DIRECTIONS_CACHE_PRECISION
+    )
+    if use_cache:
+        cached = directions_cache.get(cache_key)
+        if cached is not None:
+            func_logger.info("Directions served from cache")
+            if ctx:
+                await ctx.info("Directions calculation successful (cached).")
+            # The cache keeps full-resolution responses, compaction always works on a copy
+            return compact_directions(cached, simplify_zoom, coordinate_precision, geometry_format) if compact else cached
+    
     try:
         func_logger.debug("Making API call to OpenRouteService directions endpoint")
         
         # Convert list of tuples to tuple of tuples as required by the API
         coords = tuple(tuple(coord) for coord in locations)
         
-        routes = ors_client.directions(
-            coordinates=coords,
-            profile=profile,
-            preference=preference,
-            optimize_waypoints=optimize_waypoints
-        )
+        async def fetch_directions():
+            if chunked:
+                routes = await _fetch_directions_in_chunks(locations, profile, preference, use_cache)
+            else:
+                routes = await ors_client.directions(
+                    coordinates=coords,
+                    profile=profile,
+                    preference=preference,
+                    optimize_waypoints=optimize_waypoints
+                )
+            # Refresh the cache even when it was bypassed for the lookup
+            directions_cache.set(cache_key, routes)
+            return routes
+        
+        # Concurrent identical requests (same cache key) wait for a single ORS call
+        routes = await inflight.run(("directions", cache_key), fetch_directions)
         
         # Log successful response
         log_response_summary("get_directions", routes, success=True)
         func_logger.success("Directions calculation completed successfully")
         
+        if compact:
+            routes = compact_directions(routes, simplify_zoom, coordinate_precision, geometry_format)
+            func_logger.info("Route geometry compacted, {} bytes saved", routes["compaction"]["bytes_saved"])
+        
         if ctx:
             await ctx.info("Directions calculation successful.")
             
@@ -349,8 +613,10 @@ async def get_directions(
         raise
 
 @mcp.tool
+@server_metrics.track_tool
 async def geocode_address(
     text: str,
+    use_cache: bool = True,
     ctx: Context = None
 ) -> Dict[str, Any]:
     """
@@ -358,6 +624,8 @@ async def geocode_address(
 
     Args:
         text: The address or place name to search for (e.g. "Brandenburg Gate, Berlin, Germany").
+        use_cache: If True (default), answers from the persistent geocoding cache when the
+                   normalized query (case/whitespace-insensitive) was resolved before.
         ctx: The MCP context object for logging.
 
     Returns:
@@ -368,22 +636,44 @@ async def geocode_address(
     # Log request details (be careful with addresses for privacy)
     log_request_details(
         "geocode_address",
-        text_length=len(text)
+        text_length=len(text),
+        use_cache=use_cache
     )
     
-    func_logger.info(f"Geocoding address query (length: {len(text)} chars)")
+    func_logger.info("Geocoding address query (length: {} chars)", len(text))
     if ctx:
         await ctx.info(f"Geocoding address: '{text}'")
 
+    if use_cache:
+        try:
+            cached = await asyncio.to_thread(geocode_cache.get, text)
+        except sqlite3.Error as cache_error:
+            func_logger.warning(f"Geocode cache lookup failed: {cache_error}")
+            cached = None
+        if cached is not None:
+            func_logger.info("Geocoding result served from cache")
+            if ctx:
+                await ctx.info("Geocoding successful (cached).")
+            return cached
+
     try:
         func_logger.debug("Making API call to OpenRouteService geocoding endpoint")
         
-        # Simple call to pelias_search with just the text parameter
-        places = ors_client.pelias_search(text=text)
+        async def fetch_places():
+            # Simple call to pelias_search with just the text parameter
+            places = await ors_client.pelias_search(text=text)
+            try:
+                await asyncio.to_thread(geocode_cache.set, text, places)
+            except sqlite3.Error as cache_error:
+                func_logger.warning(f"Failed to store geocoding result in cache: {cache_error}")
+            return places
+        
+        # Queries that normalize to the same cache key share one in-flight request
+        places = await inflight.run(("geocode", normalize_geocode_query(text)), fetch_places)
         
         # Log response summary
         results_count = len(places.get('features', [])) if isinstance(places, dict) else 0
-        func_logger.success(f"Geocoding completed successfully, found {results_count} results")
+        func_logger.success("Geocoding completed successfully, found {} results", results_count)
         log_response_summary("geocode_address", places, success=True)
         
         if ctx:
@@ -403,30 +693,146 @@ async def geocode_address(
         raise
 
 @mcp.tool
+@server_metrics.track_tool
+async def geocode_addresses(
+    texts: List[str],
+    max_concurrency: Optional[int] = None,
+    use_cache: bool = True,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Geocodes many addresses or place names in a single call.
+
+    Duplicate queries (ignoring case and whitespace) are resolved only once and the
+    unique queries are geocoded concurrently. Prefer this over repeated
+    geocode_address calls when you have more than one address.
+
+    Args:
+        texts: The addresses or place names to search for, in any order.
+               Example: ["Brandenburg Gate, Berlin", "Eiffel Tower, Paris"]
+        max_concurrency: Maximum number of geocoding requests in flight at once
+                         (default: ORS_GEOCODE_BATCH_CONCURRENCY, 5).
+        use_cache: If True (default), answers from the persistent geocoding cache when possible.
+        ctx: The MCP context object for logging.
+
+    Returns:
+        A dictionary containing:
+        - results: One entry per input text, in input order, with "query", "result"
+                   (the geocoding response or None) and "error" (message or None)
+        - unique_queries: Number of distinct queries sent for resolution
+        - failed: Number of input texts that could not be geocoded
+    """
+    func_logger = logger.bind(function="geocode_addresses")
+    
+    concurrency = max(1, max_concurrency or GEOCODE_BATCH_CONCURRENCY)
+    
+    # Group input positions by normalized query so duplicates share one lookup
+    unique_queries: Dict[str, str] = {}
+    for text in texts:
+        unique_queries.setdefault(normalize_geocode_query(text), text)
+    
+    log_request_details(
+        "geocode_addresses",
+        texts_count=len(texts),
+        unique_count=len(unique_queries),
+        max_concurrency=concurrency,
+        use_cache=use_cache
+    )
+    func_logger.info("Batch geocoding {} unique queries out of {} inputs", len(unique_queries), len(texts))
+    if ctx:
+        await ctx.info(f"Geocoding {len(unique_queries)} unique addresses (of {len(texts)} given)...")
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    completed = 0
+    
+    async def resolve(query: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        nonlocal completed
+        async with semaphore:
+            try:
+                result = await geocode_address.fn(query, use_cache=use_cache)
+                return result, None
+            except Exception as e:
+                return None, str(e)
+            finally:
+                completed += 1
+                if ctx:
+                    await ctx.report_progress(completed, len(unique_queries))
+    
+    outcomes = await asyncio.gather(*(resolve(query) for query in unique_queries.values()))
+    resolved = dict(zip(unique_queries.keys(), outcomes))
+    
+    results = []
+    for text in texts:
+        result, error = resolved[normalize_geocode_query(text)]
+        results.append({"query": text, "result": result, "error": error})
+    
+    failed = sum(1 for item in results if item["error"] is not None)
+    if failed:
+        func_logger.warning(f"Batch geocoding finished with {failed} failed queries")
+    else:
+        func_logger.success("Batch geocoding completed for {} queries", len(texts))
+    if ctx:
+        await ctx.info(f"Batch geocoding finished: {len(texts) - failed} succeeded, {failed} failed.")
+    
+    return {
+        "results": results,
+        "unique_queries": len(unique_queries),
+        "failed": failed
+    }
+
+@mcp.tool
+@server_metrics.track_tool
 async def get_isochrones(
     locations: List[Tuple[float, float]],
     profile: str = "driving-car",
     range: List[float] = [300],
     range_type: str = "time",
     intervals: int = 1,
+    render_map: bool = False,
+    simplify_zoom: Optional[float] = None,
+    coordinate_precision: Optional[int] = None,
+    geometry_format: Optional[str] = None,
+    coverage: bool = False,
+    include_polygons: bool = True,
     ctx: Context = None
 ) -> Dict[str, Any]:
     """
-    Calculates isochrones (reachability polygons) from specified locations and generates an interactive map.
+    Calculates isochrones (reachability polygons) from specified locations.
 
     Args:
         locations: List of (longitude, latitude) tuples for isochrone centers.
                    Example: [(8.69174, 49.40875)]
+                   More centers than the ORS limit (5 per request) are split into chunks,
+                   requested concurrently and merged into one FeatureCollection.
         profile: The travel profile (e.g., 'driving-car', 'cycling-regular', 'walking').
         range: A list of one or more ranges for the isochrone, in seconds (for time) or meters (for distance).
                Example: [300, 600, 900] for 5, 10, 15 minutes.
         range_type: The type of range: 'time' or 'distance'.
-        intervals: How many intervals to divide the range into for output polygons.
+        intervals: How many equal intervals to divide a single range value into, e.g. 3 with
+                   range [900] gives polygons at 300, 600 and 900. Must be 1 when several
+                   range values are given.
+        render_map: If True, also writes an interactive HTML map to the 'maps' directory.
+                    The map is rendered in the background and does not delay the response,
+                    so the file may not exist yet when the response arrives (map_status
+                    "rendering"); call render_isochrone_map with the result_id instead to
+                    get a path once the file is written.
+        simplify_zoom: Optional map zoom level (e.g. 12 for a city). Polygon outlines are
+                       simplified (Douglas-Peucker) to what is visible at that zoom.
+        coordinate_precision: Optional number of decimals to round coordinates to (5 is about 1 m).
+        geometry_format: Optional 'polyline' to return every ring as an encoded polyline string
+                         (geometry gets "encoding": "polyline"), or 'coordinates' for GeoJSON arrays.
+        coverage: If True, adds a 'coverage' analysis computed locally per range value: summed,
+                  union, intersection and overlap areas (km2), the largest number of overlapping
+                  centers, and each center's own and uniquely covered area.
+        include_polygons: If False, the polygons are left out of the response (useful with
+                          coverage over many centers); they stay available via result_id.
         ctx: The MCP context object for logging.
 
     Returns:
-        A dictionary containing the isochrone response from Openrouteservice.
-        Also generates an interactive HTML map in the 'maps' directory.
+        A dictionary containing the isochrone response from Openrouteservice, plus a
+        'result_id' that can be passed to render_isochrone_map later (and 'map_path'
+        with 'map_status' "rendering" when render_map is True). With any geometry option, a 'compaction' entry
+        reports the bytes and vertices saved.
     """
     func_logger = logger.bind(function="get_isochrones")
     
@@ -437,12 +843,26 @@ async def get_isochrones(
         profile=profile,
         range=range,
         range_type=range_type,
-        intervals=intervals
+        intervals=intervals,
+        render_map=render_map,
+        simplify_zoom=simplify_zoom,
+        coordinate_precision=coordinate_precision,
+        geometry_format=geometry_format,
+        coverage=coverage,
+        include_polygons=include_polygons
     )
+    if geometry_format is not None and geometry_format not in GEOMETRY_FORMATS:
+        raise ValueError(f"Unknown geometry_format '{geometry_format}', expected one of {GEOMETRY_FORMATS}")
+    if intervals < 1:
+        raise ValueError(f"intervals must be at least 1, got {intervals}")
+    if intervals > 1 and len(range) != 1:
+        raise ValueError(f"intervals={intervals} needs exactly one range value, got {len(range)}; list the ranges instead")
+    # ORS takes the interval size in range units, not a count
+    interval = range[0] / intervals if intervals > 1 else None
     
     func_logger.info(
-        f"Calculating isochrones for {len(locations)} locations "
-        f"with profile '{profile}' and {len(range)} range values"
+        "Calculating isochrones for {} locations with profile '{}' and {} range values",
+        len(locations), profile, len(range)
     )
     if ctx:
         await ctx.info(f"Calculating isochrones for {len(locations)} locations with profile '{profile}'...")
@@ -450,34 +870,70 @@ async def get_isochrones(
     try:
         func_logger.debug("Making API call to OpenRouteService isochrones endpoint")
         
-        isochrones = ors_client.isochrones(
-            locations=locations,
-            profile=profile,
-            range=range,
-            range_type=range_type,
-            intervals=intervals
-        )
+        # `range` is the isochrone parameter here, hence builtins.range
+        chunk_starts = list(builtins.range(0, len(locations), ISOCHRONES_MAX_LOCATIONS)) or [0]
+        semaphore = asyncio.Semaphore(ISOCHRONE_CHUNK_CONCURRENCY)
+        
+        async def fetch_chunk(chunk: List[Tuple[float, float]]) -> Dict[str, Any]:
+            async def fetch() -> Dict[str, Any]:
+                async with semaphore:
+                    return await ors_client.isochrones(
+                        locations=chunk,
+                        profile=profile,
+                        range=range,
+                        range_type=range_type,
+                        interval=interval
+                    )
+            
+            return await inflight.run(("isochrones", canonical_key(chunk, profile, range, range_type, interval)), fetch)
+        
+        responses = await gather_or_cancel(*(
+            fetch_chunk(locations[start:start + ISOCHRONES_MAX_LOCATIONS]) for start in chunk_starts
+        ))
+        if len(responses) > 1:
+            func_logger.info("Merged {} isochrone chunks", len(responses))
+            isochrones = merge_isochrones(responses, chunk_starts, locations)
+        else:
+            isochrones = responses[0]
         
         # Log response summary
         features_count = len(isochrones.get('features', [])) if isinstance(isochrones, dict) else 0
-        func_logger.success(f"Isochrones calculation completed successfully, generated {features_count} polygons")
+        func_logger.success("Isochrones calculation completed successfully, generated {} polygons", features_count)
         log_response_summary("get_isochrones", isochrones, success=True)
         
-        # Always generate the map
-        try:
-            # Generate a descriptive filename based on the location and time
-            location_str = f"loc_{locations[0][0]:.4f}_{locations[0][1]:.4f}"
-            time_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-            map_filename = f"isochrone_{location_str}_{time_str}.html"
-            
-            map_path = generate_leaflet_html(isochrones, map_filename)
-            func_logger.success(f"Generated interactive map at: {map_path}")
-            if ctx:
-                await ctx.info(f"Generated interactive map visualization at: {map_path}")
-        except Exception as map_error:
-            func_logger.error(f"Failed to generate map: {map_error}")
+        # Keep the full-resolution response so a map can be rendered on demand without another ORS call
+        result_id = uuid.uuid4().hex
+        isochrone_results.set(result_id, isochrones)
+        if render_map:
+            map_filename = isochrone_map_filename(locations)
+            render_map_in_background(isochrones, map_filename)
+
+        analysis = None
+        if coverage:
+            # Rasterizing hundreds of polygons is CPU-bound, keep it off the event loop
+            analysis = await asyncio.to_thread(coverage_analysis, isochrones.get("features", []), COVERAGE_GRID_SIZE)
+            func_logger.info("Computed isochrone coverage for {} range values", len(analysis))
+
+        if not include_polygons:
+            isochrones = {key: value for key, value in isochrones.items() if key != "features"}
+        elif simplify_zoom is not None or coordinate_precision is not None or geometry_format is not None:
+            isochrones = compact_isochrones(isochrones, simplify_zoom, coordinate_precision, geometry_format)
+            func_logger.info("Isochrone geometry compacted, {} bytes saved", isochrones["compaction"]["bytes_saved"])
+        else:
+            isochrones = {**isochrones}
+        isochrones["result_id"] = result_id
+        if analysis is not None:
+            isochrones["coverage"] = analysis
+
+        if render_map:
+            # Not written yet, the background task only logs a failure
+            isochrones["map_path"] = os.path.join("maps", map_filename)
+            isochrones["map_status"] = "rendering"
             if ctx:
-                await ctx.error(f"Failed to generate map visualization: {map_error}")
+                await ctx.info(
+                    f"Rendering interactive map in the background to: {isochrones['map_path']} "
+                    f"(use render_isochrone_map with result_id {result_id} to wait for the file)"
+                )
         
         if ctx:
             await ctx.info("Isochrones calculation successful.")
@@ -496,11 +952,58 @@ async def get_isochrones(
         raise
 
 @mcp.tool
+@server_metrics.track_tool
+async def render_isochrone_map(
+    result_id: str,
+    output_filename: Optional[str] = None,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Renders an interactive HTML map for a previous get_isochrones result.
+
+    Args:
+        result_id: The 'result_id' returned by get_isochrones (results are kept for a limited time).
+        output_filename: Optional file name inside the 'maps' directory. Defaults to a
+                         timestamped name based on the isochrone center.
+        ctx: The MCP context object for logging.
+
+    Returns:
+        A dictionary with the result_id and the 'map_path' of the generated HTML file.
+    """
+    func_logger = logger.bind(function="render_isochrone_map")
+    log_request_details("render_isochrone_map", result_id=result_id, output_filename=output_filename)
+
+    isochrones = isochrone_results.get(result_id)
+    if isochrones is None:
+        func_logger.warning(f"Unknown or expired isochrone result {result_id}")
+        if ctx:
+            await ctx.error(f"Unknown or expired isochrone result: {result_id}")
+        raise ValueError(f"Unknown or expired isochrone result '{result_id}', call get_isochrones again")
+
+    try:
+        center = isochrones['features'][0]['properties']['center']
+        # Only a file name is accepted, maps are always written inside the 'maps' directory
+        map_filename = os.path.basename(output_filename) if output_filename else isochrone_map_filename([center])
+        # Building the HTML (with the embedded GeoJSON) and writing it happens on a worker thread
+        map_path = await asyncio.to_thread(generate_leaflet_html, isochrones, map_filename)
+        func_logger.success("Generated interactive map at: {}", map_path)
+        if ctx:
+            await ctx.info(f"Generated interactive map visualization at: {map_path}")
+        return {"result_id": result_id, "map_path": map_path}
+    except Exception as e:
+        func_logger.error(f"Failed to generate map: {e}", exc_info=True)
+        if ctx:
+            await ctx.error(f"Failed to generate map visualization: {e}")
+        raise
+
+@mcp.tool
+@server_metrics.track_tool
 async def get_pois(
     coordinates: Tuple[float, float],
     buffer: int = 1000,
     limit: int = 100,
     filters: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True,
     ctx: Context = None
 ) -> Dict[str, Any]:
     """
@@ -522,437 +1025,12 @@ async def get_pois(
                  }
                  Always send the ID(s) as a list, i.e., [id].
 
-                 Commonly used category IDs for **trip planning** include:
-                accomodation:
-    id: 100
-    children:
-        tourism:
-            alpine_hut: 101
-            apartment: 102
-            camp_site: 103
-            caravan_site: 104
-            chalet: 105
-            guest_house: 106
-            hostel: 107
-            hotel: 108
-            motel: 109
-            wilderness_hut: 110
-
-animals:
-    id: 120
-    children:
-        amenity:
-            animal_boarding: 121
-            animal_shelter: 122
-            veterinary: 123
-        shop:
-            pet: 124
-
-arts_and_culture:
-    id: 130
-    children:
-        amenity:
-            arts_centre: 131
-            library: 133
-            place_of_worship: 135
-            studio: 136
-        tourism:
-            gallery: 132
-            museum: 134
-
-education:
-    id: 150
-    children:
-        amenity:
-            college: 151
-            driving_school: 152
-            kindergarten: 153
-            language_school: 154
-            music_school: 155
-            school: 156
-            university: 157
-
-facilities:
-    id: 160
-    children:
-        amenity:
-            compressed_air: 161
-            bench: 162
-            emergency_phone: 163
-            clock: 164
-            drinking_water: 166
-            hunting_stand: 168
-            internet_cafe: 169
-            kneipp_water_cure: 170
-            post_box: 171
-            recycling: 172
-            sanitary_dump_station: 174
-            shelter: 175
-            shower: 176
-            table: 177
-            telephone: 178
-            toilets: 179
-            waste_basket: 180
-            waste_disposal: 181
-            water_point: 182
-        emergency:
-            access_point: 205
-            defibrillator: 165
-            fire_hydrant: 167
-
-financial:
-    id: 190
-    children:
-        amenity:
-            atm: 191
-            bank: 192
-            bureau_de_change: 193
-
-healthcare:
-    id: 200
-    children:
-        amenity:
-            baby_hatch: 201
-            clinic: 202
-            dentist: 203
-            doctors: 204
-            hospital: 206
-            nursing_home: 207
-            pharmacy: 208
-            retirement_home: 209
-            social_facility: 210
-        healthcare:
-            blood_donation: 211
-        healthcare:speciality:
-            vaccination: 212
-        vaccination:
-            covid19: 213
-
-historic:
-    id: 220
-    children:
-        historic:
-            aircraft: 221
-            aqueduct: 222
-            archaeological_site: 223
-            castle: 224
-            cannon: 225
-            city_gate: 226
-            citywalls: 227
-            battlefield: 228
-            boundary_stone: 229
-            building: 230
-            farm: 231
-            fort: 232
-            gallows: 233
-            highwater_mark: 234
-            locomotive: 235
-            manor: 236
-            memorial: 237
-            milestone: 238
-            monastery: 239
-            monument: 240
-            optical_telegraph: 241
-            pillory: 242
-            ruins: 243
-            rune_stone: 244
-            ship: 245
-            tomb: 246
-            wayside_cross: 247
-            wayside_shrine: 248
-            wreck: 249
-
-leisure_and_entertainment:
-    id: 260
-    children:
-        leisure:
-            adult_gaming_centre: 261
-            amusement_arcade: 262
-            beach_resort: 263
-            bandstand: 264
-            bird_hide: 265
-            common: 266
-            dance: 267
-            dog_park: 268
-            firepit: 269
-            fishing: 270
-            fitness_centre: 271
-            garden: 272
-            golf_course: 273
-            hackerspace: 274
-            horse_riding: 275
-            ice_rink: 276
-            marina: 277
-            miniature_golf: 278
-            nature_reserve: 279
-            park: 280
-            picnic_table: 281
-            pitch: 282
-            playground: 283
-            sauna: 286
-            slipway: 287
-            sports_centre: 288
-            stadium: 289
-            summer_camp: 290
-            swimming_area: 291
-            swimming_pool: 292
-            track: 293
-            turkish_bath: 294
-            water_park: 295
-            wildlife_hide: 296
-        highway:
-             raceway: 284
-        amenity:
-            brothel: 297
-            casino: 298
-            cinema: 299
-            dive_centre: 300
-            dojo: 301
-            gambling: 302
-            nightclub: 303
-            planetarium: 304
-            public_bath: 285
-            social_centre: 305
-            spa: 306
-            stripclub: 307
-        tourism:
-            aquarium: 308
-            theme_park: 309
-            zoo: 310
-
-natural:
-    id: 330
-    children:
-        natural:
-            cave_entrance: 331
-            beach: 332
-            geyser: 333
-            peak: 335
-            rock: 336
-            saddle: 337
-            spring: 338
-            volcano: 339
-            water: 340
-
-public_places:
-    id: 360
-    children:
-        amenity:
-            embassy: 361
-            crematorium: 362
-            community_centre: 363
-            courthouse: 364
-            coworking_space: 365
-            crypt: 366
-            fire_station: 367
-            grave_yard: 368
-            police: 369
-            post_office: 370
-            prison: 371
-            ranger_station: 372
-            rescue_station: 373
-            townhall: 374
-
-service:
-    id: 390
-    children:
-        shop:
-            beauty: 391
-            estate_agent: 392
-            dry_cleaning: 393
-            glaziery: 394
-            hairdresser: 395
-            laundry: 396
-            massage: 397
-            tailor: 399
-            tattoo: 400
-        amenity:
-            photo_booth: 398
-
-shops:
-    id: 420
-    children:
-        shop:
-            agrarian: 421
-            alcohol: 422
-            antiques: 423
-            art: 424
-            bag: 425
-            bakery: 426
-            bed: 427
-            beverages: 428
-            bicycle: 429
-            books: 430
-            boutique: 431
-            brewing_supplies: 432
-            business_machines: 433
-            butcher: 434
-            cafe: 435
-            camera: 436
-            candles: 437
-            car: 438
-            car_parts: 439
-            carpet: 440
-            curtain: 441
-            cheese: 442
-            chemist: 443
-            chocolate: 444
-            clothes: 447
-            coffee: 448
-            computer: 449
-            confectionery: 450
-            convenience: 451
-            copyshop: 452
-            cosmetics: 453
-            dairy: 454
-            deli: 455
-            department_store: 456
-            doityourself: 457
-            electrical: 458
-            electronics: 459
-            erotic: 460
-            e-cigarette: 461
-            farm: 462
-            fashion: 463
-            fishing: 464
-            florist: 465
-            funeral_directors: 466
-            furniture: 467
-            games: 468
-            garden_centre: 469
-            garden_furniture: 470
-            gas: 471
-            general: 472
-            gift: 473
-            greengrocer: 474
-            grocery: 475
-            interior_decoration: 476
-            hairdresser_supply: 477
-            hardware: 478
-            hearing_aids: 479
-            herbalist: 480
-            hifi: 481
-            houseware: 482
-            hunting: 483
-            insurance: 484
-            jewelry: 485
-            leather: 486
-            locksmith: 487
-            kiosk: 488
-            kitchen: 489
-            lamps: 490
-            lottery: 491
-            mall: 492
-            medical_supply: 494
-            mobile_phone: 495
-            model: 496
-            motorcycle: 497
-            music: 498
-            musical_instrument: 499
-            nutrition_supplements: 500
-            newsagent: 501
-            optician: 502
-            organic: 503
-            outdoor: 504
-            paint: 505
-            pastry: 506
-            perfumery: 507
-            photo: 508
-            pyrotechnics: 509
-            radiotechnics: 510
-            seafood: 511
-            second_hand: 512
-            security: 513
-            shoes: 514
-            spices: 515
-            sports: 516
-            stationery: 517
-            supermarket: 518
-            swimming_pool: 519
-            tea: 520
-            ticket: 521
-            tiles: 522
-            tobacco: 523
-            toys: 524
-            trophy: 525
-            tyres: 526
-            variety_store: 527
-            video: 529
-            video_games: 530
-            watches: 531
-            weapons: 532
-            wine: 533
-        amenity:
-            marketplace: 493
-            vending_machine: 528
-
-sustenance:
-    id: 560
-    children:
-        amenity:
-            bar: 561
-            bbq: 562
-            biergarten: 563
-            cafe: 564
-            drinking_water: 565
-            fast_food: 566
-            food_court: 567
-            ice_cream: 568
-            pub: 569
-            restaurant: 570
-
-transport:
-    id: 580
-    children:
-        aeroway:
-            aerodrome: 581
-            helipad: 598
-            heliport: 599
-        amenity:
-            bicycle_parking: 583
-            bicycle_rental: 584
-            bicycle_repair_station: 585
-            boat_sharing: 586
-            bus_station: 587
-            bus_stop: 588
-            car_rental: 589
-            car_repair: 590
-            car_sharing: 591
-            car_wash: 592
-            charging_station: 593
-            ev_charging: 594
-            ferry_terminal: 595
-            fuel: 596
-            motorcycle_parking: 600
-            parking: 601
-            parking_entrance: 602
-            parking_space: 603
-            taxi: 606
-        railway:
-            halt: 597
-            station: 604
-            tram_stop: 605
-        public_transport:
-          platform: 607
-          stop_position: 608
-          stop_area: 609
-          station: 610
-
-tourism:
-    id: 620
-    children:
-        tourism:
-            artwork: 621
-            attraction: 622
-            information: 624
-            picnic_site: 625
-            viewpoint: 627
-        amenity:
-            fountain: 623
-        shop:
-            travel_agency: 626
-
-                 These filters help narrow POIs to only those relevant to specific travel needs.
+                 Category groups go under "category_group_ids" instead.
+                 Look IDs up with the find_poi_categories tool (e.g. "hotel" -> 108) or read
+                 the full taxonomy from the ors://poi/categories resource.
+
+        use_cache: If True (default), a search area already covered by recent searches with the
+                   same filters is answered locally from the POI tile cache.
 
         ctx: The MCP context object for logging.
 
@@ -970,13 +1048,27 @@ tourism:
         coordinates=coordinates,
         buffer=buffer,
         limit=limit,
-        filters=filters
+        filters=filters,
+        use_cache=use_cache
     )
     
-    func_logger.info(f"Searching for POIs around coordinates with {buffer}m buffer, limit: {limit}")
+    func_logger.info("Searching for POIs around coordinates with {}m buffer, limit: {}", buffer, limit)
     if ctx:
         await ctx.info(f"Searching for Points of Interest around location within {buffer}m radius...")
 
+    # Normalize a copy, the caller's filters dict is not ours to change
+    if filters and isinstance(filters.get("category_ids"), int):
+        filters = {**filters, "category_ids": [filters["category_ids"]]}
+
+    if use_cache:
+        cached = poi_cache.lookup(coordinates, buffer, limit, filters)
+        if cached is not None:
+            features_count = len(cached["features"])
+            func_logger.info("POI search served from tile cache, {} POIs", features_count)
+            if ctx:
+                await ctx.info(f"POI search successful (cached). Found {features_count} points of interest.")
+            return cached
+
     try:
         func_logger.debug("Making API call to OpenRouteService POIs endpoint")
         
@@ -992,44 +1084,36 @@ tourism:
             },
             "limit": limit
         }
+        if filters:
+            payload["filters"] = filters
         
-        # Add filters if provided
-        if filters and "category_ids" in filters:
-            if isinstance(filters["category_ids"], int):
-                filters["category_ids"] = [filters["category_ids"]]
-
+        # Make the API request
+        # Lazy: the payload is only pretty-printed when a DEBUG sink is active
+        func_logger.opt(lazy=True).debug("Payload being sent to ORS: {}", lambda: json.dumps(payload, indent=2))
+        async def fetch_pois():
+            data = await ors_client.pois(payload)
+            poi_cache.store(coordinates, buffer, limit, filters, data)
+            return data
         
-        # Prepare headers
-        headers = {
-            'Authorization': f'Bearer {ORS_API_KEY}',
-            'Content-Type': 'application/json'
-        }
+        data = await inflight.run(("pois", canonical_key(payload)), fetch_pois)
         
-        # Make the API request
-        url = 'https://api.openrouteservice.org/pois'
-        func_logger.debug(f"Payload being sent to ORS: {json.dumps(payload, indent=2)}")
-        response = requests.post(url, json=payload, headers=headers)
+        # Log response summary
+        features_count = len(data.get('features', []))
+        func_logger.success("POI search completed successfully, found {} POIs", features_count)
+        log_response_summary("get_pois", data, success=True)
         
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Log response summary
-            features_count = len(data.get('features', []))
-            func_logger.success(f"POI search completed successfully, found {features_count} POIs")
-            log_response_summary("get_pois", data, success=True)
-            
-            if ctx:
-                await ctx.info(f"POI search successful. Found {features_count} points of interest.")
-            
-            return data
-        else:
-            error_msg = f"API request failed with status {response.status_code}: {response.text}"
-            func_logger.error(error_msg)
-            if ctx:
-                await ctx.error(f"POI search failed: {error_msg}")
-            raise Exception(error_msg)
+        if ctx:
+            await ctx.info(f"POI search successful. Found {features_count} points of interest.")
+        
+        return data
             
-    except requests.RequestException as req_error:
+    except openrouteservice.exceptions.ApiError as api_error:
+        error_msg = f"API request failed with status {api_error}"
+        func_logger.error(error_msg)
+        if ctx:
+            await ctx.error(f"POI search failed: {error_msg}")
+        raise
+    except (openrouteservice.exceptions.HTTPError, openrouteservice.exceptions.Timeout) as req_error:
         func_logger.error(f"Request error during POI search: {req_error}")
         if ctx:
             await ctx.error(f"Network error during POI search: {req_error}")
@@ -1041,6 +1125,57 @@ tourism:
         raise
 
 @mcp.tool
+@server_metrics.track_tool
+async def find_poi_categories(
+    query: str,
+    limit: int = 10,
+    expand_children: bool = True,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Looks up POI category IDs by name or ID for the get_pois filters.
+
+    Args:
+        query: A category or group name ("hotel", "charging", "sustenance") or an ID ("108").
+               Prefixes, words inside names and misspellings ("restarant") also match.
+               An empty query lists all category groups (without their children).
+
+        limit: Maximum number of matches to return (default: 10).
+
+        expand_children: If True (default), a matched group lists its child categories.
+
+        ctx: The MCP context object for logging.
+
+    Returns:
+        A dictionary containing:
+        - matches: Best matches first, each with id, name, group, osm_key, parent_id (None for
+          groups), match type (id, exact, prefix, word, fuzzy) and score
+        - category_ids: IDs of the matched categories, usable as filters={"category_ids": [...]}
+        - category_group_ids: IDs of the matched groups, usable as filters={"category_group_ids": [...]}
+    """
+    func_logger = logger.bind(function="find_poi_categories")
+    log_request_details("find_poi_categories", query=query, limit=limit, expand_children=expand_children)
+
+    matches = poi_category_index.find(query, limit=limit)
+    # Listing every group with its children would return the whole taxonomy
+    if expand_children and query.strip():
+        for match in matches:
+            children = poi_category_index.expand(match["id"])
+            if children:
+                match["children"] = [
+                    {"id": child["id"], "name": child["name"], "osm_key": child["osm_key"]} for child in children
+                ]
+    func_logger.info("POI category lookup for '{}' matched {} entries", query, len(matches))
+    if ctx:
+        await ctx.info(f"Found {len(matches)} POI categories matching '{query}'")
+    return {
+        "matches": matches,
+        "category_ids": [match["id"] for match in matches if match["parent_id"] is not None],
+        "category_group_ids": [match["id"] for match in matches if match["parent_id"] is None]
+    }
+
+@mcp.tool
+@server_metrics.track_tool
 async def get_poi_names(
     coordinates: Tuple[float, float],
     buffer: int = 1000,
@@ -1063,13 +1198,13 @@ async def get_poi_names(
     """
     func_logger = logger.bind(function="get_poi_names")
     
-    func_logger.info(f"Getting POI names around coordinates with {buffer}m buffer")
+    func_logger.info("Getting POI names around coordinates with {}m buffer", buffer)
     if ctx:
         await ctx.info(f"Extracting POI names within {buffer}m radius...")
 
     try:
-        # Use the main get_pois function
-        data = await get_pois(coordinates, buffer, limit, filters, ctx)
+        # Use the main get_pois function (.fn is the undecorated coroutine behind the tool)
+        data = await get_pois.fn(coordinates, buffer, limit, filters, ctx=ctx)
         
         # Extract names from the response
         features = data.get('features', [])
@@ -1085,7 +1220,7 @@ async def get_poi_names(
             else:
                 names.append("(Unnamed landmark)")
         
-        func_logger.success(f"Extracted {len(names)} POI names")
+        func_logger.success("Extracted {} POI names", len(names))
         if ctx:
             await ctx.info(f"Extracted {len(names)} POI names successfully.")
         
@@ -1097,134 +1232,954 @@ async def get_poi_names(
             await ctx.error(f"Error extracting POI names: {e}")
         raise
 
-# --- NEW OPTIMIZATION TOOLS ---
+def _route_line(routes: Dict[str, Any]) -> List[List[float]]:
+    geometry = routes["routes"][0].get("geometry", [])
+    if isinstance(geometry, str):
+        return decode_polyline(geometry)
+    return geometry.get("coordinates", []) if isinstance(geometry, dict) else geometry
 
 @mcp.tool
-async def optimize_vehicle_routes(
-    jobs: List[Dict[str, Any]],
-    vehicles: List[Dict[str, Any]],
-    shipments: Optional[List[Dict[str, Any]]] = None,
-    matrices: Optional[Dict[str, Any]] = None,
+@server_metrics.track_tool
+async def get_pois_along_route(
+    locations: List[Tuple[float, float]],
+    buffer: int = 500,
+    filters: Optional[Dict[str, Any]] = None,
+    profile: str = "driving-car",
+    preference: str = "fastest",
+    limit_per_segment: int = 200,
+    max_results: Optional[int] = None,
+    use_cache: bool = True,
     ctx: Context = None
 ) -> Dict[str, Any]:
     """
-    Solves Vehicle Routing Problems (VRP) using OpenRouteService's optimization endpoint.
-    
-    This is the main optimization tool that solves complex routing problems with multiple 
-    vehicles, jobs, capacity constraints, time windows, and other real-world constraints.
+    Finds Points of Interest (fuel, food, charging, ...) along the route through the given waypoints.
+
+    The route is computed with get_directions, cut into corridor segments that fit the ORS
+    POI search area limit and all segments are searched concurrently. POIs found by several
+    segments are returned once, ordered by distance along the route.
 
     Args:
-        jobs: List of job objects describing places to visit. Each job should have:
-              - id (int): Unique identifier
-              - location (List[float]): [longitude, latitude] coordinates
-              - Optional: service (int): Service time in seconds
-              - Optional: time_windows (List[List[int]]): Valid time slots [[start, end]]
-              - Optional: amount (List[int]): Multidimensional quantities (e.g., weight, volume)
-              - Optional: skills (List[int]): Required vehicle skills
-              - Optional: priority (int): Priority level 0-100
-              
-        vehicles: List of vehicle objects describing available vehicles. Each vehicle should have:
-                  - id (int): Unique identifier  
-                  - start (List[float]): [longitude, latitude] starting location
-                  - Optional: end (List[float]): [longitude, latitude] ending location
-                  - Optional: capacity (List[int]): Vehicle capacity for each dimension
-                  - Optional: skills (List[int]): Vehicle capabilities
-                  - Optional: time_window (List[int]): Working hours [start, end]
-                  - Optional: profile (str): Routing profile ('driving-car', 'cycling-regular', etc.)
-                  
-        shipments: Optional list of pickup-delivery pairs. Each shipment has:
-                   - pickup: Pickup location details (similar to job)
-                   - delivery: Delivery location details (similar to job)
-                   - Optional: amount (List[int]): Quantities to transport
-                   
-        matrices: Optional custom distance/duration matrices for faster computation.
-                  Format: {"profile": {"durations": [[...]], "distances": [[...]]}}
-                  
+        locations: A list of (longitude, latitude) waypoints, as for get_directions.
+        buffer: Corridor half-width in meters (default: 500m). Maximum is 2000m.
+        filters: Optional POI filters, as for get_pois (e.g. {"category_ids": [596]} for fuel;
+                 look IDs up with find_poi_categories).
+        profile: The routing profile to use (e.g., 'driving-car', 'cycling-regular').
+        preference: Route preference (e.g., 'fastest', 'shortest').
+        limit_per_segment: Maximum number of POIs requested per corridor segment (default: 200).
+        max_results: Optional maximum number of POIs to return (nearest to the start first).
+        use_cache: If True (default), the route may be served from the directions cache.
         ctx: The MCP context object for logging.
 
     Returns:
-        Complete optimization solution including:
-        - code: Status code (0 = success)
-        - summary: Solution statistics (cost, routes, unassigned tasks)
-        - routes: Detailed route information for each vehicle
-        - unassigned: Tasks that couldn't be assigned
-    
-    Example:
-        Simple 3-job, 1-vehicle problem:
-        jobs = [
-            {"id": 1, "location": [2.35, 48.86], "service": 300},
-            {"id": 2, "location": [2.28, 48.87], "service": 400}, 
-            {"id": 3, "location": [2.36, 48.84], "service": 500}
-        ]
-        vehicles = [
-            {"id": 1, "start": [2.35, 48.85], "end": [2.35, 48.85]}
-        ]
+        A GeoJSON FeatureCollection of POIs ordered along the route. Each feature's properties
+        gain "distance_along_route" and "distance_from_route" (meters). Also contains:
+        - route: distance and duration of the route
+        - corridor: buffer, segment count and length, duplicates removed and the number of
+          saturated segments (segments that hit limit_per_segment and may miss POIs)
     """
-    func_logger = logger.bind(function="optimize_vehicle_routes")
+    func_logger = logger.bind(function="get_pois_along_route")
+    log_request_details(
+        "get_pois_along_route",
+        locations_count=len(locations),
+        buffer=buffer,
+        filters=filters,
+        profile=profile,
+        preference=preference,
+        limit_per_segment=limit_per_segment,
+        max_results=max_results,
+        use_cache=use_cache
+    )
+    if not 0 < buffer <= POI_MAX_BUFFER_M:
+        raise ValueError(f"buffer must be between 1 and {POI_MAX_BUFFER_M} meters")
+    if filters and isinstance(filters.get("category_ids"), int):
+        filters = {**filters, "category_ids": [filters["category_ids"]]}
     
     try:
-        # Ensure each vehicle has a profile
-        for vehicle in vehicles:
-            if 'profile' not in vehicle:
-                vehicle['profile'] = 'driving-car'  # Set default profile
+        routes = await get_directions.fn(
+            locations=locations, profile=profile, preference=preference, use_cache=use_cache
+        )
+        line = _route_line(routes)
+        # Largest corridor length whose buffered area (2 * buffer * length plus the end caps) fits one request
+        segment_m = max(float(buffer), (POI_MAX_AREA_M2 - math.pi * buffer ** 2) / (2 * buffer))
+        # The corridor does not need full route resolution; a tenth of the buffer keeps payloads small
+        simplified = [line[i] for i in simplify_indices(line, buffer / 10)] if len(line) > 2 else line
+        segments = split_line(simplified, segment_m)
+        func_logger.info(
+            "Searching POIs along a {:.1f} km route in {} corridor segments of up to {:.1f} km",
+            routes["routes"][0].get("summary", {}).get("distance", 0) / 1000, len(segments), segment_m / 1000
+        )
+        if ctx:
+            await ctx.info(f"Searching POIs along the route in {len(segments)} corridor segments...")
         
-        # Build the optimization request payload
-        payload = {
-            "jobs": jobs,
-            "vehicles": vehicles
-        }
+        semaphore = asyncio.Semaphore(POI_ROUTE_CONCURRENCY)
         
-        # Add optional components
-        if shipments:
-            payload["shipments"] = shipments
-        if matrices:
-            payload["matrices"] = matrices
+        async def search_segment(segment: List[List[float]]) -> List[Dict[str, Any]]:
+            payload = {
+                "request": "pois",
+                "geometry": {
+                    "geojson": {"type": "LineString", "coordinates": segment},
+                    "buffer": buffer
+                },
+                "limit": limit_per_segment
+            }
+            if filters:
+                payload["filters"] = filters
             
-        # Prepare headers
-        headers = {
-            'Authorization': f'Bearer {ORS_API_KEY}',
-            'Content-Type': 'application/json'
-        }
+            async def fetch() -> Dict[str, Any]:
+                async with semaphore:
+                    return await ors_client.pois(payload)
+            
+            data = await inflight.run(("pois", canonical_key(payload)), fetch)
+            return data.get("features", [])
         
-        # Make the API request
-        url = 'https://api.openrouteservice.org/optimization'
-        func_logger.debug(f"Sending optimization request to: {url}")
+        results = await gather_or_cancel(*(search_segment(segment) for segment in segments))
         
-        response = requests.post(url, json=payload, headers=headers)
+        # Neighbouring segments overlap at their joints; keep each OSM object once
+        unique: Dict[Any, Dict[str, Any]] = {}
+        for features in results:
+            for feature in features:
+                properties = feature.get("properties", {})
+                key = (properties.get("osm_type"), properties.get("osm_id"))
+                if properties.get("osm_id") is None:
+                    key = tuple(feature["geometry"]["coordinates"])
+                unique.setdefault(key, feature)
+        features = list(unique.values())
+        duplicates = sum(len(segment_features) for segment_features in results) - len(features)
         
-        if response.status_code == 200:
-            data = response.json()
-            
-            # Add human-readable timing information
-            if 'routes' in data:
-                for route in data['routes']:
-                    for step in route['steps']:
-                        if 'arrival' in step:
-                            # Convert seconds to HH:MM:SS format
-                            step['arrival_time'] = f"{step['arrival']//3600:02d}:{(step['arrival']%3600)//60:02d}:{step['arrival']%60:02d}"
-                        if 'duration' in step:
-                            step['duration_time'] = f"{step['duration']//3600:02d}:{(step['duration']%3600)//60:02d}:{step['duration']%60:02d}"
-            
-            return data
-        else:
-            error_msg = f"Optimization API request failed with status {response.status_code}: {response.text}"
-            func_logger.error(error_msg)
-            if ctx:
-                await ctx.error(f"Optimization failed: {error_msg}")
-            raise Exception(error_msg)
-            
+        along, offset = project_onto_line([feature["geometry"]["coordinates"] for feature in features], line)
+        ranked = []
+        for feature, along_m, offset_m in zip(features, along.tolist(), offset.tolist()):
+            # Copy so shared singleflight results are not mutated
+            properties = {
+                **feature.get("properties", {}),
+                "distance_along_route": round(along_m, 1),
+                "distance_from_route": round(offset_m, 1)
+            }
+            ranked.append({**feature, "properties": properties})
+        ranked.sort(key=lambda feature: feature["properties"]["distance_along_route"])
+        if max_results is not None:
+            ranked = ranked[:max_results]
+        
+        saturated = sum(1 for segment_features in results if len(segment_features) >= limit_per_segment)
+        summary = routes["routes"][0].get("summary", {})
+        func_logger.success(
+            "Found {} POIs along the route ({} duplicates removed, {} saturated segments)",
+            len(unique), duplicates, saturated
+        )
+        if ctx:
+            await ctx.info(f"Found {len(unique)} points of interest along the route.")
+        return {
+            "type": "FeatureCollection",
+            "features": ranked,
+            "route": {"distance": summary.get("distance"), "duration": summary.get("duration")},
+            "corridor": {
+                "buffer": buffer,
+                "segments": len(segments),
+                "segment_length": round(segment_m, 1),
+                "duplicates_removed": duplicates,
+                "saturated_segments": saturated
+            }
+        }
     except Exception as e:
-        func_logger.error(f"Error during VRP optimization: {e}", exc_info=True)
+        func_logger.error(f"Error searching for POIs along the route: {e}", exc_info=True)
         if ctx:
-            await ctx.error(f"Error during optimization: {e}")
+            await ctx.error(f"Error searching for POIs along the route: {e}")
         raise
 
-# Store the tool reference
-_optimization_tools['optimize_vehicle_routes'] = optimize_vehicle_routes
-
 @mcp.tool
-async def create_simple_delivery_problem(
-    delivery_locations: List[Tuple[float, float]],
+@server_metrics.track_tool
+async def get_distance_matrix(
+    locations: List[Tuple[float, float]],
+    sources: Optional[List[int]] = None,
+    destinations: Optional[List[int]] = None,
+    profile: str = "driving-car",
+    metrics: Optional[List[str]] = None,
+    include_optimization_matrices: bool = False,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Computes a travel duration/distance matrix between many locations using OpenRouteService.
+
+    Large matrices are split into tiles that fit the ORS per-request limit, fetched
+    concurrently and assembled into one dense matrix, so e.g. 300x300 works in one call.
+
+    Args:
+        locations: List of (longitude, latitude) tuples.
+                   Example: [(8.681495, 49.41461), (8.686507, 49.41943), (8.687872, 49.420318)]
+        sources: Optional indices into `locations` used as origins (default: all locations).
+        destinations: Optional indices into `locations` used as destinations (default: all locations).
+        profile: The routing profile (e.g., 'driving-car', 'cycling-regular', 'foot-walking').
+        metrics: Which metrics to compute: 'duration' (seconds) and/or 'distance' (meters)
+                 (default: both).
+        include_optimization_matrices: If True and the matrix covers all locations in both
+                   directions, also returns "optimization_matrices", ready to pass as the
+                   `matrices` argument of optimize_vehicle_routes. Jobs and vehicles must then
+                   reference locations via location_index / start_index / end_index.
+        ctx: The MCP context object for logging.
+
+    Returns:
+        A dictionary containing:
+        - durations / distances: Matrix rows per source, columns per destination
+                                 (None where a pair is unreachable)
+        - sources / destinations: The location indices of rows and columns
+        - tiles: Number of ORS matrix requests used
+        - optimization_matrices: Only when requested, {profile: {"durations": ..., "distances": ...}}
+    """
+    func_logger = logger.bind(function="get_distance_matrix")
+    
+    source_indices = list(range(len(locations))) if sources is None else list(sources)
+    destination_indices = list(range(len(locations))) if destinations is None else list(destinations)
+    metrics = ["duration", "distance"] if metrics is None else list(metrics)
+    
+    log_request_details(
+        "get_distance_matrix",
+        locations_count=len(locations),
+        sources_count=len(source_indices),
+        destinations_count=len(destination_indices),
+        profile=profile,
+        metrics=metrics
+    )
+    func_logger.info("Computing {}x{} matrix with profile '{}'", len(source_indices), len(destination_indices), profile)
+    if ctx:
+        await ctx.info(f"Computing {len(source_indices)}x{len(destination_indices)} travel matrix...")
+
+    try:
+        result = await fetch_matrix(
+            ors_client,
+            [locations[i] for i in source_indices],
+            [locations[i] for i in destination_indices],
+            profile=profile,
+            metrics=metrics,
+            max_elements=MATRIX_MAX_ELEMENTS,
+            concurrency=MATRIX_CONCURRENCY
+        )
+        
+        response: Dict[str, Any] = {
+            "sources": source_indices,
+            "destinations": destination_indices,
+            "profile": profile,
+            "tiles": result["tiles"]
+        }
+        for metric in metrics:
+            response[f"{metric}s"] = matrix_to_json(result[f"{metric}s"])
+        
+        if include_optimization_matrices:
+            is_full_square = source_indices == destination_indices == list(range(len(locations)))
+            optimization_matrix = {
+                f"{metric}s": to_optimization_matrix(result[f"{metric}s"]) for metric in metrics
+            }
+            if is_full_square and all(value is not None for value in optimization_matrix.values()):
+                response["optimization_matrices"] = {profile: optimization_matrix}
+            else:
+                func_logger.warning("Matrix is not a complete square over all locations, optimization matrices omitted")
+        
+        func_logger.success("Matrix computed with {} tile requests", result['tiles'])
+        log_response_summary("get_distance_matrix", response, success=True)
+        if ctx:
+            await ctx.info(f"Matrix calculation successful ({result['tiles']} requests).")
+        
+        return response
+
+    except openrouteservice.exceptions.ApiError as api_error:
+        func_logger.error(f"OpenRouteService API error during matrix calculation: {api_error}")
+        if ctx:
+            await ctx.error(f"API error calculating matrix: {api_error}")
+        raise
+    except Exception as e:
+        func_logger.error(f"Error calculating matrix: {e}", exc_info=True)
+        if ctx:
+            await ctx.error(f"Error calculating matrix: {e}")
+        raise
+
+@mcp.tool
+@server_metrics.track_tool
+async def estimate_distances(
+    origins: List[Tuple[float, float]],
+    destinations: Optional[List[Tuple[float, float]]] = None,
+    profile: str = "driving-car",
+    method: str = "haversine",
+    k: Optional[int] = None,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Estimates straight-line distances and rough travel times locally, without any ORS request.
+
+    Use this to triage candidates cheaply (e.g. find the closest stores to a customer)
+    before spending routing quota on get_directions or get_distance_matrix.
+
+    Args:
+        origins: List of (longitude, latitude) tuples.
+        destinations: Optional list of (longitude, latitude) tuples (default: the origins).
+        profile: Routing profile used to turn distance into an estimated duration
+                 (e.g., 'driving-car', 'cycling-regular', 'foot-walking').
+        method: 'haversine' (exact great-circle) or 'equirectangular' (faster approximation).
+        k: If given, returns only the k nearest destinations per origin instead of the full matrix.
+        ctx: The MCP context object for logging.
+
+    Returns:
+        Without k: "distances" (meters, straight line) and "durations" (seconds, estimated)
+        as origin x destination matrices.
+        With k: "nearest", one entry per origin listing destination "index",
+        "distance" and "duration" sorted by distance.
+        Durations assume the straight line times a detour factor at a typical profile speed.
+    """
+    func_logger = logger.bind(function="estimate_distances")
+    targets = origins if destinations is None else destinations
+    
+    log_request_details(
+        "estimate_distances",
+        origins_count=len(origins),
+        destinations_count=len(targets),
+        profile=profile,
+        method=method,
+        k=k
+    )
+    
+    speed = PROFILE_SPEEDS_MPS.get(profile, PROFILE_SPEEDS_MPS["driving-car"])
+    response: Dict[str, Any] = {
+        "profile": profile,
+        "method": method,
+        "detour_factor": DETOUR_FACTOR,
+        "speed_mps": speed
+    }
+    
+    try:
+        if k is not None:
+            indices, distances = nearest_k(origins, targets, k, method=method)
+            durations = distances * DETOUR_FACTOR / speed
+            response["nearest"] = [
+                {
+                    "origin": i,
+                    "destinations": [
+                        {"index": int(j), "distance": round(float(d), 1), "duration": round(float(t), 1)}
+                        for j, d, t in zip(indices[i], distances[i], durations[i])
+                    ]
+                }
+                for i in range(len(origins))
+            ]
+        else:
+            if len(origins) * len(targets) > ESTIMATE_MAX_ELEMENTS:
+                raise ValueError(
+                    f"{len(origins)}x{len(targets)} matrix exceeds {ESTIMATE_MAX_ELEMENTS} elements, pass k to get nearest destinations only"
+                )
+            durations, distances = estimate_travel_matrices(origins, targets, profile=profile, method=method)
+            response["distances"] = np.round(distances / DETOUR_FACTOR, 1).tolist()
+            response["durations"] = np.round(durations, 1).tolist()
+        
+        func_logger.success("Estimated distances for {}x{} pairs", len(origins), len(targets))
+        return response
+    
+    except Exception as e:
+        func_logger.error(f"Error estimating distances: {e}", exc_info=True)
+        if ctx:
+            await ctx.error(f"Error estimating distances: {e}")
+        raise
+
+@mcp.tool
+@server_metrics.track_tool
+async def find_reachable_candidates(
+    origins: List[Tuple[float, float]],
+    candidates: List[Tuple[float, float]],
+    max_range: float,
+    range_type: str = "time",
+    profile: str = "driving-car",
+    max_speed_kmh: Optional[float] = None,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Finds which candidates can be reached from which origins within a travel time or distance.
+
+    Answers questions like "which of these 500 customers are within 20 minutes of any of our
+    10 depots?" without isochrones. Pairs that are too far apart in a straight line to be
+    reachable are pruned locally; only the remaining pairs are routed, with the ORS matrix
+    endpoint in concurrent tiles (pairs already known from earlier matrices are reused).
+
+    Args:
+        origins: List of (longitude, latitude) tuples, e.g. depots.
+        candidates: List of (longitude, latitude) tuples to test, e.g. customers.
+        max_range: The limit, in seconds (range_type 'time') or meters (range_type 'distance').
+                   Example: 1200 for 20 minutes.
+        range_type: 'time' (travel duration) or 'distance' (network distance).
+        profile: The routing profile (e.g., 'driving-car', 'cycling-regular', 'foot-walking').
+        max_speed_kmh: Optional top speed of the profile used by the time pre-filter
+                       (default: a safe upper bound per profile, e.g. 150 km/h for cars).
+        ctx: The MCP context object for logging.
+
+    Returns:
+        A dictionary containing:
+        - reachable: Only origins that reach something, {origin index: [{"index", "duration",
+          "distance"}, ...]} ordered by the range metric
+        - candidates: Every reachable candidate once, with its closest "origin"
+        - unreachable_candidates: Number of candidates no origin reaches
+        - stats: pairs, pruned_pairs (straight-line filter), cached_pairs, fetched_pairs, tiles
+    """
+    func_logger = logger.bind(function="find_reachable_candidates")
+    log_request_details(
+        "find_reachable_candidates",
+        origins_count=len(origins),
+        candidates_count=len(candidates),
+        max_range=max_range,
+        range_type=range_type,
+        profile=profile,
+        max_speed_kmh=max_speed_kmh
+    )
+    if range_type not in ("time", "distance"):
+        raise ValueError(f"Unknown range_type '{range_type}', expected 'time' or 'distance'")
+    if max_range <= 0:
+        raise ValueError("max_range must be positive")
+    
+    # Network distance is never shorter than the straight line, so anything beyond this radius is out of range
+    if range_type == "time":
+        speed = max_speed_kmh / 3.6 if max_speed_kmh else PROFILE_MAX_SPEEDS_MPS.get(profile, PROFILE_MAX_SPEEDS_MPS["driving-car"])
+        radius = max_range * speed
+    else:
+        radius = max_range
+    
+    try:
+        wanted = np.zeros((len(origins), len(candidates)), dtype=bool)
+        rows = max(1, 1_000_000 // max(1, len(candidates)))
+        for r0 in range(0, len(origins), rows):
+            wanted[r0:r0 + rows] = distance_matrix(origins[r0:r0 + rows], candidates) <= radius
+        pairs = wanted.size
+        func_logger.info(
+            "Straight-line filter kept {} of {} pairs within {:.1f} km", int(wanted.sum()), pairs, radius / 1000
+        )
+        if ctx:
+            await ctx.info(f"Routing {int(wanted.sum())} of {pairs} origin-candidate pairs...")
+        
+        result = await fetch_sparse_matrix(
+            ors_client,
+            travel_time_store,
+            origins,
+            candidates,
+            wanted,
+            profile=profile,
+            max_elements=MATRIX_MAX_ELEMENTS,
+            concurrency=MATRIX_CONCURRENCY
+        )
+        durations, distances = result["durations"], result["distances"]
+        metric = durations if range_type == "time" else distances
+        # NaN (pruned or unreachable) compares False
+        with np.errstate(invalid="ignore"):
+            within = metric <= max_range
+        
+        reachable: Dict[str, List[Dict[str, Any]]] = {}
+        for i in np.flatnonzero(within.any(axis=1)):
+            columns = np.flatnonzero(within[i])
+            columns = columns[np.argsort(metric[i, columns], kind="stable")]
+            reachable[str(int(i))] = [
+                {"index": int(j), "duration": round(float(durations[i, j]), 1), "distance": round(float(distances[i, j]), 1)}
+                for j in columns
+            ]
+        reached = np.flatnonzero(within.any(axis=0))
+        closest = np.nanargmin(np.where(within[:, reached], metric[:, reached], np.nan), axis=0) if len(reached) else []
+        reachable_candidates = [
+            {
+                "index": int(j),
+                "origin": int(i),
+                "duration": round(float(durations[i, j]), 1),
+                "distance": round(float(distances[i, j]), 1)
+            }
+            for j, i in zip(reached, closest)
+        ]
+        
+        stats = {
+            "pairs": pairs,
+            "pruned_pairs": pairs - int(wanted.sum()),
+            "cached_pairs": result["cached_pairs"],
+            "fetched_pairs": result["fetched_pairs"],
+            "tiles": result["tiles"]
+        }
+        func_logger.success(
+            "{} of {} candidates reachable, {} tile requests", len(reachable_candidates), len(candidates), result["tiles"]
+        )
+        if ctx:
+            await ctx.info(f"{len(reachable_candidates)} of {len(candidates)} candidates are reachable.")
+        return {
+            "profile": profile,
+            "max_range": max_range,
+            "range_type": range_type,
+            "reachable": reachable,
+            "candidates": reachable_candidates,
+            "unreachable_candidates": len(candidates) - len(reachable_candidates),
+            "stats": stats
+        }
+    
+    except Exception as e:
+        func_logger.error(f"Error finding reachable candidates: {e}", exc_info=True)
+        if ctx:
+            await ctx.error(f"Error finding reachable candidates: {e}")
+        raise
+
+# --- NEW OPTIMIZATION TOOLS ---
+
+def _task_amount(task: Dict[str, Any]) -> float:
+    """First dimension of a job/shipment amount, used to balance decomposed sub-problems"""
+    for key in ("delivery", "pickup", "amount"):
+        if task.get(key):
+            return float(task[key][0])
+    return 1.0
+
+def _unassigned_entries(job_ids: List[Any], shipment_tasks: List[Dict[str, Any]], reason: str) -> List[Dict[str, Any]]:
+    entries = [{"id": job_id, "type": "job", "reason": reason} for job_id in job_ids]
+    for shipment in shipment_tasks:
+        for step in ("pickup", "delivery"):
+            entries.append({"id": shipment.get(step, {}).get("id"), "type": step, "reason": reason})
+    return entries
+
+def _localize_matrices(subproblem: Dict[str, Any], matrices: Optional[Dict[str, Any]]) -> Optional[List[int]]:
+    """
+    Gives a decomposed sub-problem only the rows and columns of the locations it uses.
+
+    The sub-problem's jobs, shipments and vehicle are replaced by copies whose
+    location_index / start_index / end_index are renumbered into the sliced
+    matrices, which keep only the vehicle's profile. Returns the original matrix
+    index of each sliced row (to map the solution back), or None without matrices.
+    """
+    if not matrices:
+        return None
+    jobs = [dict(job) for job in subproblem["jobs"]]
+    shipments = [
+        {**shipment, "pickup": dict(shipment["pickup"]), "delivery": dict(shipment["delivery"])}
+        for shipment in subproblem.get("shipments", [])
+    ]
+    vehicle = dict(subproblem["vehicles"][0])
+    references = [(job, "location_index") for job in jobs]
+    references += [(shipment[step], "location_index") for shipment in shipments for step in ("pickup", "delivery")]
+    references += [(vehicle, "start_index"), (vehicle, "end_index")]
+    references = [(entry, key) for entry, key in references if entry.get(key) is not None]
+    
+    used = sorted({int(entry[key]) for entry, key in references})
+    position = {index: i for i, index in enumerate(used)}
+    for entry, key in references:
+        entry[key] = position[int(entry[key])]
+    profile = vehicle.get("profile", "driving-car")
+    subproblem["matrices"] = {
+        name: {kind: np.asarray(matrix)[np.ix_(used, used)].tolist() for kind, matrix in profile_matrices.items()}
+        for name, profile_matrices in matrices.items()
+        if name == profile
+    }
+    subproblem["jobs"], subproblem["vehicles"] = jobs, [vehicle]
+    if shipments:
+        subproblem["shipments"] = shipments
+    return used
+
+async def _solve_decomposed(
+    payload: Dict[str, Any],
+    method: str,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Cluster-and-conquer: partitions jobs/shipments across vehicles, solves one
+    single-vehicle sub-problem per cluster concurrently and merges the results.
+    """
+    func_logger = logger.bind(function="optimize_vehicle_routes")
+    jobs = payload["jobs"]
+    shipments = payload.get("shipments") or []
+    vehicles = payload["vehicles"]
+    
+    # Shipments move as a unit, clustered by their pickup location
+    tasks = [("job", job) for job in jobs] + [("shipment", shipment) for shipment in shipments]
+    try:
+        points = np.array([
+            task["location"] if kind == "job" else task["pickup"]["location"]
+            for kind, task in tasks
+        ], dtype=float)
+    except KeyError:
+        raise ValueError("Decomposition needs a 'location' on every job and shipment pickup")
+    
+    depots = np.array([
+        vehicle.get("start") or vehicle.get("end") or points.mean(axis=0).tolist()
+        for vehicle in vehicles
+    ], dtype=float)
+    
+    if method == "sweep":
+        capacities = [vehicle.get("capacity") for vehicle in vehicles]
+        shares = [float(c[0]) for c in capacities] if all(capacities) else [1.0] * len(vehicles)
+        weights = np.array([_task_amount(task) for _, task in tasks])
+        vehicle_groups = sweep_partition(points, shares, center=depots.mean(axis=0), weights=weights)
+    elif method == "kmeans":
+        groups, centroids = kmeans_partition(points, len(vehicles))
+        assignment = assign_clusters(centroids, depots)
+        vehicle_groups = [[] for _ in vehicles]
+        for group, vehicle_index in zip(groups, assignment):
+            vehicle_groups[vehicle_index] = group
+    else:
+        raise ValueError(f"Unknown decomposition '{method}', expected 'sweep' or 'kmeans'")
+    
+    shared = {key: value for key, value in payload.items() if key not in ("jobs", "shipments", "vehicles", "matrices")}
+    subproblems = []
+    location_maps = []
+    for vehicle, members in zip(vehicles, vehicle_groups):
+        if not members:
+            continue
+        sub_jobs = [tasks[i][1] for i in members if tasks[i][0] == "job"]
+        sub_shipments = [tasks[i][1] for i in members if tasks[i][0] == "shipment"]
+        subproblem = {**shared, "jobs": sub_jobs, "vehicles": [vehicle]}
+        if sub_shipments:
+            subproblem["shipments"] = sub_shipments
+        location_maps.append(_localize_matrices(subproblem, payload.get("matrices")))
+        subproblems.append(subproblem)
+    
+    func_logger.info("Decomposed {} tasks into {} sub-problems using '{}'", len(tasks), len(subproblems), method)
+    if ctx:
+        await ctx.info(f"Solving {len(subproblems)} sub-problems concurrently...")
+    
+    semaphore = asyncio.Semaphore(DECOMPOSE_CONCURRENCY)
+    completed = 0
+    
+    async def solve(subproblem: Dict[str, Any], used: Optional[List[int]]) -> Optional[Dict[str, Any]]:
+        nonlocal completed
+        async with semaphore:
+            try:
+                result = await ors_client.optimization(subproblem)
+                # Steps refer to the sliced matrix, point them back at the full one
+                if used is not None:
+                    for route in result.get("routes", []):
+                        for step in route.get("steps", []):
+                            if "location_index" in step:
+                                step["location_index"] = used[step["location_index"]]
+                return result
+            except (
+                openrouteservice.exceptions.ApiError,
+                openrouteservice.exceptions.HTTPError,
+                openrouteservice.exceptions.Timeout
+            ) as request_error:
+                # An upstream failure only costs this vehicle's tasks; anything else aborts every solve
+                func_logger.error(f"Sub-problem for vehicle {subproblem['vehicles'][0]['id']} failed: {request_error!r}")
+                return None
+            finally:
+                completed += 1
+                if ctx:
+                    await ctx.report_progress(completed, len(subproblems))
+    
+    results = await gather_or_cancel(*(solve(subproblem, used) for subproblem, used in zip(subproblems, location_maps)))
+    
+    failed_unassigned = []
+    failed_vehicles = []
+    for subproblem, result in zip(subproblems, results):
+        if result is None:
+            failed_vehicles.append(subproblem["vehicles"][0]["id"])
+            failed_unassigned.extend(_unassigned_entries(
+                [job["id"] for job in subproblem["jobs"]],
+                subproblem.get("shipments", []),
+                "sub-problem failed"
+            ))
+    
+    merged = merge_solutions([result for result in results if result is not None], failed_unassigned)
+    merged["decomposition"] = {
+        "method": method,
+        "subproblems": len(subproblems),
+        "failed_vehicles": failed_vehicles
+    }
+    return merged
+
+def add_readable_times(solution: Dict[str, Any]) -> Dict[str, Any]:
+    """Adds HH:MM:SS `arrival_time` / `duration_time` fields to every step of an optimization solution"""
+    if 'routes' in solution:
+        for route in solution['routes']:
+            for step in route['steps']:
+                if 'arrival' in step:
+                    # Convert seconds to HH:MM:SS format
+                    step['arrival_time'] = f"{step['arrival']//3600:02d}:{(step['arrival']%3600)//60:02d}:{step['arrival']%60:02d}"
+                if 'duration' in step:
+                    step['duration_time'] = f"{step['duration']//3600:02d}:{(step['duration']%3600)//60:02d}:{step['duration']%60:02d}"
+    return solution
+
+async def _travel_matrices(
+    points: List[Tuple[float, float]],
+    profile: str,
+    matrix_source: str
+) -> Tuple[Any, Any]:
+    """
+    Returns (durations, distances) NumPy matrices between all points.
+
+    matrix_source is 'ors' (travel-time store, missing pairs from the tiled ORS matrix endpoint)
+    or 'haversine' (straight-line estimate, no ORS call).
+    """
+    if matrix_source == "haversine":
+        return estimate_travel_matrices(points, profile=profile)
+    if matrix_source != "ors":
+        raise ValueError(f"Unknown matrix_source '{matrix_source}', expected 'ors' or 'haversine'")
+    result = await fetch_matrix_with_store(
+        ors_client, travel_time_store, points, profile=profile,
+        max_elements=MATRIX_MAX_ELEMENTS, concurrency=MATRIX_CONCURRENCY
+    )
+    return result["durations"], result["distances"]
+
+async def _build_optimization_matrices(
+    jobs: List[Dict[str, Any]],
+    vehicles: List[Dict[str, Any]],
+    shipments: Optional[List[Dict[str, Any]]] = None,
+    fetch_missing: bool = True,
+    max_tiles: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Builds per-profile cost matrices for an optimization problem from the travel-time store.
+
+    Pairs missing from the store are fetched via the tiled matrix endpoint (and stored)
+    when ``fetch_missing`` is set and the requests fit in what is left of the local
+    matrix quota and in ``max_tiles`` (otherwise an ``ApiError`` 429 is raised before
+    any request); without it the matrices are only built if every pair is already stored. On success the jobs/vehicles/shipments are updated in place with
+    location indices into the matrices. Returns None (leaving the problem untouched) if
+    any pair is missing or unreachable, in which case ORS should compute the matrix itself.
+    """
+    func_logger = logger.bind(function="optimize_vehicle_routes")
+    locations = collect_problem_locations(jobs, vehicles, shipments)
+    if not locations:
+        return None
+    profiles = sorted({vehicle.get("profile", "driving-car") for vehicle in vehicles})
+    # The profiles are filled concurrently, so each gets an equal share of the remaining quota
+    budget = ors_client.rate_limiter.remaining("matrix") if ors_client.rate_limiter is not None else None
+    if max_tiles is not None:
+        budget = max_tiles if budget is None else min(budget, max_tiles)
+    results = await gather_or_cancel(*(
+        fetch_matrix_with_store(
+            ors_client, travel_time_store, locations, profile=profile,
+            max_elements=MATRIX_MAX_ELEMENTS, concurrency=MATRIX_CONCURRENCY,
+            fetch_missing=fetch_missing,
+            max_tiles=budget // len(profiles) if budget is not None else None
+        )
+        for profile in profiles
+    ))
+    
+    matrices = {}
+    for profile, result in zip(profiles, results):
+        func_logger.info(
+            "Matrix for '{}': {} pairs from the travel-time store, {} fetched in {} requests",
+            profile, result["cached_pairs"], result["fetched_pairs"], result["tiles"]
+        )
+        durations = to_optimization_matrix(result["durations"])
+        distances = to_optimization_matrix(result["distances"])
+        if durations is None or distances is None:
+            if fetch_missing:
+                func_logger.warning(f"Unreachable location pairs for profile '{profile}', not sending a custom matrix")
+            return None
+        matrices[profile] = {"durations": durations, "distances": distances}
+    
+    attach_location_indices(jobs, vehicles, shipments, locations)
+    return matrices
+
+
+def register_solution(
+    solution: Dict[str, Any],
+    problem: Dict[str, Any],
+    travel: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Keeps the problem behind a successful solution under a new 'solution_id'.
+
+    ``travel`` carries matrices already built for the problem's locations, so later
+    incremental updates only look up the pairs of new locations.
+    """
+    if solution.get("code") != 0:
+        return solution
+    solution_id = uuid.uuid4().hex
+    optimization_results.set(solution_id, {
+        **problem,
+        "solution": solution,
+        "travel": travel or {"locations": [], "matrices": {}}
+    })
+    solution["solution_id"] = solution_id
+    return solution
+
+async def _solve_vehicle_routes(
+    jobs: List[Dict[str, Any]],
+    vehicles: List[Dict[str, Any]],
+    shipments: Optional[List[Dict[str, Any]]],
+    matrices: Optional[Dict[str, Any]],
+    precompute_matrices: bool,
+    decompose: Optional[str],
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """Builds the optimization payload (filling matrices from the travel-time store) and solves it"""
+    func_logger = logger.bind(function="optimize_vehicle_routes")
+    
+    # Build the optimization request payload
+    payload = {
+        "jobs": jobs,
+        "vehicles": vehicles
+    }
+    
+    # Add optional components
+    if shipments:
+        payload["shipments"] = shipments
+    if not matrices:
+        try:
+            matrices = await _build_optimization_matrices(
+                jobs, vehicles, shipments,
+                fetch_missing=precompute_matrices or TRAVEL_TIME_AUTOFILL,
+                # An explicit request is only bounded by the quota
+                max_tiles=None if precompute_matrices else TRAVEL_TIME_AUTOFILL_MAX_TILES
+            )
+        except openrouteservice.exceptions.ApiError as api_error:
+            if precompute_matrices:
+                raise
+            # Filling the matrices is an optimization, ORS can still compute them itself
+            func_logger.warning(f"Matrix prefill failed, sending the problem without matrices: {api_error}")
+    if matrices:
+        payload["matrices"] = matrices
+    
+    if decompose and len(vehicles) > 1:
+        data = await _solve_decomposed(payload, decompose, ctx)
+        add_readable_times(data)
+        return data
+        
+    # Make the API request
+    func_logger.debug("Sending optimization request to ORS optimization endpoint")
+    
+    try:
+        data = await ors_client.optimization(payload)
+    except openrouteservice.exceptions.ApiError as api_error:
+        error_msg = f"Optimization API request failed with status {api_error}"
+        func_logger.error(error_msg)
+        if ctx:
+            await ctx.error(f"Optimization failed: {error_msg}")
+        raise
+    
+    return add_readable_times(data)
+
+
+@mcp.tool
+@server_metrics.track_tool
+async def optimize_vehicle_routes(
+    jobs: List[Dict[str, Any]],
+    vehicles: List[Dict[str, Any]],
+    shipments: Optional[List[Dict[str, Any]]] = None,
+    matrices: Optional[Dict[str, Any]] = None,
+    precompute_matrices: bool = False,
+    decompose: Optional[str] = None,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Solves Vehicle Routing Problems (VRP) using OpenRouteService's optimization endpoint.
+    
+    This is the main optimization tool that solves complex routing problems with multiple 
+    vehicles, jobs, capacity constraints, time windows, and other real-world constraints.
+
+    Args:
+        jobs: List of job objects describing places to visit. Each job should have:
+              - id (int): Unique identifier
+              - location (List[float]): [longitude, latitude] coordinates
+              - Optional: service (int): Service time in seconds
+              - Optional: time_windows (List[List[int]]): Valid time slots [[start, end]]
+              - Optional: amount (List[int]): Multidimensional quantities (e.g., weight, volume)
+              - Optional: skills (List[int]): Required vehicle skills
+              - Optional: priority (int): Priority level 0-100
+              
+        vehicles: List of vehicle objects describing available vehicles. Each vehicle should have:
+                  - id (int): Unique identifier  
+                  - start (List[float]): [longitude, latitude] starting location
+                  - Optional: end (List[float]): [longitude, latitude] ending location
+                  - Optional: capacity (List[int]): Vehicle capacity for each dimension
+                  - Optional: skills (List[int]): Vehicle capabilities
+                  - Optional: time_window (List[int]): Working hours [start, end]
+                  - Optional: profile (str): Routing profile ('driving-car', 'cycling-regular', etc.)
+                  
+        shipments: Optional list of pickup-delivery pairs. Each shipment has:
+                   - pickup: Pickup location details (similar to job)
+                   - delivery: Delivery location details (similar to job)
+                   - Optional: amount (List[int]): Quantities to transport
+                   
+        matrices: Optional custom distance/duration matrices for faster computation.
+                  Format: {"profile": {"durations": [[...]], "distances": [[...]]}}
+                  If omitted, matrices are built from the server's persistent travel-time
+                  store, fetching the missing pairs when that takes only a few matrix
+                  requests (ORS_TRAVEL_TIME_AUTOFILL_MAX_TILES, within the rate-limit
+                  quota); otherwise ORS computes them. ORS_TRAVEL_TIME_AUTOFILL=false
+                  only uses the store when every pair is already there.
+                  
+        precompute_matrices: If True and no `matrices` are given, missing pairs are
+                  fetched with the tiled, concurrent matrix endpoint (see
+                  get_distance_matrix). Refused up front with an error when that needs
+                  more matrix requests than remain in the rate-limit quota.
+                  
+        decompose: Optional decomposition for large problems (hundreds of jobs, several vehicles).
+                  Jobs are partitioned geographically, one cluster per vehicle, the
+                  single-vehicle sub-problems are solved concurrently and merged into one
+                  response. 'sweep' cuts angular sectors around the depot, balanced by job
+                  amounts and vehicle capacities (best with a shared depot); 'kmeans' clusters
+                  jobs and matches clusters to the nearest vehicle depot (best with several depots).
+                  
+        ctx: The MCP context object for logging.
+
+    Returns:
+        Complete optimization solution including:
+        - code: Status code (0 = success)
+        - summary: Solution statistics (cost, routes, unassigned tasks)
+        - routes: Detailed route information for each vehicle
+        - unassigned: Tasks that couldn't be assigned
+        - solution_id: Pass it to reoptimize_routes to add or remove jobs later
+    
+    Example:
+        Simple 3-job, 1-vehicle problem:
+        jobs = [
+            {"id": 1, "location": [2.35, 48.86], "service": 300},
+            {"id": 2, "location": [2.28, 48.87], "service": 400}, 
+            {"id": 3, "location": [2.36, 48.84], "service": 500}
+        ]
+        vehicles = [
+            {"id": 1, "start": [2.35, 48.85], "end": [2.35, 48.85]}
+        ]
+    """
+    func_logger = logger.bind(function="optimize_vehicle_routes")
+    
+    try:
+        # Ensure each vehicle has a profile
+        for vehicle in vehicles:
+            if 'profile' not in vehicle:
+                vehicle['profile'] = 'driving-car'  # Set default profile
+        
+        # Snapshot before matrix prefill adds location indices, kept for reoptimize_routes
+        problem = json.loads(json.dumps({
+            "jobs": jobs, "vehicles": vehicles, "shipments": shipments or [], "matrices": matrices
+        }))
+        
+        # Identical problems (up to ids, key and task order) return the stored solution.
+        # precompute_matrices is part of the key: it changes which matrices the solver gets
+        # and whether an over-quota problem fails, so a call with it never joins one without
+        cache_key = optimization_cache_key(
+            jobs, vehicles, shipments, matrices,
+            decompose=decompose if len(vehicles) > 1 else None,
+            precompute_matrices=bool(precompute_matrices)
+        )
+        cached = optimization_cache.get(cache_key)
+        if cached is not None:
+            func_logger.info("Returning cached solution for {} jobs", len(jobs))
+            if ctx:
+                await ctx.info("Identical problem solved recently, returning the cached solution.")
+            return register_solution(json.loads(cached), problem)
+        
+        # Concurrent identical calls share one solve; progress messages go to the first caller's ctx only
+        async def solve() -> str:
+            # Matrix prefill adds location indices in place; keep the caller's dicts (and their cache key) intact
+            work = json.loads(json.dumps(problem))
+            data = await _solve_vehicle_routes(
+                work["jobs"], work["vehicles"], work["shipments"] or None, work["matrices"],
+                precompute_matrices, decompose, ctx
+            )
+            # Stored serialized so every hit gets its own copy to modify
+            text = json.dumps(data)
+            if data.get("code") == 0:
+                optimization_cache.set(cache_key, text)
+            return text
+        
+        data = json.loads(await inflight.run(("optimization", cache_key), solve))
+        return register_solution(data, problem)
+            
+    except Exception as e:
+        func_logger.error(f"Error during VRP optimization: {e}", exc_info=True)
+        if ctx:
+            await ctx.error(f"Error during optimization: {e}")
+        raise
+
+# Store the tool reference (the undecorated coroutine, FunctionTool objects are not awaitable)
+_optimization_tools['optimize_vehicle_routes'] = optimize_vehicle_routes.fn
+
+@mcp.tool
+@server_metrics.track_tool
+async def create_simple_delivery_problem(
+    delivery_locations: List[Tuple[float, float]],
     depot_location: Tuple[float, float],
     vehicle_capacity: Optional[List[int]] = None,
     service_times: Optional[List[int]] = None,
@@ -1354,13 +2309,18 @@ async def create_simple_delivery_problem(
         raise
 
 # Store the tool reference
-_optimization_tools['create_simple_delivery_problem'] = create_simple_delivery_problem
+_optimization_tools['create_simple_delivery_problem'] = create_simple_delivery_problem.fn
 
 @mcp.tool
+@server_metrics.track_tool
 async def optimize_traveling_salesman(
     locations: List[Tuple[float, float]],
     start_location: Optional[Tuple[float, float]] = None,
     return_to_start: bool = True,
+    profile: str = "driving-car",
+    solver: str = "remote",
+    matrix_source: str = "ors",
+    time_budget_ms: Optional[int] = None,
     ctx: Context = None
 ) -> Dict[str, Any]:
     """
@@ -1379,10 +2339,22 @@ async def optimize_traveling_salesman(
         return_to_start: If True, the route will return to the starting location (round trip).
                         If False, the route will end at the last visited location.
                         
+        profile: The routing profile (e.g., 'driving-car', 'cycling-regular', 'foot-walking').
+        
+        solver: 'remote' (default) sends the problem to the ORS optimization endpoint.
+                'local' solves it in-process (nearest neighbor + 2-opt/Or-opt), which is much
+                faster for small tours and has no upstream job-count limit.
+                
+        matrix_source: Travel costs for the local solver: 'ors' uses real durations (from the
+                       travel-time store, fetching only missing pairs),
+                       'haversine' uses a straight-line estimate without any ORS request.
+                       
+        time_budget_ms: Improvement time budget of the local solver in milliseconds (default 200).
+                        
         ctx: The MCP context object for logging.
 
     Returns:
-        Complete optimization solution including:
+        Complete optimization solution (same shape for both solvers) including:
         - code: Status code (0 = success)
         - summary: Solution statistics (cost, routes, unassigned tasks)
         - routes: Detailed route information for each vehicle
@@ -1395,10 +2367,12 @@ async def optimize_traveling_salesman(
         "optimize_traveling_salesman",
         locations_count=len(locations),
         has_start_location=start_location is not None,
-        return_to_start=return_to_start
+        return_to_start=return_to_start,
+        solver=solver,
+        matrix_source=matrix_source
     )
     
-    func_logger.info(f"Starting TSP optimization for {len(locations)} locations")
+    func_logger.info("Starting TSP optimization for {} locations", len(locations))
     if ctx:
         await ctx.info(f"Optimizing route to visit {len(locations)} locations...")
 
@@ -1414,7 +2388,8 @@ async def optimize_traveling_salesman(
         
         # Create vehicle
         vehicle = {
-            "id": 1
+            "id": 1,
+            "profile": profile
         }
         
         # Set start/end locations if provided
@@ -1429,10 +2404,19 @@ async def optimize_traveling_salesman(
         
         vehicles = [vehicle]
         
+        if solver == "local":
+            return await _solve_tsp_locally(
+                jobs, vehicle, matrix_source,
+                time_budget_ms if time_budget_ms is not None else TSP_TIME_BUDGET_MS,
+                ctx
+            )
+        if solver != "remote":
+            raise ValueError(f"Unknown solver '{solver}', expected 'remote' or 'local'")
+        
         func_logger.info("Delegating to main optimization function")
         
         # Use the main optimization function
-        return await optimize_vehicle_routes(
+        return await _optimization_tools['optimize_vehicle_routes'](
             jobs=jobs,
             vehicles=vehicles,
             ctx=ctx
@@ -1444,6 +2428,483 @@ async def optimize_traveling_salesman(
             await ctx.error(f"Error optimizing route: {e}")
         raise
 
+async def _solve_tsp_locally(
+    jobs: List[Dict[str, Any]],
+    vehicle: Dict[str, Any],
+    matrix_source: str,
+    time_budget_ms: int,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """Solves a single-vehicle TSP in-process and returns an ORS-optimization-shaped solution"""
+    func_logger = logger.bind(function="optimize_traveling_salesman")
+    
+    # Matrix nodes: jobs first, then the vehicle start/end depots
+    points = [tuple(job["location"]) for job in jobs]
+    start = end = None
+    if vehicle.get("start") is not None:
+        points.append(tuple(vehicle["start"]))
+        start = len(points) - 1
+    if vehicle.get("end") is not None:
+        if vehicle.get("end") == vehicle.get("start"):
+            end = start
+        else:
+            points.append(tuple(vehicle["end"]))
+            end = len(points) - 1
+    
+    durations, distances = await _travel_matrices(points, vehicle.get("profile", "driving-car"), matrix_source)
+    
+    if np.isnan(durations).any():
+        raise ValueError("Some locations are unreachable from each other with this profile, use solver='remote'")
+    
+    solve_started = datetime.now()
+    order, _ = await asyncio.to_thread(
+        solve_tsp, durations, list(range(len(jobs))), start=start, end=end, time_budget=time_budget_ms / 1000
+    )
+    solving_ms = int((datetime.now() - solve_started).total_seconds() * 1000)
+    
+    route = build_route(vehicle, jobs, order, durations, distances, start, end)
+    solution = build_solution([route], solving_ms=solving_ms)
+    func_logger.success("Local TSP solved {} stops in {} ms using '{}' matrix", len(jobs), solving_ms, matrix_source)
+    if ctx:
+        await ctx.info(f"Route optimized locally for {len(jobs)} stops.")
+    return add_readable_times(solution)
+
+# Problem features the incremental repair does not model; such problems are re-solved in full
+REPAIR_UNSUPPORTED_VEHICLE_KEYS = ("breaks", "steps", "max_travel_time", "max_distance", "costs", "speed_factor")
+REPAIR_UNSUPPORTED_JOB_KEYS = ("setup",)
+
+def _repair_unsupported(entry: Dict[str, Any], jobs: List[Dict[str, Any]]) -> Optional[str]:
+    """Reason why a problem needs a full solve instead of an incremental repair, or None"""
+    if entry["shipments"]:
+        return "the problem has shipments"
+    if entry["matrices"]:
+        return "the problem uses custom matrices"
+    for vehicle in entry["vehicles"]:
+        keys = [key for key in REPAIR_UNSUPPORTED_VEHICLE_KEYS if vehicle.get(key)]
+        if keys:
+            return f"vehicle {vehicle['id']} uses {', '.join(keys)}"
+    for job in jobs:
+        if job.get("location") is None:
+            return f"job {job.get('id')} has no location"
+        keys = [key for key in REPAIR_UNSUPPORTED_JOB_KEYS if job.get(key)]
+        if keys:
+            return f"job {job['id']} uses {', '.join(keys)}"
+    return None
+
+def _repair_routes(
+    solution: Dict[str, Any],
+    vehicles: List[Dict[str, Any]],
+    jobs: List[Dict[str, Any]],
+    added_count: int,
+    removed: set,
+    matrices: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    starts: List[Optional[int]],
+    ends: List[Optional[int]],
+    time_budget_ms: int
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Synchronous part of ``_repair_solution``: re-inserts and improves routes in solver node space.
+
+    ``matrices`` maps each profile to its (durations, distances) over the jobs
+    followed by the depots; ``starts``/``ends`` are the vehicles' depot nodes.
+    """
+    vehicle_durations = [matrices[vehicle.get("profile", "driving-car")][0] for vehicle in vehicles]
+    
+    # Job orders of the previous routes, without the removed jobs
+    job_node = {str(job["id"]): i for i, job in enumerate(jobs)}
+    vehicle_position = {str(vehicle["id"]): v for v, vehicle in enumerate(vehicles)}
+    orders: List[List[int]] = [[] for _ in vehicles]
+    previous_routes = {}
+    touched = set()
+    for route in solution.get("routes", []):
+        v = vehicle_position.get(str(route["vehicle"]))
+        if v is None:
+            return None, {"reason": f"vehicle {route['vehicle']} of the previous solution is unknown"}
+        previous_routes[v] = route
+        for step in route["steps"]:
+            if step["type"] == "job":
+                if str(step["id"]) in removed:
+                    touched.add(v)
+                else:
+                    orders[v].append(job_node[str(step["id"])])
+            elif step["type"] not in ("start", "end"):
+                return None, {"reason": f"previous routes contain '{step['type']}' steps"}
+    
+    # New jobs must fit; previously unassigned jobs get another chance but may stay unassigned
+    for node in range(len(jobs) - added_count, len(jobs)):
+        best = cheapest_insertion(vehicles, jobs, orders, node, vehicle_durations, starts, ends)
+        if best is None:
+            return None, {"reason": f"job {jobs[node]['id']} fits in no route without breaking constraints"}
+        v, position, _ = best
+        orders[v].insert(position, node)
+        touched.add(v)
+    unassigned = []
+    inserted_unassigned = []
+    for task in solution.get("unassigned", []):
+        if task.get("type", "job") != "job" or str(task.get("id")) in removed or str(task.get("id")) not in job_node:
+            continue
+        node = job_node[str(task["id"])]
+        best = cheapest_insertion(vehicles, jobs, orders, node, vehicle_durations, starts, ends)
+        if best is None:
+            unassigned.append(task)
+            continue
+        v, position, _ = best
+        orders[v].insert(position, node)
+        touched.add(v)
+        inserted_unassigned.append(task["id"])
+    
+    deadline = time.perf_counter() + time_budget_ms / 1000
+    routes = []
+    for v, vehicle in enumerate(vehicles):
+        if v not in touched:
+            if v in previous_routes:
+                routes.append(previous_routes[v])
+            continue
+        if not orders[v]:
+            continue
+        durations, distances = matrices[vehicle.get("profile", "driving-car")]
+        order = improve_route(vehicle, jobs, orders[v], durations, starts[v], ends[v], deadline)
+        routes.append(build_route(vehicle, jobs, order, durations, distances, starts[v], ends[v]))
+    
+    info = {
+        "changed_vehicles": [vehicles[v]["id"] for v in sorted(touched)],
+        "inserted_unassigned": inserted_unassigned,
+    }
+    return build_solution(routes, unassigned), info
+
+async def _repair_solution(
+    entry: Dict[str, Any],
+    jobs: List[Dict[str, Any]],
+    added_count: int,
+    removed: set,
+    time_budget_ms: int
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Applies a job delta to a stored solution with cheapest insertion and local search.
+
+    ``jobs`` are the kept jobs followed by the ``added_count`` new ones. Returns the
+    new solution and an info dict (with the extended travel matrices under
+    "travel"), or (None, {"reason": ...}) when a full solve is needed.
+    """
+    solution = entry["solution"]
+    vehicles = entry["vehicles"]
+    travel = entry["travel"]
+    
+    # Matrix nodes are locations; the stored locations keep their position so their matrices are reused
+    locations = list(travel["locations"])
+    location_index = {tuple(location): i for i, location in enumerate(locations)}
+    
+    def locate(point: Optional[List[float]]) -> Optional[int]:
+        if point is None:
+            return None
+        key = (float(point[0]), float(point[1]))
+        if key not in location_index:
+            location_index[key] = len(locations)
+            locations.append(key)
+        return location_index[key]
+    
+    job_locations = [locate(job["location"]) for job in jobs]
+    start_locations = [locate(vehicle.get("start")) for vehicle in vehicles]
+    end_locations = [locate(vehicle.get("end")) for vehicle in vehicles]
+    
+    profiles = sorted({vehicle.get("profile", "driving-car") for vehicle in vehicles})
+    results = await gather_or_cancel(*(
+        fetch_matrix_with_store(
+            ors_client, travel_time_store, locations, profile=profile,
+            max_elements=MATRIX_MAX_ELEMENTS, concurrency=MATRIX_CONCURRENCY,
+            known=travel["matrices"].get(profile)
+        )
+        for profile in profiles
+    ))
+    
+    # Solver node space: jobs first (node i is jobs[i]), then the distinct depots
+    depots = sorted({location for location in start_locations + end_locations if location is not None})
+    depot_node = {location: len(jobs) + i for i, location in enumerate(depots)}
+    nodes = np.array(job_locations + depots, dtype=int)
+    matrices = {}
+    for profile, result in zip(profiles, results):
+        durations = result["durations"][np.ix_(nodes, nodes)]
+        if np.isnan(durations).any():
+            return None, {"reason": f"unreachable location pairs for profile '{profile}'"}
+        matrices[profile] = (durations, result["distances"][np.ix_(nodes, nodes)])
+    starts = [depot_node.get(location) for location in start_locations]
+    ends = [depot_node.get(location) for location in end_locations]
+    
+    # Insertion and local search are CPU-bound, keep them off the event loop
+    repaired, info = await asyncio.to_thread(
+        _repair_routes, solution, vehicles, jobs, added_count, removed, matrices, starts, ends, time_budget_ms
+    )
+    if repaired is None:
+        return None, info
+    info.update({
+        "matrix_pairs_fetched": sum(result["fetched_pairs"] for result in results),
+        "travel": {
+            "locations": locations,
+            "matrices": {profile: (result["durations"], result["distances"]) for profile, result in zip(profiles, results)}
+        }
+    })
+    return repaired, info
+
+@mcp.tool
+@server_metrics.track_tool
+async def reoptimize_routes(
+    solution_id: str,
+    added_jobs: Optional[List[Dict[str, Any]]] = None,
+    removed_job_ids: Optional[List[Any]] = None,
+    time_budget_ms: Optional[int] = None,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Updates a previous optimize_vehicle_routes solution after jobs were added or cancelled.
+    
+    Instead of solving everything again, cancelled jobs are dropped from their routes
+    and each new job is inserted at its cheapest feasible position (capacity, skills,
+    time windows and max_tasks are respected), followed by 2-opt/Or-opt on the changed
+    routes only; the other routes are returned unchanged. Travel times come from the
+    travel-time store, so only the pairs involving new locations are fetched.
+    
+    Falls back to a full optimize_vehicle_routes solve when a new job fits in no route,
+    or the problem uses features the repair does not model (shipments, breaks, vehicle
+    steps, custom matrices, setup times, ...).
+
+    Args:
+        solution_id: The 'solution_id' of a previous optimize_vehicle_routes or
+                     reoptimize_routes result (problems are kept for a limited time).
+        added_jobs: New jobs, same format as the jobs of optimize_vehicle_routes.
+        removed_job_ids: Ids of the jobs to drop.
+        time_budget_ms: Local search time budget in milliseconds (default 200).
+        ctx: The MCP context object for logging.
+
+    Returns:
+        An optimization solution shaped like optimize_vehicle_routes (with a new
+        'solution_id' for the next update) plus 'reoptimization': the method used
+        ('incremental' or 'full'), added and removed job ids, changed vehicles and,
+        for a full solve, the reason.
+    """
+    func_logger = logger.bind(function="reoptimize_routes")
+    added_jobs = added_jobs or []
+    removed_job_ids = removed_job_ids or []
+    log_request_details(
+        "reoptimize_routes",
+        solution_id=solution_id,
+        added_count=len(added_jobs),
+        removed_count=len(removed_job_ids)
+    )
+    
+    entry = optimization_results.get(solution_id)
+    if entry is None:
+        func_logger.warning(f"Unknown or expired solution {solution_id}")
+        if ctx:
+            await ctx.error(f"Unknown or expired solution: {solution_id}")
+        raise ValueError(f"Unknown or expired solution '{solution_id}', call optimize_vehicle_routes again")
+    
+    try:
+        removed = {str(job_id) for job_id in removed_job_ids}
+        unknown = removed - {str(job["id"]) for job in entry["jobs"]}
+        if unknown:
+            raise ValueError(f"Jobs {sorted(unknown)} are not part of solution '{solution_id}'")
+        kept = [job for job in entry["jobs"] if str(job["id"]) not in removed]
+        kept_ids = {str(job["id"]) for job in kept}
+        duplicates = [job.get("id") for job in added_jobs if str(job.get("id")) in kept_ids]
+        if duplicates:
+            raise ValueError(f"Added jobs reuse existing ids: {duplicates}")
+        # Copies, since the full solve attaches matrix indices to jobs and vehicles
+        jobs = json.loads(json.dumps(kept + added_jobs))
+        delta = {"added": [job.get("id") for job in added_jobs], "removed": list(removed_job_ids)}
+        
+        started = datetime.now()
+        reason = _repair_unsupported(entry, jobs)
+        if reason is None:
+            solution, info = await _repair_solution(
+                entry, jobs, len(added_jobs), removed,
+                time_budget_ms if time_budget_ms is not None else TSP_TIME_BUDGET_MS
+            )
+            if solution is not None:
+                solving_ms = int((datetime.now() - started).total_seconds() * 1000)
+                solution["summary"]["computing_times"]["solving"] = solving_ms
+                travel = info.pop("travel")
+                solution["reoptimization"] = {"method": "incremental", **delta, **info}
+                add_readable_times(solution)
+                func_logger.success(
+                    "Incremental update (+{} / -{} jobs) changed {} routes in {} ms",
+                    len(added_jobs), len(removed), len(info["changed_vehicles"]), solving_ms
+                )
+                if ctx:
+                    await ctx.info(f"Routes updated incrementally, {len(info['changed_vehicles'])} route(s) changed.")
+                problem = {"jobs": jobs, "vehicles": entry["vehicles"], "shipments": [], "matrices": None}
+                return register_solution(solution, problem, travel)
+            reason = info["reason"]
+        
+        func_logger.info("Falling back to a full solve: {}", reason)
+        if ctx:
+            await ctx.info(f"Re-solving the whole problem: {reason}")
+        data = await _optimization_tools['optimize_vehicle_routes'](
+            jobs=jobs,
+            vehicles=json.loads(json.dumps(entry["vehicles"])),
+            shipments=json.loads(json.dumps(entry["shipments"])) or None,
+            matrices=entry["matrices"],
+            ctx=ctx
+        )
+        data["reoptimization"] = {"method": "full", **delta, "reason": reason}
+        return data
+    
+    except Exception as e:
+        func_logger.error(f"Error during re-optimization: {e}", exc_info=True)
+        if ctx:
+            await ctx.error(f"Error updating routes: {e}")
+        raise
+
+# --- BACKGROUND OPTIMIZATION JOBS ---
+
+@mcp.tool
+@server_metrics.track_tool
+async def submit_optimization(
+    jobs: List[Dict[str, Any]],
+    vehicles: List[Dict[str, Any]],
+    shipments: Optional[List[Dict[str, Any]]] = None,
+    matrices: Optional[Dict[str, Any]] = None,
+    precompute_matrices: bool = False,
+    decompose: Optional[str] = None,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Submits a vehicle routing optimization to run in the background and returns immediately.
+
+    Use this instead of optimize_vehicle_routes for large problems that may take more
+    than a few seconds. Poll get_optimization_status, then fetch the solution with
+    get_optimization_result. Arguments are identical to optimize_vehicle_routes.
+
+    Returns:
+        A dictionary with the "job_id" to poll and the initial job status.
+    """
+    func_logger = logger.bind(function="submit_optimization")
+    
+    log_request_details(
+        "submit_optimization",
+        jobs_count=len(jobs),
+        vehicles_count=len(vehicles),
+        shipments_count=len(shipments or []),
+        decompose=decompose
+    )
+    
+    async def work(progress):
+        return await _optimization_tools['optimize_vehicle_routes'](
+            jobs=jobs,
+            vehicles=vehicles,
+            shipments=shipments,
+            matrices=matrices,
+            precompute_matrices=precompute_matrices,
+            decompose=decompose,
+            ctx=progress
+        )
+    
+    try:
+        job = optimization_jobs.submit(
+            "optimize_vehicle_routes",
+            work,
+            summary={"jobs": len(jobs), "vehicles": len(vehicles), "shipments": len(shipments or [])}
+        )
+    except RuntimeError as e:
+        func_logger.warning(f"Optimization submission rejected: {e}")
+        if ctx:
+            await ctx.error(f"Optimization submission rejected: {e}")
+        raise
+    
+    func_logger.success("Submitted background optimization {}", job.job_id)
+    if ctx:
+        await ctx.info(f"Optimization submitted as job {job.job_id}.")
+    return job.to_status()
+
+@mcp.tool
+@server_metrics.track_tool
+async def get_optimization_status(
+    job_id: str,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Returns the status of a background optimization submitted with submit_optimization.
+
+    Args:
+        job_id: The id returned by submit_optimization.
+        ctx: The MCP context object for logging.
+
+    Returns:
+        Job status including "status" (queued, running, succeeded, failed, cancelled),
+        "progress" (0 to 1), the latest progress "message" and timing information.
+    """
+    job = optimization_jobs.get(job_id)
+    if job is None:
+        raise ValueError(f"Unknown or expired optimization job '{job_id}'")
+    
+    if ctx:
+        await ctx.report_progress(job.progress, 1.0)
+        await ctx.info(f"Optimization job {job_id} is {job.status}.")
+    return job.to_status()
+
+@mcp.tool
+@server_metrics.track_tool
+async def get_optimization_result(
+    job_id: str,
+    wait_seconds: float = 0,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Fetches the solution of a background optimization.
+
+    Args:
+        job_id: The id returned by submit_optimization.
+        wait_seconds: Optionally wait up to this many seconds for the job to finish (max 60).
+        ctx: The MCP context object for logging.
+
+    Returns:
+        The job status with a "result" key holding the complete optimization solution
+        (same as optimize_vehicle_routes) once the job succeeded. If the job is not
+        finished yet, only the status is returned; poll again later.
+    """
+    job = optimization_jobs.get(job_id)
+    if job is None:
+        raise ValueError(f"Unknown or expired optimization job '{job_id}'")
+    
+    await optimization_jobs.wait(job, min(max(wait_seconds, 0), 60))
+    
+    status = job.to_status()
+    if job.status == SUCCEEDED:
+        status["result"] = job.result
+    elif job.status not in FINISHED_STATES and ctx:
+        await ctx.report_progress(job.progress, 1.0)
+        await ctx.info(f"Optimization job {job_id} is still {job.status}.")
+    return status
+
+@mcp.tool
+@server_metrics.track_tool
+async def cancel_optimization(
+    job_id: str,
+    ctx: Context = None
+) -> Dict[str, Any]:
+    """
+    Cancels a queued or running background optimization.
+
+    Args:
+        job_id: The id returned by submit_optimization.
+        ctx: The MCP context object for logging.
+
+    Returns:
+        The job status and "cancel_requested" (False if the job had already finished).
+    """
+    job = optimization_jobs.get(job_id)
+    if job is None:
+        raise ValueError(f"Unknown or expired optimization job '{job_id}'")
+    
+    cancel_requested = optimization_jobs.cancel(job_id)
+    if cancel_requested:
+        # Let the task observe the cancellation before reporting
+        await optimization_jobs.wait(job, 1.0)
+        logger.info(f"Cancelled optimization job {job_id}")
+    
+    status = job.to_status()
+    status["cancel_requested"] = cancel_requested
+    return status
+
 if __name__=="__main__":
     logger.info("Starting OpenRouteService MCP Server with POI support")
     
@@ -1460,3 +2921,5 @@ if __name__=="__main__":
         raise
     finally:
         logger.info("OpenRouteService MCP Server shutdown complete")
+        # Flush the enqueued sinks before the interpreter exits
+        logger.complete()
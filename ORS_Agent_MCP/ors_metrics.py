@@ -0,0 +1,286 @@
+import math
+import time
+import bisect
+import functools
+import threading
+import contextvars
+from typing import Dict, Any, Tuple, Sequence, Optional, Callable, List
+
+# Seconds; covers cache hits (ms) up to slow optimizations (minutes)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Bytes; 256 B up to 16 MiB
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self._header() + [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{**dict(zip(self.labelnames, key)), "value": value} for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """Value that can go up and down, e.g. the number of in-flight requests."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: Any):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count per label set (Prometheus semantics)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, the last slot is +Inf; then sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def _quantile(self, counts: List[int], q: float) -> Optional[float]:
+        """Estimates a quantile by linear interpolation inside the matching bucket."""
+        total = sum(counts)
+        if total == 0:
+            return None
+        rank, cumulative = q * total, 0
+        for i, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i >= len(self.buckets):
+                    return lower
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        lines = self._header()
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        result = []
+        for key, counts, total in items:
+            count = sum(counts)
+            result.append({
+                **dict(zip(self.labelnames, key)),
+                "count": count,
+                "sum": round(total, 6),
+                "mean": round(total / count, 6) if count else None,
+                "p50": self._quantile(counts, 0.50),
+                "p95": self._quantile(counts, 0.95),
+                "p99": self._quantile(counts, 0.99),
+            })
+        return result
+
+
+class MetricsRegistry:
+    """Holds named metrics and renders them in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """JSON-serializable view; histograms include estimated p50/p95/p99."""
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+
+def upstream_endpoint(path: str) -> str:
+    """Maps an ORS request path to a low-cardinality label, e.g. '/v2/directions/driving-car/json' -> 'directions'."""
+    parts = [part for part in path.split("/") if part]
+    if not parts:
+        return "unknown"
+    return parts[1] if parts[0] == "v2" and len(parts) > 1 else parts[0]
+
+
+class ServerMetrics:
+    """
+    Metrics of the MCP server: per-tool and per-ORS-endpoint latency histograms,
+    in-flight gauges, error counters by exception type and payload-size histograms.
+
+    Tools are instrumented with the ``track_tool`` decorator, ORS requests by
+    ``ORSHttpClient`` through ``upstream_started`` / ``upstream_finished``, and tool
+    response sizes by passing ``serializer`` as FastMCP's ``tool_serializer``.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        self.tool_latency = r.histogram("ors_mcp_tool_duration_seconds", "Tool execution time", ("tool", "outcome"))
+        self.tool_in_flight = r.gauge("ors_mcp_tool_in_flight", "Tool calls currently executing", ("tool",))
+        self.tool_errors = r.counter("ors_mcp_tool_errors_total", "Failed tool calls by exception type", ("tool", "exception"))
+        self.tool_response_bytes = r.histogram("ors_mcp_tool_response_bytes", "Serialized tool result size", ("tool",), SIZE_BUCKETS)
+        self.upstream_latency = r.histogram("ors_upstream_duration_seconds", "ORS HTTP request time", ("endpoint", "status"))
+        self.upstream_in_flight = r.gauge("ors_upstream_in_flight", "ORS HTTP requests currently in flight", ("endpoint",))
+        self.upstream_errors = r.counter("ors_upstream_errors_total", "Failed ORS requests by exception type", ("endpoint", "exception"))
+        self.upstream_request_bytes = r.histogram("ors_upstream_request_bytes", "ORS request body size", ("endpoint",), SIZE_BUCKETS)
+        self.upstream_response_bytes = r.histogram("ors_upstream_response_bytes", "ORS response body size", ("endpoint",), SIZE_BUCKETS)
+        self.upstream_retries = r.counter("ors_upstream_retries_total", "ORS requests retried after 429/5xx", ("endpoint", "status"))
+        self.rate_limit_wait = r.histogram("ors_rate_limit_wait_seconds", "Time spent waiting for a local rate-limit slot", ("endpoint",))
+        # Name of the tool whose result is about to be serialized (set by track_tool)
+        self._current_tool: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("ors_metrics_tool", default=None)
+        # Name of the tool call executing in this context, so tools calling other tools' .fn are counted once
+        self._active_tool: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("ors_metrics_active_tool", default=None)
+
+    def track_tool(self, fn: Callable) -> Callable:
+        """
+        Decorator for async tool functions; place it below ``@mcp.tool``.
+
+        Calls made from inside another tracked tool (e.g. ``geocode_address.fn`` from
+        ``geocode_addresses``) are part of the outer call and are not recorded.
+        """
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if self._active_tool.get() is not None:
+                return await fn(*args, **kwargs)
+            active = self._active_tool.set(name)
+            self.tool_in_flight.inc(tool=name)
+            started = time.perf_counter()
+            outcome = "success"
+            try:
+                return await fn(*args, **kwargs)
+            except BaseException as e:
+                outcome = "error"
+                self.tool_errors.inc(tool=name, exception=type(e).__name__)
+                raise
+            finally:
+                self.tool_latency.observe(time.perf_counter() - started, tool=name, outcome=outcome)
+                self.tool_in_flight.dec(tool=name)
+                self._active_tool.reset(active)
+                # Left set on purpose: FastMCP serializes the result right after this returns
+                self._current_tool.set(name)
+
+        return wrapper
+
+    def serializer(self, base: Callable[[Any], str]) -> Callable[[Any], str]:
+        """Wraps a FastMCP tool serializer so result sizes are recorded per tool."""
+
+        def serialize(data: Any) -> str:
+            text = base(data)
+            self.tool_response_bytes.observe(len(text), tool=self._current_tool.get() or "unknown")
+            return text
+
+        return serialize
+
+    def upstream_started(self, endpoint: str):
+        self.upstream_in_flight.inc(endpoint=endpoint)
+
+    def upstream_finished(
+        self,
+        endpoint: str,
+        seconds: float,
+        status: Any,
+        request_bytes: int = 0,
+        response_bytes: int = 0,
+        error: Optional[BaseException] = None,
+    ):
+        self.upstream_in_flight.dec(endpoint=endpoint)
+        self.upstream_latency.observe(seconds, endpoint=endpoint, status=status)
+        if error is not None:
+            self.upstream_errors.inc(endpoint=endpoint, exception=type(error).__name__)
+        if request_bytes:
+            self.upstream_request_bytes.observe(request_bytes, endpoint=endpoint)
+        if response_bytes:
+            self.upstream_response_bytes.observe(response_bytes, endpoint=endpoint)
+
+    def upstream_retried(self, endpoint: str, status: Any):
+        self.upstream_retries.inc(endpoint=endpoint, status=status)
+
+    def rate_limited(self, endpoint: str, seconds: float):
+        self.rate_limit_wait.observe(seconds, endpoint=endpoint)
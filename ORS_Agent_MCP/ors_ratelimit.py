@@ -0,0 +1,215 @@
+import time
+import random
+import asyncio
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple, Callable, Sequence
+
+from openrouteservice import exceptions as ors_exceptions
+
+# Standard (free) plan quotas of the public ORS API as (requests per minute, requests per day)
+ORS_STANDARD_QUOTAS: Dict[str, Tuple[int, int]] = {
+    "directions": (40, 2000),
+    "geocode": (100, 1000),
+    "isochrones": (20, 500),
+    "matrix": (40, 500),
+    "pois": (60, 500),
+    "optimization": (40, 500),
+}
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def parse_quotas(spec: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parses ``"directions=40/2000,matrix=40/500"`` into {endpoint: (per_minute, per_day)}.
+
+    The per-day part is optional (``"geocode=100"``); 0 disables that limit.
+    """
+    quotas = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        endpoint, _, limits = item.partition("=")
+        per_minute, _, per_day = limits.partition("/")
+        quotas[endpoint.strip()] = (int(per_minute), int(per_day or 0))
+    return quotas
+
+
+def parse_retry_after(value: Optional[str], clock: Callable[[], float] = time.time) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - clock())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at ``rate`` tokens per second up to ``capacity``.
+
+    Tokens are reserved up front and the balance may go negative: the deficit is
+    the wait of the caller, so concurrent callers are served in arrival order
+    without a lock (all calls happen on the event loop thread).
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Takes one token and returns how many seconds the caller must wait before using it."""
+        self._refill()
+        self.tokens -= 1
+        return max(0.0, -self.tokens / self.rate)
+
+    def release(self):
+        """Returns a reserved token (e.g. when the caller gave up waiting)."""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def available(self) -> int:
+        """Whole tokens that can be taken right now without waiting."""
+        self._refill()
+        return max(0, int(self.tokens))
+
+
+class EndpointLimiter:
+    """
+    Per-endpoint limiter combining a per-minute and a per-day token bucket.
+
+    Callers wait for their slot instead of failing. At most ``max_queue`` callers
+    may wait at once, and nobody waits longer than ``max_wait`` seconds (e.g. once
+    the daily quota is used up); both cases raise an ``ApiError`` with status 429.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        per_minute: int,
+        per_day: int = 0,
+        max_queue: int = 100,
+        max_wait: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.clock = clock
+        self.buckets = []
+        if per_minute > 0:
+            self.buckets.append(TokenBucket(per_minute / 60.0, per_minute, clock))
+        if per_day > 0:
+            self.buckets.append(TokenBucket(per_day / 86400.0, per_day, clock))
+        self.waiting = 0
+        self.paused_until = 0.0
+
+    def pause(self, seconds: float):
+        """Holds back every caller for ``seconds`` (used when ORS answers 429 with Retry-After)."""
+        self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+    def remaining(self) -> Optional[int]:
+        """Requests that can be sent right now without waiting, or None when unlimited."""
+        if not self.buckets:
+            return None
+        if self.paused_until > self.clock():
+            return 0
+        return min(bucket.available() for bucket in self.buckets)
+
+    def _reject(self, reason: str):
+        raise ors_exceptions.ApiError(429, {"error": {"code": 429, "message": f"Local rate limit for '{self.name}': {reason}"}})
+
+    async def acquire(self) -> float:
+        """Waits for a request slot and returns the seconds spent waiting."""
+        if self.waiting >= self.max_queue:
+            self._reject(f"{self.waiting} requests already queued")
+        waits = [bucket.reserve() for bucket in self.buckets]
+        wait = max([self.paused_until - self.clock(), *waits, 0.0])
+        if wait > self.max_wait:
+            for bucket in self.buckets:
+                bucket.release()
+            self._reject(f"next slot in {wait:.0f}s exceeds the {self.max_wait:.0f}s wait limit")
+        if wait <= 0:
+            return 0.0
+        self.waiting += 1
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            for bucket in self.buckets:
+                bucket.release()
+            raise
+        finally:
+            self.waiting -= 1
+        return wait
+
+
+class RateLimiter:
+    """Shared set of ``EndpointLimiter``s keyed by ORS endpoint label (see ``ors_metrics.upstream_endpoint``)."""
+
+    def __init__(self, quotas: Dict[str, Tuple[int, int]], max_queue: int = 100, max_wait: float = 60.0):
+        self.limiters = {
+            endpoint: EndpointLimiter(endpoint, per_minute, per_day, max_queue, max_wait)
+            for endpoint, (per_minute, per_day) in quotas.items()
+        }
+
+    def get(self, endpoint: str) -> Optional[EndpointLimiter]:
+        return self.limiters.get(endpoint)
+
+    def remaining(self, endpoint: str) -> Optional[int]:
+        """Requests to ``endpoint`` that can be sent right now, or None when it is not limited."""
+        limiter = self.limiters.get(endpoint)
+        return limiter.remaining() if limiter is not None else None
+
+    async def acquire(self, endpoint: str) -> float:
+        limiter = self.limiters.get(endpoint)
+        return await limiter.acquire() if limiter is not None else 0.0
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff for 429/5xx answers and network errors.
+
+    The n-th retry waits a random time in [0, min(max_delay, base_delay * 2**n)]
+    ("full jitter"), but never less than the server's ``Retry-After``. Requests are
+    not retried when Retry-After exceeds ``max_delay``, since that usually means the
+    daily quota is exhausted.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        statuses: Sequence[int] = RETRY_STATUSES,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.statuses = frozenset(statuses)
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def delay(self, attempt: int, status: int, retry_after: Optional[float] = None) -> Optional[float]:
+        """Seconds to wait before retry number ``attempt`` (0-based), or None to give up."""
+        if attempt >= self.max_retries or status not in self.statuses:
+            return None
+        if retry_after is not None and retry_after > self.max_delay:
+            return None
+        return max(self._backoff(attempt), retry_after or 0.0)
+
+    def transport_delay(self, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a request that got no response (network error), or None."""
+        if attempt >= self.max_retries:
+            return None
+        return self._backoff(attempt)
@@ -0,0 +1,91 @@
+import json
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_or_cancel(*aws: Awaitable[T]) -> List[T]:
+    """
+    ``asyncio.gather`` that cancels the remaining awaitables as soon as one fails.
+
+    The cancelled requests are awaited before the original exception is re-raised,
+    so they have given back their rate limiter slots and connections by then.
+    Unlike ``asyncio.TaskGroup`` the caller sees the original exception, not an
+    ``ExceptionGroup``, so ``except ApiError`` handlers keep working.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def canonical_key(*parts: Any) -> str:
+    """Stable string key for JSON-like arguments (dict order and tuple/list differences do not matter)."""
+    return json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one upstream request.
+
+    The first caller starts ``factory()`` as its own task; callers arriving while it
+    runs await the same task and receive the same result (or exception). Results
+    are shared objects, so callers must not mutate them.
+
+    Cancellation-safe: a cancelled caller only stops waiting, the shared request
+    keeps running for the others, and it is cancelled once every caller has left.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def _finished(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Mark the exception as retrieved when every caller was cancelled before it arrived
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task, key=key, flight=flight: self._finished(key, flight))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            # shield: cancelling this caller must not cancel the request shared with others
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Forget it right away so a new caller starts a fresh request instead of joining a cancelled one
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                flight.task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,519 @@
+import time
+from typing import List, Tuple, Optional, Dict, Any
+
+import numpy as np
+
+_EPS = 1e-9
+
+
+def _with_open_ends(cost: np.ndarray, start: Optional[int], end: Optional[int]) -> Tuple[np.ndarray, int, int]:
+    """
+    Adds a zero-cost dummy node for a missing start and/or end.
+
+    With fixed endpoints every tour variant (round trip, fixed start, free
+    start/end) becomes a path from ``start`` to ``end`` through all other nodes.
+    """
+    if start is not None and end is not None:
+        return cost, start, end
+    n = cost.shape[0]
+    padded = np.zeros((n + 1, n + 1), dtype=float)
+    padded[:n, :n] = cost
+    return padded, n if start is None else start, n if end is None else end
+
+
+def path_cost(cost: np.ndarray, path: List[int]) -> float:
+    """Total cost of visiting ``path`` in order."""
+    if len(path) < 2:
+        return 0.0
+    nodes = np.asarray(path)
+    return float(cost[nodes[:-1], nodes[1:]].sum())
+
+
+def nearest_neighbor(cost: np.ndarray, start: int, visit: List[int]) -> List[int]:
+    """Greedy construction: repeatedly go to the cheapest unvisited node."""
+    remaining = list(visit)
+    order = []
+    current = start
+    while remaining:
+        costs = cost[current, remaining]
+        k = int(np.argmin(costs))
+        current = remaining.pop(k)
+        order.append(current)
+    return order
+
+
+def two_opt(cost: np.ndarray, path: List[int], deadline: float) -> List[int]:
+    """
+    2-opt improvement of a path with fixed first and last node.
+
+    Works on asymmetric matrices: the cost of a reversed segment is taken from
+    prefix sums of the backward edges, so each candidate move is O(1) and all
+    moves for a given ``i`` are evaluated at once with NumPy.
+    """
+    path = list(path)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        nodes = np.asarray(path)
+        forward = np.concatenate(([0.0], np.cumsum(cost[nodes[:-1], nodes[1:]])))
+        backward = np.concatenate(([0.0], np.cumsum(cost[nodes[1:], nodes[:-1]])))
+        last = len(path) - 2
+        for i in range(1, last):
+            js = np.arange(i + 1, last + 1)
+            delta = (
+                cost[nodes[i - 1], nodes[js]]
+                + (backward[js] - backward[i])
+                + cost[nodes[i], nodes[js + 1]]
+                - cost[nodes[i - 1], nodes[i]]
+                - (forward[js] - forward[i])
+                - cost[nodes[js], nodes[js + 1]]
+            )
+            k = int(np.argmin(delta))
+            if delta[k] < -_EPS:
+                j = int(js[k])
+                path[i:j + 1] = reversed(path[i:j + 1])
+                improved = True
+                break
+            if time.perf_counter() >= deadline:
+                break
+    return path
+
+
+def or_opt(cost: np.ndarray, path: List[int], deadline: float, max_segment: int = 3) -> List[int]:
+    """
+    Or-opt improvement: relocates segments of 1..``max_segment`` consecutive nodes
+    to the cheapest other position of the path (first and last node stay fixed).
+    """
+    path = list(path)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for length in range(1, max_segment + 1):
+            for i in range(1, len(path) - length):
+                segment = path[i:i + length]
+                before, after = path[i - 1], path[i + length]
+                removal_gain = cost[before, segment[0]] + cost[segment[-1], after] - cost[before, after]
+                rest = np.asarray(path[:i] + path[i + length:])
+                # Insert between rest[p] and rest[p + 1]
+                insertion = cost[rest[:-1], segment[0]] + cost[segment[-1], rest[1:]] - cost[rest[:-1], rest[1:]]
+                insertion[i - 1] = np.inf  # original position
+                p = int(np.argmin(insertion))
+                if insertion[p] - removal_gain < -_EPS:
+                    rest_list = rest.tolist()
+                    path = rest_list[:p + 1] + segment + rest_list[p + 1:]
+                    improved = True
+                    break
+                if time.perf_counter() >= deadline:
+                    return path
+            if improved:
+                break
+    return path
+
+
+def solve_tsp(
+    cost: np.ndarray,
+    visit: List[int],
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    time_budget: float = 0.2,
+) -> Tuple[List[int], float]:
+    """
+    Heuristic TSP solver: nearest-neighbor construction followed by alternating
+    2-opt and Or-opt local search until no move improves or the time budget runs out.
+
+    Args:
+        cost: Square (possibly asymmetric) cost matrix, e.g. durations in seconds.
+        visit: Node indices that must be visited.
+        start: Fixed first node, or None to let the solver choose.
+        end: Fixed last node, or None for an open path.
+        time_budget: Wall-clock budget in seconds for the improvement phase.
+
+    Returns:
+        The visiting order of ``visit`` (without start/end) and its total cost.
+    """
+    deadline = time.perf_counter() + time_budget
+    cost = np.asarray(cost, dtype=float)
+    padded, first, last = _with_open_ends(cost, start, end)
+    visit = [node for node in visit if node not in (first, last)]
+
+    path = [first] + nearest_neighbor(padded, first, visit) + [last]
+    best = path_cost(padded, path)
+    while time.perf_counter() < deadline:
+        candidate = or_opt(padded, two_opt(padded, path, deadline), deadline)
+        candidate_cost = path_cost(padded, candidate)
+        if candidate_cost >= best - _EPS:
+            break
+        path, best = candidate, candidate_cost
+
+    return path[1:-1], best
+
+
+def _service_start(job: Dict[str, Any], arrival: float) -> Optional[float]:
+    """Earliest time service can begin at ``job`` when arriving at ``arrival`` (None if every time window is missed)."""
+    windows = job.get("time_windows")
+    if not windows:
+        return arrival
+    for window_start, window_end in sorted(windows):
+        if arrival <= window_end:
+            return max(arrival, float(window_start))
+    return None
+
+
+def _job_amounts(job: Dict[str, Any], dimensions: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(delivery, pickup) vectors of a job; the legacy ``amount`` counts as delivery, like in VROOM."""
+    delivery = job.get("delivery", job.get("amount")) or [0] * dimensions
+    pickup = job.get("pickup") or [0] * dimensions
+    return np.asarray(delivery, dtype=float), np.asarray(pickup, dtype=float)
+
+
+def route_loads(vehicle: Dict[str, Any], jobs: List[Dict[str, Any]], order: List[int]) -> Optional[List[np.ndarray]]:
+    """
+    Vehicle load at the start and after each job of ``order``, or None without a capacity.
+
+    Deliveries are on board from the start, pickups are added where they happen.
+    """
+    capacity = vehicle.get("capacity")
+    if not capacity:
+        return None
+    amounts = [_job_amounts(jobs[node], len(capacity)) for node in order]
+    load = sum((delivery for delivery, _ in amounts), np.zeros(len(capacity)))
+    loads = [load]
+    for delivery, pickup in amounts:
+        load = load - delivery + pickup
+        loads.append(load)
+    return loads
+
+
+def route_feasible(
+    vehicle: Dict[str, Any],
+    jobs: List[Dict[str, Any]],
+    order: List[int],
+    durations: np.ndarray,
+    start: Optional[int],
+    end: Optional[int],
+) -> bool:
+    """
+    Checks skills, ``max_tasks``, capacity over the whole route, job time windows
+    (waiting is allowed) and the vehicle ``time_window`` for visiting ``order``.
+    """
+    if vehicle.get("max_tasks") is not None and len(order) > vehicle["max_tasks"]:
+        return False
+    skills = set(vehicle.get("skills") or ())
+    if any(not set(jobs[node].get("skills") or ()) <= skills for node in order):
+        return False
+    loads = route_loads(vehicle, jobs, order)
+    if loads is not None:
+        capacity = np.asarray(vehicle["capacity"], dtype=float)
+        if any((load > capacity + _EPS).any() for load in loads):
+            return False
+
+    window = vehicle.get("time_window")
+    time_now = float(window[0]) if window else 0.0
+    previous = start
+    for node in order:
+        if previous is not None:
+            time_now += float(durations[previous, node])
+        begin = _service_start(jobs[node], time_now)
+        if begin is None:
+            return False
+        time_now = begin + jobs[node].get("service", 0)
+        previous = node
+    if end is not None and previous is not None:
+        time_now += float(durations[previous, end])
+    return not window or time_now <= window[1] + _EPS
+
+
+def cheapest_insertion(
+    vehicles: List[Dict[str, Any]],
+    jobs: List[Dict[str, Any]],
+    orders: List[List[int]],
+    node: int,
+    durations: List[np.ndarray],
+    starts: List[Optional[int]],
+    ends: List[Optional[int]],
+) -> Optional[Tuple[int, int, float]]:
+    """
+    Cheapest feasible position for job ``node`` in any of the routes.
+
+    ``orders[v]`` is the job order of ``vehicles[v]`` and ``durations[v]`` its cost
+    matrix (vehicles may use different profiles). Positions of a route are tried in
+    increasing detour until one passes ``route_feasible``, so the usual cost is one
+    vectorized detour computation and one feasibility check per route.
+
+    Returns (vehicle index, position in the order, added cost) or None.
+    """
+    best = None
+    for v, (vehicle, order) in enumerate(zip(vehicles, orders)):
+        cost = durations[v]
+        before = [starts[v]] + order
+        after = order + [ends[v]]
+        detours = np.array([
+            (cost[a, node] if a is not None else 0.0)
+            + (cost[node, b] if b is not None else 0.0)
+            - (cost[a, b] if a is not None and b is not None else 0.0)
+            for a, b in zip(before, after)
+        ])
+        for position in np.argsort(detours, kind="stable"):
+            if best is not None and detours[position] >= best[2]:
+                break
+            candidate = order[:position] + [node] + order[position:]
+            if route_feasible(vehicle, jobs, candidate, cost, starts[v], ends[v]):
+                best = (v, int(position), float(detours[position]))
+                break
+    return best
+
+
+def improve_route(
+    vehicle: Dict[str, Any],
+    jobs: List[Dict[str, Any]],
+    order: List[int],
+    durations: np.ndarray,
+    start: Optional[int],
+    end: Optional[int],
+    deadline: float,
+) -> List[int]:
+    """2-opt and Or-opt on one route; the result is kept only if it is cheaper and still feasible."""
+    if len(order) < 3:
+        return order
+    padded, first, last = _with_open_ends(np.asarray(durations, dtype=float), start, end)
+    path = [first] + list(order) + [last]
+    candidate = or_opt(padded, two_opt(padded, path, deadline), deadline)
+    if path_cost(padded, candidate) < path_cost(padded, path) - _EPS and route_feasible(vehicle, jobs, candidate[1:-1], durations, start, end):
+        return candidate[1:-1]
+    return order
+
+
+def build_route(
+    vehicle: Dict[str, Any],
+    jobs: List[Dict[str, Any]],
+    order: List[int],
+    durations: np.ndarray,
+    distances: Optional[np.ndarray],
+    start: Optional[int],
+    end: Optional[int],
+) -> Dict[str, Any]:
+    """
+    Builds a VROOM-style route for ``vehicle`` visiting ``jobs`` in ``order``.
+
+    Node ``i < len(jobs)`` of the matrices is ``jobs[i]``; ``start``/``end`` are the
+    node indices of the vehicle start and end (or None). Step ``arrival``,
+    ``duration`` and ``distance`` are cumulative like in ORS optimization responses.
+    The route starts at the vehicle's ``time_window`` start; service times, waiting
+    for job time windows and (with a vehicle capacity) the load are reported.
+    """
+    steps = []
+    window = vehicle.get("time_window")
+    arrival = float(window[0]) if window else 0.0
+    travel = distance = service_total = waiting_total = 0.0
+    previous = start
+    loads = route_loads(vehicle, jobs, order)
+    if start is not None:
+        steps.append({"type": "start", "location": vehicle["start"], "arrival": int(round(arrival)), "duration": 0, "distance": 0})
+        if loads is not None:
+            steps[-1]["load"] = [int(value) for value in loads[0]]
+
+    def advance(node: int):
+        nonlocal arrival, travel, distance, previous
+        if previous is not None:
+            leg = float(durations[previous, node])
+            arrival += leg
+            travel += leg
+            if distances is not None:
+                distance += float(distances[previous, node])
+        previous = node
+
+    for position, node in enumerate(order):
+        job = jobs[node]
+        advance(node)
+        service = job.get("service", 0)
+        begin = _service_start(job, arrival)
+        waiting = 0.0 if begin is None else begin - arrival
+        steps.append({
+            "type": "job",
+            "id": job["id"],
+            "location": job["location"],
+            "service": service,
+            "waiting_time": int(round(waiting)),
+            "arrival": int(round(arrival)),
+            "duration": int(round(travel)),
+            "distance": int(round(distance)),
+        })
+        if loads is not None:
+            steps[-1]["load"] = [int(value) for value in loads[position + 1]]
+        arrival += waiting + service
+        service_total += service
+        waiting_total += waiting
+
+    if end is not None:
+        advance(end)
+        steps.append({
+            "type": "end",
+            "location": vehicle["end"],
+            "arrival": int(round(arrival)),
+            "duration": int(round(travel)),
+            "distance": int(round(distance)),
+        })
+        if loads is not None:
+            steps[-1]["load"] = [int(value) for value in loads[-1]]
+
+    return {
+        "vehicle": vehicle["id"],
+        "cost": int(round(travel)),
+        "service": int(service_total),
+        "duration": int(round(travel)),
+        "waiting_time": int(round(waiting_total)),
+        "priority": 0,
+        "distance": int(round(distance)),
+        "steps": steps,
+    }
+
+
+def build_solution(routes: List[Dict[str, Any]], unassigned: Optional[List[Dict[str, Any]]] = None, solving_ms: int = 0) -> Dict[str, Any]:
+    """Wraps routes into the top-level shape of an ORS optimization response."""
+    unassigned = unassigned or []
+    return {
+        "code": 0,
+        "summary": {
+            "cost": sum(route["cost"] for route in routes),
+            "routes": len(routes),
+            "unassigned": len(unassigned),
+            "service": sum(route["service"] for route in routes),
+            "duration": sum(route["duration"] for route in routes),
+            "waiting_time": sum(route["waiting_time"] for route in routes),
+            "priority": sum(route["priority"] for route in routes),
+            "distance": sum(route.get("distance", 0) for route in routes),
+            "computing_times": {"loading": 0, "solving": solving_ms, "routing": 0},
+        },
+        "unassigned": unassigned,
+        "routes": routes,
+    }
+
+
+def _project(points: np.ndarray, origin: Optional[np.ndarray] = None) -> np.ndarray:
+    """Projects (lon, lat) degrees to local planar meters around ``origin`` (default: centroid)."""
+    origin = points.mean(axis=0) if origin is None else origin
+    scale = np.array([np.cos(np.radians(origin[1])), 1.0]) * (np.pi / 180) * 6371008.8
+    return (points - origin) * scale
+
+
+def sweep_partition(
+    points: np.ndarray,
+    shares: List[float],
+    center: Optional[np.ndarray] = None,
+    weights: Optional[np.ndarray] = None,
+) -> List[List[int]]:
+    """
+    Sweep clustering: orders points by polar angle around ``center`` and cuts the
+    sweep into ``len(shares)`` contiguous sectors whose total weight is proportional
+    to ``shares`` (e.g. vehicle capacities).
+
+    The sweep starts at the widest angular gap so no sector straddles a dense area.
+    Returns one list of point indices per share, in the order of ``shares``.
+    """
+    points = np.asarray(points, dtype=float)
+    n_groups = len(shares)
+    if len(points) == 0:
+        return [[] for _ in range(n_groups)]
+    center = points.mean(axis=0) if center is None else np.asarray(center, dtype=float)
+    xy = _project(points, center)
+    angles = np.arctan2(xy[:, 1], xy[:, 0])
+    order = np.argsort(angles)
+    sorted_angles = angles[order]
+    gaps = np.diff(np.concatenate((sorted_angles, [sorted_angles[0] + 2 * np.pi])))
+    order = np.roll(order, -(int(np.argmax(gaps)) + 1))
+
+    weights = np.ones(len(points)) if weights is None else np.asarray(weights, dtype=float)
+    cumulative = np.cumsum(weights[order])
+    bounds = np.cumsum(np.asarray(shares, dtype=float))
+    bounds = bounds / bounds[-1] * cumulative[-1]
+    # Point k goes to the first sector whose cumulative bound covers its midpoint weight
+    group_of = np.searchsorted(bounds, cumulative - weights[order] / 2, side="right")
+    group_of = np.minimum(group_of, n_groups - 1)
+    groups: List[List[int]] = [[] for _ in range(n_groups)]
+    for index, group in zip(order.tolist(), group_of.tolist()):
+        groups[group].append(index)
+    return groups
+
+
+def kmeans_partition(points: np.ndarray, n_groups: int, iterations: int = 50, seed: int = 0) -> Tuple[List[List[int]], np.ndarray]:
+    """
+    K-means (Lloyd's algorithm with k-means++ seeding) on locally projected coordinates.
+
+    Returns the member indices of each cluster and the cluster centroids as (lon, lat).
+    Empty clusters are possible when there are fewer distinct points than groups.
+    """
+    points = np.asarray(points, dtype=float)
+    if len(points) == 0:
+        return [[] for _ in range(n_groups)], np.zeros((n_groups, 2))
+    origin = points.mean(axis=0)
+    xy = _project(points, origin)
+    rng = np.random.default_rng(seed)
+    centroids = [xy[rng.integers(len(xy))]]
+    for _ in range(1, n_groups):
+        d2 = np.min(((xy[:, None, :] - np.array(centroids)[None]) ** 2).sum(axis=2), axis=1)
+        total = d2.sum()
+        centroids.append(xy[rng.choice(len(xy), p=d2 / total)] if total > 0 else xy[rng.integers(len(xy))])
+    centroids = np.array(centroids)
+
+    labels = np.zeros(len(xy), dtype=np.int64)
+    for iteration in range(iterations):
+        distances = ((xy[:, None, :] - centroids[None]) ** 2).sum(axis=2)
+        new_labels = distances.argmin(axis=1)
+        if iteration and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for group in range(n_groups):
+            members = xy[labels == group]
+            if len(members):
+                centroids[group] = members.mean(axis=0)
+
+    groups = [np.flatnonzero(labels == group).tolist() for group in range(n_groups)]
+    scale = np.array([np.cos(np.radians(origin[1])), 1.0]) * (np.pi / 180) * 6371008.8
+    return groups, centroids / scale + origin
+
+
+def assign_clusters(cluster_centers: np.ndarray, vehicle_points: np.ndarray) -> List[int]:
+    """
+    Greedily matches clusters to vehicles by the distance between cluster centroid
+    and vehicle depot, closest pairs first. Returns the vehicle index of each cluster.
+    """
+    origin = np.vstack((cluster_centers, vehicle_points)).mean(axis=0)
+    a, b = _project(np.asarray(cluster_centers, dtype=float), origin), _project(np.asarray(vehicle_points, dtype=float), origin)
+    distances = np.hypot(*(a[:, None, :] - b[None]).transpose(2, 0, 1))
+    assignment = [-1] * len(a)
+    for flat in np.argsort(distances, axis=None):
+        cluster, vehicle = divmod(int(flat), len(b))
+        if assignment[cluster] == -1 and vehicle not in assignment:
+            assignment[cluster] = vehicle
+    return assignment
+
+
+def merge_solutions(solutions: List[Dict[str, Any]], extra_unassigned: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Merges ORS optimization responses of independent sub-problems into one response.
+
+    Routes and unassigned tasks are concatenated, numeric summary fields are summed
+    (element-wise for amount vectors) and computing times take the maximum, since
+    the sub-problems were solved in parallel.
+    """
+    routes: List[Dict[str, Any]] = []
+    unassigned: List[Dict[str, Any]] = []
+    summary: Dict[str, Any] = {}
+    computing_times: Dict[str, int] = {}
+    for solution in solutions:
+        routes.extend(solution.get("routes", []))
+        unassigned.extend(solution.get("unassigned", []))
+        for key, value in solution.get("summary", {}).items():
+            if key == "computing_times":
+                for phase, ms in value.items():
+                    computing_times[phase] = max(computing_times.get(phase, 0), ms)
+            elif isinstance(value, list):
+                current = summary.get(key, [0] * len(value))
+                summary[key] = [x + y for x, y in zip(current, value)]
+            elif isinstance(value, (int, float)):
+                summary[key] = summary.get(key, 0) + value
+    unassigned.extend(extra_unassigned or [])
+    summary["routes"] = len(routes)
+    summary["unassigned"] = len(unassigned)
+    summary["computing_times"] = computing_times
+    return {"code": 0, "summary": summary, "unassigned": unassigned, "routes": routes}
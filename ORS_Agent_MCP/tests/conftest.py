@@ -0,0 +1,50 @@
+import asyncio
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from fake_ors_server import FakeORS, make_handler  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def fake_ors_url():
+    """Base URL of a zero-latency fake ORS server (benchmarks/fake_ors_server.py) on a free port."""
+    fake = FakeORS(route_points=200, poi_count=20, geocode_results=5, polygon_points=60)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(fake, {"default": 0.0}, 0.0, 0.0))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(scope="session")
+def server(fake_ors_url, tmp_path_factory):
+    """The MCP server module, configured against the fake ORS server with throwaway cache and log dirs."""
+    data = tmp_path_factory.mktemp("server")
+    os.environ.update({
+        "OPENROUTE_SERVICE_API": "test-key",
+        "ORS_BASE_URL": fake_ors_url,
+        "ORS_LOG_DIR": str(data / "logs"),
+        "ORS_LOG_LEVEL": "WARNING",
+        "ORS_GEOCODE_CACHE_PATH": str(data / "geocode.sqlite3"),
+        "ORS_TRAVEL_TIME_STORE_PATH": str(data / "travel_times.sqlite3"),
+    })
+    import ors_mcp_server
+    return ors_mcp_server
+
+
+@pytest.fixture(scope="session")
+def run():
+    """Runs a coroutine on one event loop shared by the session (the server's HTTP client is bound to it)."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
@@ -0,0 +1,27 @@
+import pytest
+from fastmcp import Client
+
+import run_benchmarks
+
+
+def test_every_registered_tool_has_a_scenario(server, run):
+    tools = run(server.mcp.get_tools())
+    assert set(run_benchmarks.SCENARIOS) == set(tools)
+    assert set(run_benchmarks.PREPARE) <= set(run_benchmarks.SCENARIOS)
+
+
+@pytest.mark.parametrize("tool", ["reoptimize_routes", "render_isochrone_map", "cancel_optimization"])
+def test_stateful_scenario_runs_against_the_fake_server(server, run, tool, tmp_path, monkeypatch):
+    # Maps are written below the working directory
+    monkeypatch.chdir(tmp_path)
+
+    async def scenario():
+        async with Client(server.mcp) as client:
+            return await run_benchmarks.run_scenario(
+                client, tool, run_benchmarks.SCENARIOS[tool],
+                requests=2, concurrency=2, distinct=0, seed=1, use_cache=True,
+                prepare=run_benchmarks.PREPARE[tool],
+            )
+
+    result = run(scenario())
+    assert result["requests"] == 2 and result["errors"] == {}
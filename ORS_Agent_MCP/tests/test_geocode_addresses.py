@@ -0,0 +1,44 @@
+import asyncio
+
+from openrouteservice import exceptions as ors_exceptions
+
+
+def test_batch_resolves_duplicates_once_and_keeps_input_order(server, run, monkeypatch):
+    queries = []
+    in_flight = peak = 0
+    pelias_search = server.ors_client.pelias_search
+
+    async def recording_search(**kwargs):
+        nonlocal in_flight, peak
+        queries.append(kwargs["text"])
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if kwargs["text"] == "Atlantis":
+                raise ors_exceptions.ApiError(404, "no match")
+            return await pelias_search(**kwargs)
+        finally:
+            in_flight -= 1
+
+    monkeypatch.setattr(server.ors_client, "pelias_search", recording_search)
+    texts = ["Heidelberg", "Mannheim", " heidelberg", "Atlantis", "Speyer", "Worms", "MANNHEIM"]
+    result = run(server.geocode_addresses.fn(texts=texts, max_concurrency=2, use_cache=False))
+
+    assert sorted(queries) == ["Atlantis", "Heidelberg", "Mannheim", "Speyer", "Worms"]
+    assert peak == 2
+    assert [item["query"] for item in result["results"]] == texts
+    assert result["results"][2]["result"] == result["results"][0]["result"] is not None
+    assert (result["unique_queries"], result["failed"]) == (5, 1)
+    assert result["results"][3]["result"] is None and "no match" in result["results"][3]["error"]
+
+
+def test_batch_answers_repeated_queries_from_the_cache(server, run, monkeypatch):
+    run(server.geocode_addresses.fn(texts=["Heidelberg"]))
+
+    async def unexpected_search(**kwargs):
+        raise AssertionError("cached query sent to ORS")
+
+    monkeypatch.setattr(server.ors_client, "pelias_search", unexpected_search)
+    result = run(server.geocode_addresses.fn(texts=["HEIDELBERG "]))
+    assert result["failed"] == 0 and result["results"][0]["result"]["features"]
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+
+@pytest.fixture
+def maps_dir(tmp_path, monkeypatch):
+    # Maps are written to 'maps' below the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "maps"
+
+
+async def background_maps_written(server):
+    await asyncio.gather(*list(server._background_tasks))
+
+
+def test_render_map_reports_the_map_as_still_rendering(server, run, maps_dir):
+    result = run(server.get_isochrones.fn(locations=[(8.68, 49.41)], range=[300, 600], render_map=True))
+
+    assert result["map_status"] == "rendering"
+    run(background_maps_written(server))
+    assert (maps_dir.parent / result["map_path"]).is_file()
+
+
+def test_render_isochrone_map_writes_the_stored_result(server, run, maps_dir):
+    result = run(server.get_isochrones.fn(locations=[(8.68, 49.41)], range=[300], include_polygons=False))
+    assert "map_path" not in result
+
+    rendered = run(server.render_isochrone_map.fn(result["result_id"], output_filename="../../outside/map.html"))
+    # Directories in the requested name are dropped, the map stays inside 'maps'
+    assert rendered == {"result_id": result["result_id"], "map_path": os.path.join("maps", "map.html")}
+    html = (maps_dir / "map.html").read_text(encoding="utf-8")
+    assert "isochroneLayer" in html and not (maps_dir.parent.parent / "outside").exists()
+
+    rendered = run(server.render_isochrone_map.fn(result["result_id"]))
+    assert os.path.dirname(rendered["map_path"]) == "maps"
+    assert (maps_dir.parent / rendered["map_path"]).is_file()
+
+
+def test_render_isochrone_map_rejects_unknown_and_expired_results(server, run, maps_dir, monkeypatch):
+    with pytest.raises(ValueError, match="Unknown or expired isochrone result 'missing'"):
+        run(server.render_isochrone_map.fn("missing"))
+
+    result = run(server.get_isochrones.fn(locations=[(8.68, 49.41)], range=[300]))
+    later = time.monotonic() + server.isochrone_results.ttl + 1
+    monkeypatch.setattr(server.isochrone_results, "_clock", lambda: later)
+    with pytest.raises(ValueError, match="call get_isochrones again"):
+        run(server.render_isochrone_map.fn(result["result_id"]))
+    assert not maps_dir.exists()
@@ -0,0 +1,233 @@
+import math
+import sqlite3
+import threading
+
+import numpy as np
+
+from ors_cache import TTLCache, SQLiteGeocodeCache, PoiTileCache, TravelTimeStore, optimization_cache_key, directions_cache_key
+from ors_geo import offset_point, haversine_m, disk_covered
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_and_evicts_least_recently_used():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=2, ttl=10, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # "b" is the least recently used
+    assert cache.get("b") is None and cache.get("a") == 1
+
+    clock.now = 10
+    assert cache.get("a", "gone") == "gone"
+    cache.set("d", 4, ttl=100)
+    clock.now = 50
+    assert cache.get("d") == 4
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["expirations"]) == (3, 2, 1, 1)
+
+
+def test_directions_key_rounds_to_about_a_meter():
+    key = directions_cache_key([(8.6814912, 49.4146), (8.69, 49.42)], "driving-car", "fastest", False)
+    assert key == directions_cache_key([(8.6814908, 49.41460004), (8.69, 49.42)], "driving-car", "fastest", False)
+    assert key != directions_cache_key([(8.68151, 49.4146), (8.69, 49.42)], "driving-car", "fastest", False)
+    assert key != directions_cache_key([(8.6814912, 49.4146), (8.69, 49.42)], "driving-car", "shortest", False)
+
+
+def accessed_at(path, query):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT accessed_at FROM geocode_cache WHERE query_key = ?", (query,)).fetchone()[0]
+
+
+def test_geocode_hits_buffer_access_times_until_flush(tmp_path):
+    path = str(tmp_path / "geocode.sqlite3")
+    cache = SQLiteGeocodeCache(path, touch_interval=3600)
+    cache.set("berlin", [{"name": "Berlin"}])
+    stored = accessed_at(path, "berlin")
+
+    assert cache.get("Berlin ") == [{"name": "Berlin"}]
+    assert accessed_at(path, "berlin") == stored
+
+    cache.flush_access_times()
+    assert accessed_at(path, "berlin") > stored
+
+
+def test_geocode_counters_are_exact_under_threads(tmp_path):
+    cache = SQLiteGeocodeCache(str(tmp_path / "geocode.sqlite3"), touch_interval=0)
+    cache.set("berlin", [])
+
+    def lookups():
+        for _ in range(200):
+            cache.get("berlin")
+            cache.get("hamburg")
+
+    threads = [threading.Thread(target=lookups) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (800, 800)
+
+
+def test_travel_time_counters_are_exact_under_threads(tmp_path):
+    store = TravelTimeStore(str(tmp_path / "travel.sqlite3"))
+    stored, unknown = [[8.0, 49.0], [8.1, 49.0]], [[9.0, 49.0]]
+    store.store("driving-car", stored, stored, np.ones((2, 2)), np.ones((2, 2)))
+
+    def lookups():
+        for _ in range(100):
+            store.lookup("driving-car", stored)
+            store.lookup("driving-car", unknown, stored)
+
+    threads = [threading.Thread(target=lookups) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = store.stats()
+    assert (stats["hits"], stats["misses"]) == (1600, 800)
+
+
+def poi(lon, lat, osm_id):
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]}, "properties": {"osm_id": osm_id}}
+
+
+def test_poi_cache_answers_from_a_containing_circle():
+    cache = PoiTileCache()
+    near = poi(*offset_point(13.4, 52.5, 100, 0), 1)
+    far = poi(*offset_point(13.4, 52.5, 900, 0), 2)
+    cache.store((13.4, 52.5), 1000, 100, None, {"features": [near, far]})
+
+    answer = cache.lookup((13.4, 52.5), 500, 100)
+    assert [f["properties"]["osm_id"] for f in answer["features"]] == [1]
+    assert answer["features"][0]["properties"]["distance"] == round(haversine_m(13.4, 52.5, *near["geometry"]["coordinates"]), 2)
+
+
+def test_poi_cache_does_not_answer_when_circles_leave_a_gap():
+    # A large circle whose edge clips the query rim at 7.5 degrees, between any
+    # 15-degree sample points, and a small one inside the query: together they
+    # cover every ring sample but not the POI in the sliver next to the rim.
+    lon, lat = 13.4, 52.5
+    cache = PoiTileCache()
+
+    def polar(r, degrees, origin=(lon, lat)):
+        return offset_point(*origin, r * math.cos(math.radians(degrees)), r * math.sin(math.radians(degrees)))
+
+    big = polar(2000, 187.5)
+    small = polar(300, 200)
+    samples = [(lon, lat)] + [polar(r, 15 * k) for r in (500, 1000) for k in range(24)]
+    assert max(haversine_m(*big, *point) for point in samples) < 2996
+    cache.store(big, 2996, 100, None, {"features": []})
+    cache.store(small, 500, 100, None, {"features": []})
+
+    hidden = polar(999.5, 7.5)
+    assert haversine_m(*big, *hidden) > 2996 and haversine_m(*small, *hidden) > 500
+    assert cache.lookup((lon, lat), 1000, 100) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_travel_time_prune_keeps_max_entries_when_batches_share_a_timestamp(tmp_path):
+    store = TravelTimeStore(str(tmp_path / "travel.sqlite3"), max_entries=10)
+    points = [[8.0 + i / 100, 49.0] for i in range(3)]
+    matrix = np.arange(9, dtype=float).reshape(3, 3)
+    store.store("driving-car", points, points, matrix, matrix)
+    newer = [[9.0 + i / 100, 49.0] for i in range(3)]
+    store.store("driving-car", newer, newer, matrix, matrix)
+
+    store.prune()
+    assert store.stats()["size"] == 10
+    durations, _ = store.lookup("driving-car", newer)
+    assert not np.isnan(durations).any()
+
+
+def test_travel_time_lookup_fills_stored_pairs_only(tmp_path):
+    store = TravelTimeStore(str(tmp_path / "travel.sqlite3"))
+    points = [[8.0, 49.0], [8.1, 49.0]]
+    store.store("driving-car", points, points, np.array([[0.0, 60.0], [np.nan, 0.0]]), np.array([[0.0, 900.0], [950.0, 0.0]]))
+    durations, distances = store.lookup("driving-car", points + [[8.2, 49.0]])
+    assert durations[0, 1] == 60.0 and distances[0, 1] == 900.0
+    assert np.isnan(durations[1, 0]) and np.isnan(durations[2]).all()
+    assert np.isnan(store.lookup("cycling-regular", points)[0]).all()
+
+
+def test_optimization_cache_key_ignores_order_and_id_spelling():
+    jobs = [{"id": 1, "location": [8.1, 49.0], "service": 300}, {"id": 2, "location": [8.2, 49.0]}]
+    vehicles = [{"id": 1, "profile": "driving-car", "start": [8.0, 49.0]}]
+    key = optimization_cache_key(jobs, vehicles)
+
+    reordered = [{"location": [8.2, 49.0], "id": "2"}, {"service": 300.0, "id": 1.0, "location": [8.1, 49.0]}]
+    assert optimization_cache_key(reordered, [{"start": [8.0, 49.0], "profile": "driving-car", "id": "1"}]) == key
+
+    moved = [jobs[0], {"id": 2, "location": [8.3, 49.0]}]
+    assert optimization_cache_key(moved, vehicles) != key
+    assert optimization_cache_key(jobs, vehicles, decompose="sweep") != key
+    assert optimization_cache_key(jobs, vehicles, matrices={"driving-car": {"durations": [[0]]}}) != key
+
+
+def test_identical_problem_is_solved_once(server, run, monkeypatch):
+    calls = []
+    optimization = server.ors_client.optimization
+
+    async def counting_optimization(payload):
+        calls.append(payload)
+        return await optimization(payload)
+
+    monkeypatch.setattr(server.ors_client, "optimization", counting_optimization)
+    jobs = [{"id": i, "location": [8.60 + 0.01 * i, 49.40]} for i in range(1, 4)]
+    vehicles = [{"id": 7, "profile": "driving-car", "start": [8.6, 49.41]}]
+    first = run(server.optimize_vehicle_routes.fn(jobs=jobs, vehicles=vehicles))
+    second = run(server.optimize_vehicle_routes.fn(jobs=list(reversed(jobs)), vehicles=vehicles))
+    assert len(calls) == 1
+    assert second["routes"] == first["routes"] and second["solution_id"] != first["solution_id"]
+
+
+def test_precomputed_matrices_do_not_share_solutions_with_plain_calls(server, run, monkeypatch):
+    calls = []
+    optimization = server.ors_client.optimization
+
+    async def counting_optimization(payload):
+        calls.append(payload)
+        return await optimization(payload)
+
+    monkeypatch.setattr(server.ors_client, "optimization", counting_optimization)
+    monkeypatch.setattr(server, "TRAVEL_TIME_AUTOFILL", False)
+    jobs = [{"id": i, "location": [11.0 + 0.01 * i, 50.0], "service": 91} for i in range(1, 4)]
+    vehicles = [{"id": 1, "profile": "driving-car", "start": [11.0, 50.01]}]
+    run(server.optimize_vehicle_routes.fn(jobs=jobs, vehicles=vehicles))
+    run(server.optimize_vehicle_routes.fn(jobs=jobs, vehicles=vehicles, precompute_matrices=True))
+    run(server.optimize_vehicle_routes.fn(jobs=jobs, vehicles=vehicles, precompute_matrices=True))
+    assert len(calls) == 2
+    assert "matrices" not in calls[0] and "matrices" in calls[1]
+
+
+def test_poi_cache_merges_circles_that_cover_the_query_together():
+    cache = PoiTileCache()
+    west, east = offset_point(13.4, 52.5, -400, 0), offset_point(13.4, 52.5, 400, 0)
+    shared = poi(13.4, 52.5, 1)
+    cache.store(west, 600, 100, None, {"features": [shared, poi(*offset_point(13.4, 52.5, -300, 0), 2)]})
+    cache.store(east, 600, 100, None, {"features": [shared, poi(*offset_point(13.4, 52.5, 250, 0), 3)]})
+
+    answer = cache.lookup((13.4, 52.5), 300, 100)
+    assert answer["information"]["cached_queries_used"] == 2
+    assert [f["properties"]["osm_id"] for f in answer["features"]] == [1, 3, 2]
+
+    # The circles cross 447 m north and south of the center, so 500 m pokes out of both
+    assert cache.lookup((13.4, 52.5), 500, 100) is None
+
+
+def test_disk_covered_is_exact_for_circles_meeting_inside_the_query():
+    lon, lat = 13.4, 52.5
+    halves = [(*offset_point(lon, lat, dx, 0), 1000) for dx in (-600, 600)]
+    assert disk_covered((lon, lat), 500, halves)
+    # Moving the circles apart opens a lens-shaped gap around the center
+    apart = [(*offset_point(lon, lat, dx, 0), 1000) for dx in (-1010, 1010)]
+    assert not disk_covered((lon, lat), 500, apart)
+    assert not disk_covered((lon, lat), 500, [])
@@ -0,0 +1,36 @@
+import pytest
+
+from ors_coverage import coverage_analysis, geometry_area_m2
+
+
+def square(lon, lat, size):
+    return {"type": "Polygon", "coordinates": [[[lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat]]]}
+
+
+def feature(geometry, group_index, value=300):
+    return {"type": "Feature", "geometry": geometry, "properties": {"group_index": group_index, "value": value}}
+
+
+def test_hole_is_subtracted_from_area():
+    outer = square(8.0, 49.0, 0.02)["coordinates"][0]
+    hole = square(8.005, 49.005, 0.01)["coordinates"][0]
+    full = geometry_area_m2(square(8.0, 49.0, 0.02))
+    assert geometry_area_m2({"type": "Polygon", "coordinates": [outer, hole]}) == pytest.approx(full * 0.75, rel=1e-3)
+
+
+def test_two_overlapping_squares():
+    # The second square is shifted by half its width: union 1.5, intersection and overlap 0.5, each alone 0.5
+    first, second = square(8.0, 49.0, 0.02), square(8.01, 49.0, 0.02)
+    [analysis] = coverage_analysis([feature(first, 0), feature(second, 1)], grid_size=400)
+    area = geometry_area_m2(first) / 1e6
+    assert analysis["locations"] == 2 and analysis["max_overlap"] == 2
+    assert analysis["area_sum_km2"] == pytest.approx(2 * area, rel=1e-3)
+    assert analysis["union_area_km2"] == pytest.approx(1.5 * area, rel=0.02)
+    assert analysis["intersection_area_km2"] == pytest.approx(0.5 * area, rel=0.02)
+    assert analysis["overlap_area_km2"] == analysis["intersection_area_km2"]
+    assert analysis["unique_areas_km2"]["0"] == pytest.approx(0.5 * area, rel=0.03)
+
+
+def test_groups_by_range_value():
+    features = [feature(square(8.0, 49.0, 0.01), 0, 300), feature(square(8.0, 49.0, 0.02), 0, 600)]
+    assert [entry["value"] for entry in coverage_analysis(features)] == [300, 600]
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from ors_geo import (
+    DETOUR_FACTOR, PROFILE_SPEEDS_MPS, haversine_m, offset_point, haversine_matrix, equirectangular_matrix,
+    distance_matrix, nearest_k, estimate_travel_matrices, line_cumulative_m, split_line, project_onto_line
+)
+
+
+def random_points(n, seed):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(8.0, 9.0, n), rng.uniform(49.0, 50.0, n)]).tolist()
+
+
+def test_haversine_matrix_matches_the_scalar_formula():
+    a, b = random_points(5, 1), random_points(7, 2)
+    matrix = haversine_matrix(a, b)
+    assert matrix.shape == (5, 7)
+    expected = [[haversine_m(*p, *q) for q in b] for p in a]
+    assert np.allclose(matrix, expected)
+
+
+def test_equirectangular_stays_within_a_fraction_of_a_percent():
+    a, b = random_points(20, 3), random_points(20, 4)
+    exact = haversine_matrix(a, b)
+    assert np.allclose(equirectangular_matrix(a, b), exact, rtol=1e-3)
+    assert np.allclose(distance_matrix(a, b, "equirectangular"), equirectangular_matrix(a, b))
+
+
+def test_distance_matrix_rejects_unknown_methods_and_bad_shapes():
+    with pytest.raises(ValueError, match="Unknown distance method"):
+        distance_matrix([(8, 49)], [(9, 49)], method="manhattan")
+    with pytest.raises(ValueError):
+        distance_matrix([8, 49], [(9, 49)])
+    assert distance_matrix([], [(9, 49)]).shape == (0, 1)
+
+
+def test_nearest_k_matches_a_full_sort_across_chunks():
+    queries, candidates = random_points(23, 5), random_points(40, 6)
+    indices, distances = nearest_k(queries, candidates, 4, chunk_rows=5)
+    full = haversine_matrix(queries, candidates)
+    assert np.array_equal(indices, np.argsort(full, axis=1)[:, :4])
+    assert np.allclose(distances, np.sort(full, axis=1)[:, :4])
+
+    indices, distances = nearest_k(queries[:2], candidates[:3], 10)
+    assert indices.shape == (2, 3) and (np.diff(distances, axis=1) >= 0).all()
+
+
+def test_estimates_scale_straight_line_by_detour_and_profile_speed():
+    points = [(8.68, 49.41), (8.70, 49.42), (8.65, 49.40)]
+    durations, distances = estimate_travel_matrices(points, profile="cycling-regular")
+    straight = haversine_matrix(points, points)
+    assert np.allclose(distances, straight * DETOUR_FACTOR)
+    assert np.allclose(durations, distances / PROFILE_SPEEDS_MPS["cycling-regular"])
+    unknown, _ = estimate_travel_matrices(points, profile="hovercraft")
+    assert np.allclose(unknown, distances / PROFILE_SPEEDS_MPS["driving-car"])
+
+
+def test_estimate_distances_tool(server, run, monkeypatch):
+    origins = [(8.68, 49.41), (8.70, 49.42)]
+    stores = [(8.90, 49.50), (8.681, 49.411), (8.71, 49.42)]
+    result = run(server.estimate_distances.fn(origins=origins, destinations=stores, k=1))
+    assert [entry["destinations"][0]["index"] for entry in result["nearest"]] == [1, 2]
+
+    result = run(server.estimate_distances.fn(origins=origins, destinations=stores))
+    assert result["distances"][0][1] == round(haversine_m(*origins[0], *stores[1]), 1)
+    assert len(result["durations"]) == 2 and len(result["durations"][0]) == 3
+
+    monkeypatch.setattr(server, "ESTIMATE_MAX_ELEMENTS", 4)
+    with pytest.raises(ValueError, match="pass k"):
+        run(server.estimate_distances.fn(origins=origins, destinations=stores))
+
+
+def test_split_line_cuts_long_edges_into_equal_pieces():
+    line = [(8.0, 49.0), (8.1, 49.0), (8.1, 49.05)]
+    total = line_cumulative_m(line)[-1]
+    pieces = split_line(line, 2000)
+    lengths = [line_cumulative_m(piece)[-1] for piece in pieces]
+    assert len(pieces) == int(np.ceil(total / 2000))
+    assert max(lengths) == pytest.approx(2000, rel=1e-3) and sum(lengths) == pytest.approx(total, rel=1e-6)
+    assert all(a[-1] == b[0] for a, b in zip(pieces, pieces[1:]))
+    assert pieces[0][0] == [8.0, 49.0] and pieces[-1][-1] == [8.1, 49.05]
+    assert split_line(line, 10 * total) == [[list(point) for point in line]]
+
+
+def test_project_onto_line_measures_along_and_across():
+    line = [(8.0, 49.0), (8.1, 49.0), (8.1, 49.1)]
+    first_edge = haversine_m(8.0, 49.0, 8.1, 49.0)
+    beside = offset_point(8.05, 49.0, 0, 300)
+    past_corner = offset_point(8.1, 49.05, 200, 0)
+    along, offset = project_onto_line([beside, past_corner, (8.0, 49.0)], line, chunk_cells=2)
+    assert along[0] == pytest.approx(first_edge / 2, rel=1e-3) and offset[0] == pytest.approx(300, rel=1e-3)
+    assert along[1] == pytest.approx(first_edge + haversine_m(8.1, 49.0, 8.1, 49.05), rel=1e-3)
+    assert offset[1] == pytest.approx(200, rel=2e-3)
+    assert (along[2], offset[2]) == (0.0, 0.0)
+
+
+def test_pois_along_route_searches_every_segment_and_ranks_along_the_route(server, run, monkeypatch):
+    payloads = []
+    pois = server.ors_client.pois
+    landmark = {"type": "Feature", "geometry": {"type": "Point", "coordinates": [8.68, 49.41]},
+                "properties": {"osm_type": 1, "osm_id": 42}}
+
+    async def recording_pois(payload):
+        payloads.append(payload)
+        data = await pois(payload)
+        # Every segment reports the same landmark, as neighbouring corridors do at their joints
+        return {**data, "features": data["features"] + [landmark]}
+
+    monkeypatch.setattr(server.ors_client, "pois", recording_pois)
+    result = run(server.get_pois_along_route.fn(
+        locations=[(8.68, 49.41), (9.2, 49.6), (9.8, 49.5)], buffer=2000, filters={"category_ids": 570}
+    ))
+
+    corridor = result["corridor"]
+    assert corridor["segments"] == len(payloads) > 1
+    for payload in payloads:
+        # Cut points are interpolated in degrees, so piece lengths match the target only to ~0.1%
+        assert line_cumulative_m(payload["geometry"]["geojson"]["coordinates"])[-1] <= corridor["segment_length"] * 1.01
+        assert payload["filters"] == {"category_ids": [570]}
+    ids = [feature["properties"]["osm_id"] for feature in result["features"]]
+    assert len(ids) == len(set(ids)) and ids.count(42) == 1
+    assert corridor["duplicates_removed"] >= len(payloads) - 1
+    along = [feature["properties"]["distance_along_route"] for feature in result["features"]]
+    assert along == sorted(along)
+
+    with pytest.raises(ValueError, match="buffer must be between"):
+        run(server.get_pois_along_route.fn(locations=[(8.68, 49.41), (9.2, 49.6)], buffer=5000))
@@ -0,0 +1,149 @@
+import copy
+
+import pytest
+
+from ors_geometry import (
+    encode_polyline, decode_polyline, simplify_indices, compact_directions, compact_isochrones, merge_isochrones,
+    split_waypoints, stitch_directions,
+)
+
+
+def square(lon, lat, size):
+    return {"type": "Polygon", "coordinates": [[[lon, lat], [lon + size, lat], [lon + size, lat + size], [lon, lat + size], [lon, lat]]]}
+
+
+def isochrone_response(centers, bbox):
+    return {
+        "type": "FeatureCollection",
+        "bbox": bbox,
+        "features": [
+            {"type": "Feature", "geometry": square(lon, lat, 0.01), "properties": {"group_index": i, "value": 300}}
+            for i, (lon, lat) in enumerate(centers)
+        ],
+        "metadata": {"query": {"profile": "driving-car"}},
+    }
+
+
+def test_merge_isochrones_shifts_group_index_by_chunk_start():
+    first = isochrone_response([(8.0, 49.0), (8.1, 49.0)], [8.0, 49.0, 8.11, 49.01])
+    second = isochrone_response([(8.2, 49.0)], [8.2, 49.0, 8.21, 49.01])
+    locations = [(8.0, 49.0), (8.1, 49.0), (8.2, 49.0)]
+
+    merged = merge_isochrones([first, second], [0, 2], locations)
+    assert [f["properties"]["group_index"] for f in merged["features"]] == [0, 1, 2]
+    assert merged["bbox"] == [8.0, 49.0, 8.21, 49.01]
+    assert merged["metadata"]["chunks"] == 2
+    assert merged["metadata"]["query"]["locations"] == [list(location) for location in locations]
+    assert second["features"][0]["properties"]["group_index"] == 0
+
+
+def test_isochrones_chunk_centers_and_split_intervals(server, run, monkeypatch):
+    monkeypatch.setattr(server, "ISOCHRONES_MAX_LOCATIONS", 3)
+    locations = [(8.60 + 0.01 * i, 49.40) for i in range(7)]
+    result = run(server.get_isochrones.fn(locations=locations, range=[900], intervals=3))
+
+    assert result["metadata"]["chunks"] == 3
+    groups = sorted({f["properties"]["group_index"] for f in result["features"]})
+    assert groups == list(range(7))
+    assert sorted({f["properties"]["value"] for f in result["features"]}) == [300, 600, 900]
+
+
+@pytest.mark.parametrize("arguments", [{"intervals": 0}, {"intervals": 2, "range": [300, 600]}])
+def test_isochrones_reject_unusable_intervals(server, run, arguments):
+    with pytest.raises(ValueError, match="intervals"):
+        run(server.get_isochrones.fn(locations=[(8.68, 49.41)], **arguments))
+
+
+def test_polyline_matches_the_reference_encoding_and_round_trips():
+    # Example from the Google polyline documentation, as (longitude, latitude)
+    points = [[-120.2, 38.5], [-120.95, 40.7], [-126.453, 43.252]]
+    assert encode_polyline(points) == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+    assert decode_polyline("_p~iF~ps|U_ulLnnqC_mqNvxq`@") == points
+
+    line = [[8.681495, 49.41461], [8.687872, 49.420318], [-0.000012, -0.5]]
+    assert decode_polyline(encode_polyline(line, precision=6), precision=6) == line
+
+
+def test_simplify_drops_collinear_points_but_keeps_requested_ones():
+    line = [[8.0 + i * 0.001, 49.0] for i in range(10)]
+    assert simplify_indices(line, 1.0).tolist() == [0, 9]
+    assert simplify_indices(line, 1.0, keep=[4]).tolist() == [0, 4, 9]
+    bent = line[:5] + [[8.005, 49.01]] + line[6:]
+    assert 5 in simplify_indices(bent, 1.0).tolist()
+
+
+def test_compact_directions_remaps_way_points_without_touching_the_input():
+    line = [[8.0 + i * 0.001, 49.0] for i in range(10)]
+    response = {"routes": [{
+        "geometry": encode_polyline(line),
+        "way_points": [0, 6, 9],
+        "segments": [{"steps": [{"way_points": [0, 6]}, {"way_points": [6, 9]}]}],
+    }]}
+    original = copy.deepcopy(response)
+
+    compacted = compact_directions(response, zoom=10, geometry_format="coordinates")
+    route = compacted["routes"][0]
+    assert route["geometry"] == [line[0], line[6], line[9]]
+    assert route["way_points"] == [0, 1, 2]
+    assert [step["way_points"] for step in route["segments"][0]["steps"]] == [[0, 1], [1, 2]]
+    assert compacted["compaction"]["vertices_before"] == 10 and compacted["compaction"]["vertices_after"] == 3
+    assert response == original
+
+
+def test_compact_isochrones_keeps_rings_closed():
+    ring = [[8.0 + 0.01 * x, 49.0] for x in range(5)] + [[8.04, 49.01], [8.0, 49.01], [8.0, 49.0]]
+    response = {"type": "FeatureCollection", "features": [{"type": "Feature", "properties": {}, "geometry": {"type": "Polygon", "coordinates": [ring]}}]}
+
+    geometry = compact_isochrones(response, zoom=8, precision=3)["features"][0]["geometry"]
+    compacted = geometry["coordinates"][0]
+    assert 4 <= len(compacted) < len(ring) and compacted[0] == compacted[-1]
+
+    encoded = compact_isochrones(response, geometry_format="polyline")["features"][0]["geometry"]
+    assert encoded["encoding"] == "polyline" and decode_polyline(encoded["coordinates"][0]) == ring
+
+
+def test_split_waypoints_overlaps_chunks_by_one():
+    assert split_waypoints(10, 4) == [(0, 4), (3, 7), (6, 10)]
+    assert split_waypoints(4, 4) == [(0, 4)]
+    assert split_waypoints(5, 4) == [(0, 4), (3, 5)]
+    assert split_waypoints(1, 4) == [(0, 1)]
+    with pytest.raises(ValueError):
+        split_waypoints(5, 1)
+
+
+def directions_chunk(line, way_points, bbox):
+    return {"routes": [{
+        "geometry": encode_polyline(line),
+        "way_points": way_points,
+        "summary": {"distance": 100.0 * (len(line) - 1), "duration": 10.0 * (len(line) - 1)},
+        "segments": [
+            {"distance": 1.0, "steps": [{"way_points": [a, b]}]} for a, b in zip(way_points, way_points[1:])
+        ],
+        "bbox": bbox,
+    }], "metadata": {"query": {"profile": "driving-car"}}}
+
+
+def test_stitch_directions_shifts_way_points_into_the_joined_line():
+    # Waypoints A, B, C, D: chunk 1 routes A-B-C over 5 vertices, chunk 2 routes C-D over 3
+    line = [[8.0 + 0.01 * i, 49.0] for i in range(7)]
+    first = directions_chunk(line[:5], [0, 2, 4], [8.0, 49.0, 8.04, 49.0])
+    second = directions_chunk(line[4:], [0, 2], [8.04, 49.0, 8.06, 49.0])
+    locations = [line[0], line[2], line[4], line[6]]
+
+    route = stitch_directions([first, second], locations)["routes"][0]
+    assert decode_polyline(route["geometry"]) == line
+    assert route["way_points"] == [0, 2, 4, 6]
+    assert [step["way_points"] for segment in route["segments"] for step in segment["steps"]] == [[0, 2], [2, 4], [4, 6]]
+    assert [line[i] for i in route["way_points"]] == locations
+    assert route["summary"] == {"distance": 600.0, "duration": 60.0}
+    assert route["bbox"] == [8.0, 49.0, 8.06, 49.0]
+
+
+def test_long_itineraries_are_fetched_in_chunks(server, run, monkeypatch):
+    monkeypatch.setattr(server, "DIRECTIONS_MAX_WAYPOINTS", 3)
+    locations = [(8.60 + 0.01 * i, 49.40 + 0.002 * i) for i in range(7)]
+    result = run(server.get_directions.fn(locations=locations, use_cache=False))
+    route = result["routes"][0]
+    assert result["metadata"]["chunks"] == 3
+    assert len(route["way_points"]) == 7 and route["way_points"] == sorted(route["way_points"])
+    assert len(route["segments"]) == 6
@@ -0,0 +1,134 @@
+import asyncio
+
+import httpx
+import pytest
+from openrouteservice import exceptions as ors_exceptions
+
+from ors_http import ORSHttpClient, ORSApiError, ORSTransportError
+from ors_ratelimit import RetryPolicy
+
+
+def make_client(handler, retries=2):
+    client = ORSHttpClient("key", base_url="http://ors.test", retry_policy=RetryPolicy(max_retries=retries, base_delay=0.001, max_delay=0.01))
+    client._client = httpx.AsyncClient(base_url="http://ors.test", transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_html_gateway_error_is_retried():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(503, text="<html>Service Unavailable</html>")
+        return httpx.Response(200, json={"ok": True})
+
+    assert asyncio.run(make_client(handler).post("/pois", {})) == {"ok": True}
+    assert len(calls) == 2
+
+
+def test_html_error_surfaces_as_api_error_with_status():
+    client = make_client(lambda request: httpx.Response(429, text="<html>Too Many</html>", headers={"Retry-After": "0"}), retries=0)
+    with pytest.raises(ORSApiError) as excinfo:
+        asyncio.run(client.post("/pois", {}))
+    assert excinfo.value.status == 429
+    assert "Too Many" in excinfo.value.message
+
+
+def test_invalid_json_on_success_is_http_error():
+    client = make_client(lambda request: httpx.Response(200, text="not json"))
+    with pytest.raises(ors_exceptions.HTTPError):
+        asyncio.run(client.post("/pois", {}))
+
+
+def test_transport_errors_retried_for_get_only():
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        if len(calls) == 1:
+            raise httpx.ReadError("connection reset")
+        return httpx.Response(200, json={"features": []})
+
+    assert asyncio.run(make_client(handler).get("/geocode/search", {"text": "x"})) == {"features": []}
+    assert calls == ["GET", "GET"]
+
+    calls.clear()
+    with pytest.raises(ORSTransportError):
+        asyncio.run(make_client(handler).post("/pois", {}))
+    assert calls == ["POST"]
+
+
+def test_connect_errors_retried_for_post_and_wrapped_when_exhausted():
+    def refuse(request):
+        raise httpx.ConnectError("refused")
+
+    with pytest.raises(ors_exceptions.HTTPError) as excinfo:
+        asyncio.run(make_client(refuse, retries=1).post("/pois", {}))
+    assert isinstance(excinfo.value.cause, httpx.ConnectError)
+
+
+def test_read_timeout_is_ors_timeout():
+    def slow(request):
+        raise httpx.ReadTimeout("slow")
+
+    with pytest.raises(ors_exceptions.Timeout):
+        asyncio.run(make_client(slow, retries=0).get("/geocode/search"))
+
+
+def test_against_fake_server(fake_ors_url):
+    client = ORSHttpClient("key", base_url=fake_ors_url)
+    data = asyncio.run(client.pelias_search("Heidelberg"))
+    assert len(data["features"]) == 5
+
+
+def test_one_pooled_client_is_reused_until_closed():
+    client = ORSHttpClient("secret", base_url="http://ors.test/", timeout=5, connect_timeout=2)
+    pooled = client.client
+    assert client.client is pooled
+    assert pooled.headers["Authorization"] == "secret" and str(pooled.base_url) == "http://ors.test"
+    assert (pooled.timeout.read, pooled.timeout.connect) == (5, 2)
+
+    asyncio.run(client.aclose())
+    assert pooled.is_closed and client.client is not pooled
+
+
+def test_from_env_reads_pool_and_timeout_settings(monkeypatch):
+    monkeypatch.setenv("ORS_BASE_URL", "http://localhost:8082/ors")
+    monkeypatch.setenv("ORS_HTTP_TIMEOUT", "12")
+    monkeypatch.setenv("ORS_OPTIMIZATION_TIMEOUT", "300")
+    monkeypatch.setenv("ORS_HTTP_MAX_CONNECTIONS", "7")
+    monkeypatch.delenv("ORS_RATE_LIMITS", raising=False)
+    monkeypatch.delenv("ORS_RATE_LIMIT_ENABLED", raising=False)
+    client = ORSHttpClient.from_env("key")
+    assert client.base_url == "http://localhost:8082/ors" and client.optimization_timeout == 300
+    assert client.client.timeout.read == 12 and client._limits.max_connections == 7
+    # Self-hosted instances have no quota to respect
+    assert client.rate_limiter is None
+
+
+def test_concurrent_calls_share_the_client_and_optimization_gets_its_own_timeout():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"routes": []})
+
+    client = make_client(handler)
+    client.optimization_timeout = 300
+
+    async def calls():
+        return await asyncio.gather(
+            client.directions([(8.68, 49.41), (8.69, 49.42)], preference="fastest"),
+            client.pelias_search("Heidelberg", size=3),
+            client.optimization({"jobs": [], "vehicles": []}),
+        )
+
+    pooled = client._client
+    asyncio.run(calls())
+    assert client._client is pooled
+    by_path = {request.url.path: request for request in requests}
+    assert set(by_path) == {"/v2/directions/driving-car/json", "/geocode/search", "/optimization"}
+    assert by_path["/geocode/search"].url.params["size"] == "3"
+    assert by_path["/optimization"].extensions["timeout"]["read"] == 300
+    assert by_path["/v2/directions/driving-car/json"].extensions["timeout"]["read"] != 300
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from ors_jobs import BackgroundJobManager, QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED
+
+
+def test_workers_are_bounded_and_progress_is_recorded():
+    async def scenario():
+        manager = BackgroundJobManager(max_workers=1)
+        release = asyncio.Event()
+
+        async def slow(progress):
+            await progress.report_progress(1, 4, message="a quarter")
+            await release.wait()
+            return "slow"
+
+        async def fast(progress):
+            return "fast"
+
+        first = manager.submit("test", slow)
+        second = manager.submit("test", fast)
+        await asyncio.sleep(0.01)
+        assert (first.status, second.status) == (RUNNING, QUEUED)
+        assert (first.progress, first.message) == (0.25, "a quarter")
+        assert not await manager.wait(second, 0.01)
+
+        release.set()
+        assert await manager.wait(second, 1.0)
+        assert (first.result, second.result) == ("slow", "fast")
+        assert first.to_status()["progress"] == 1.0 and second.status == SUCCEEDED
+
+    asyncio.run(scenario())
+
+
+def test_pending_limit_failures_and_cancellation():
+    async def scenario():
+        manager = BackgroundJobManager(max_workers=1, max_pending=2)
+
+        async def broken(progress):
+            raise ValueError("no vehicles")
+
+        async def forever(progress):
+            await asyncio.Event().wait()
+
+        failed = manager.submit("test", broken)
+        stuck = manager.submit("test", forever)
+        with pytest.raises(RuntimeError, match="Too many pending jobs"):
+            manager.submit("test", forever)
+
+        assert await manager.wait(failed, 1.0)
+        assert (failed.status, failed.error) == (FAILED, "no vehicles")
+        assert manager.cancel(stuck.job_id)
+        assert await manager.wait(stuck, 1.0) and stuck.status == CANCELLED
+        assert not manager.cancel(stuck.job_id) and not manager.cancel("missing")
+
+    asyncio.run(scenario())
+
+
+def test_finished_jobs_expire_after_result_ttl():
+    async def scenario():
+        manager = BackgroundJobManager(result_ttl=0)
+
+        async def done(progress):
+            return 1
+
+        job = manager.submit("test", done)
+        await manager.wait(job, 1.0)
+        await asyncio.sleep(0.01)
+        assert manager.get(job.job_id) is None and manager.list_jobs() == []
+
+    asyncio.run(scenario())
+
+
+def test_submitted_optimization_can_be_polled_and_fetched(server, run):
+    jobs = [{"id": i, "location": [8.66 + 0.01 * i, 49.41]} for i in range(1, 4)]
+    vehicles = [{"id": 1, "profile": "driving-car", "start": [8.66, 49.40]}]
+    submitted = run(server.submit_optimization.fn(jobs=jobs, vehicles=vehicles))
+    assert submitted["summary"] == {"jobs": 3, "vehicles": 1, "shipments": 0}
+
+    result = run(server.get_optimization_result.fn(job_id=submitted["job_id"], wait_seconds=5))
+    assert result["status"] == SUCCEEDED
+    visited = [step["id"] for step in result["result"]["routes"][0]["steps"] if step["type"] == "job"]
+    assert sorted(visited) == [1, 2, 3]
+    assert run(server.get_optimization_status.fn(job_id=submitted["job_id"]))["progress"] == 1.0
+
+    cancelled = run(server.cancel_optimization.fn(job_id=submitted["job_id"]))
+    assert cancelled["cancel_requested"] is False
+    with pytest.raises(ValueError, match="Unknown or expired"):
+        run(server.get_optimization_status.fn(job_id="missing"))
@@ -0,0 +1,92 @@
+import json
+import sys
+
+import pytest
+from loguru import logger
+
+from ors_logging import JsonLinesSink, configure_logging, sampled, sampling_patcher
+
+
+@pytest.fixture
+def restore_logger():
+    yield
+    logger.remove()
+    logger.configure(patcher=lambda record: None)
+    logger.add(sys.stderr)
+
+
+class Level:
+    def __init__(self, name):
+        self.name = name
+
+
+def record(level, **extra):
+    return {"level": Level(level), "extra": extra}
+
+
+def test_sampling_only_thins_per_call_info_records(monkeypatch):
+    assert sampling_patcher(1.0) is None
+    patch = sampling_patcher(0.25)
+
+    def kept(level, **extra):
+        entry = record(level, **extra)
+        patch(entry)
+        return sampled(entry)
+
+    monkeypatch.setattr("ors_logging.random.random", lambda: 0.5)
+    assert not kept("INFO", function="get_directions")
+    assert kept("INFO")
+    assert kept("WARNING", function="get_directions")
+    monkeypatch.setattr("ors_logging.random.random", lambda: 0.1)
+    assert kept("SUCCESS", function="get_directions")
+
+
+def test_every_sink_keeps_the_same_sampled_records(tmp_path, restore_logger):
+    configure_logging("development", log_dir=str(tmp_path), sample_rate=0.5)
+    logger.remove()
+    # Re-add two sinks with the profile's filter; the patcher set by configure_logging stays
+    first, second = [], []
+    logger.add(first.append, format="{message}", filter=sampled)
+    logger.add(second.append, format="{message}", filter=sampled)
+    for i in range(200):
+        logger.bind(function="get_pois").info("call {}", i)
+
+    assert first == second and 0 < len(first) < 200
+
+
+def test_json_lines_sink_writes_one_object_per_record(tmp_path, restore_logger):
+    stale = tmp_path / "ors_mcp_server_2000-01-01.jsonl"
+    stale.write_text("{}\n")
+    sink = JsonLinesSink(str(tmp_path), retention_days=30)
+    logger.remove()
+    handler = logger.add(sink, format="{message}")
+    logger.bind(function="get_pois", request_id="r1").info("Found {} POIs", 3)
+    try:
+        raise ValueError("bad tile")
+    except ValueError:
+        logger.exception("Tile failed")
+    logger.remove(handler)
+    sink.stop()
+
+    assert not stale.exists()
+    [path] = tmp_path.glob("ors_mcp_server_*.jsonl")
+    first, second = [json.loads(line) for line in path.read_text().splitlines()]
+    assert (first["level"], first["message"], first["function"]) == ("INFO", "Found 3 POIs", "get_pois")
+    assert first["extra"] == {"request_id": "r1"}
+    assert second["exception"] == "ValueError: bad tile"
+
+
+def test_production_profile_keeps_info_in_the_json_file_only(tmp_path, restore_logger):
+    with pytest.raises(ValueError, match="Unknown log profile"):
+        configure_logging("verbose")
+
+    # Reconfiguring also replaces the sampling patcher of the earlier call
+    configure_logging("production", log_dir=str(tmp_path), sample_rate=0.0)
+    configure_logging("production", log_dir=str(tmp_path), sample_rate=1.0)
+    logger.debug("not kept")
+    logger.bind(function="get_pois").info("kept")
+    logger.complete()
+    logger.remove()
+
+    [path] = tmp_path.glob("*.jsonl")
+    assert [json.loads(line)["message"] for line in path.read_text().splitlines()] == ["kept"]
@@ -0,0 +1,209 @@
+import asyncio
+
+import numpy as np
+import pytest
+from openrouteservice import exceptions as ors_exceptions
+
+from ors_cache import TravelTimeStore
+from ors_geo import haversine_matrix, offset_point
+from ors_matrix import (
+    plan_matrix_tiles, fetch_matrix, fetch_matrix_with_store, fetch_sparse_matrix, matrix_to_json, to_optimization_matrix
+)
+from ors_singleflight import gather_or_cancel
+
+
+def test_tiles_cover_matrix_once_within_limit():
+    tiles = plan_matrix_tiles(130, 75, max_elements=3500)
+    covered = np.zeros((130, 75), dtype=int)
+    for s0, s1, d0, d1 in tiles:
+        assert (s1 - s0) * (d1 - d0) <= 3500
+        covered[s0:s1, d0:d1] += 1
+    assert (covered == 1).all()
+
+
+def test_few_sources_use_wide_tiles():
+    assert plan_matrix_tiles(2, 1000, max_elements=3500) == [(0, 2, 0, 1000)]
+    assert plan_matrix_tiles(0, 10) == []
+
+
+class FailingClient:
+    """Matrix client whose first tile fails while the others are still in flight."""
+
+    def __init__(self):
+        self.started = 0
+        self.cancelled = 0
+
+    async def matrix(self, payload, profile="driving-car"):
+        self.started += 1
+        if self.started == 1:
+            await asyncio.sleep(0.01)
+            raise ors_exceptions.ApiError(500, "boom")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+def test_failed_tile_cancels_the_others():
+    client = FailingClient()
+    points = [[8.0 + i / 1000, 49.0] for i in range(20)]
+
+    async def run():
+        with pytest.raises(ors_exceptions.ApiError):
+            await asyncio.wait_for(fetch_matrix(client, points, points, max_elements=100, concurrency=4), 5)
+
+    asyncio.run(run())
+    assert client.started == 4
+    assert client.cancelled == 3
+
+
+def test_gather_or_cancel_returns_results_in_order():
+    async def value(x, delay):
+        await asyncio.sleep(delay)
+        return x
+
+    assert asyncio.run(gather_or_cancel(value(1, 0.02), value(2, 0.0))) == [1, 2]
+
+
+def test_json_and_optimization_conversion():
+    matrix = np.array([[0.0, 1.236], [np.nan, 0.0]])
+    assert matrix_to_json(matrix) == [[0.0, 1.24], [None, 0.0]]
+    assert to_optimization_matrix(matrix) is None
+    assert to_optimization_matrix(np.array([[0.0, 1.6], [2.4, 0.0]])) == [[0, 2], [2, 0]]
+
+
+def test_get_distance_matrix_defaults_to_both_metrics(server, run):
+    result = run(server.get_distance_matrix.fn(locations=[(8.68, 49.41), (8.69, 49.42), (8.70, 49.40)]))
+    assert len(result["durations"]) == 3 and len(result["distances"][0]) == 3
+    only = run(server.get_distance_matrix.fn(locations=[(8.68, 49.41), (8.69, 49.42)], metrics=["distance"]))
+    assert "durations" not in only and only["distances"][0][0] == 0.0
+
+
+class UnusedClient:
+    async def matrix(self, payload, profile="driving-car"):
+        raise AssertionError("no matrix request expected")
+
+
+def test_prefetch_beyond_the_tile_budget_is_refused_up_front(tmp_path):
+    store = TravelTimeStore(str(tmp_path / "travel.sqlite3"))
+    points = [[8.0 + i / 1000, 49.0] for i in range(20)]
+
+    with pytest.raises(ors_exceptions.ApiError) as excinfo:
+        asyncio.run(fetch_matrix_with_store(UnusedClient(), store, points, max_elements=100, max_tiles=3))
+    assert excinfo.value.status == 429
+    assert "needs 4 matrix requests" in str(excinfo.value)
+
+
+def test_decomposed_subproblems_get_only_their_own_matrix_rows(server, run, monkeypatch):
+    # Two clusters of three jobs; matrix cell (i, j) holds 100 * i + j so slices are recognizable
+    locations = [[8.60 + 0.001 * i, 49.40] for i in range(3)] + [[8.90 + 0.001 * i, 49.40] for i in range(3)]
+    jobs = [{"id": i + 1, "location": location, "location_index": i} for i, location in enumerate(locations)]
+    vehicles = [
+        {"id": 1, "profile": "driving-car", "start": [8.60, 49.41], "start_index": 6, "end_index": 6},
+        {"id": 2, "profile": "driving-car", "start": [8.90, 49.41], "start_index": 7},
+    ]
+    full = [[100 * i + j for j in range(8)] for i in range(8)]
+    matrices = {"driving-car": {"durations": full, "distances": full}, "cycling-regular": {"durations": full}}
+
+    payloads = []
+    optimization = server.ors_client.optimization
+
+    async def recording_optimization(payload):
+        payloads.append(payload)
+        return await optimization(payload)
+
+    monkeypatch.setattr(server.ors_client, "optimization", recording_optimization)
+    run(server.optimize_vehicle_routes.fn(jobs=jobs, vehicles=vehicles, matrices=matrices, decompose="kmeans"))
+
+    assert len(payloads) == 2
+    for payload in payloads:
+        vehicle = payload["vehicles"][0]
+        depot = 6 if vehicle["id"] == 1 else 7
+        used = sorted(job["id"] - 1 for job in payload["jobs"]) + [depot]
+        assert list(payload["matrices"]) == ["driving-car"]
+        assert payload["matrices"]["driving-car"]["durations"] == [[100 * i + j for j in used] for i in used]
+        assert [used[job["location_index"]] for job in payload["jobs"]] == [job["id"] - 1 for job in payload["jobs"]]
+        assert used[vehicle["start_index"]] == depot
+    assert [job["location_index"] for job in jobs] == list(range(6))
+
+
+def test_optimizations_fill_missing_pairs_within_the_autofill_budget(server, run, monkeypatch):
+    payloads = []
+    optimization = server.ors_client.optimization
+
+    async def recording_optimization(payload):
+        payloads.append(payload)
+        return await optimization(payload)
+
+    monkeypatch.setattr(server.ors_client, "optimization", recording_optimization)
+    vehicles = [{"id": 1, "profile": "driving-car", "start": [10.0, 50.01]}]
+    jobs = [{"id": i, "location": [10.0 + 0.01 * i, 50.0], "service": 81} for i in range(1, 5)]
+    run(server.optimize_vehicle_routes.fn(jobs=jobs, vehicles=vehicles))
+    # A re-plan with one more job only needs the new job's pairs
+    replan = jobs + [{"id": 5, "location": [10.05, 50.0], "service": 81}]
+    run(server.optimize_vehicle_routes.fn(jobs=replan, vehicles=vehicles))
+    assert all("matrices" in payload for payload in payloads)
+    assert len(payloads[1]["matrices"]["driving-car"]["durations"]) == 6
+
+    monkeypatch.setattr(server, "TRAVEL_TIME_AUTOFILL_MAX_TILES", 0)
+    cold = [{"id": i, "location": [10.5 + 0.01 * i, 50.0], "service": 81} for i in range(1, 5)]
+    run(server.optimize_vehicle_routes.fn(jobs=cold, vehicles=vehicles))
+    assert "matrices" not in payloads[2] and "location_index" not in payloads[2]["jobs"][0]
+
+
+class StraightLineClient:
+    """Matrix client answering with haversine distances at 10 m/s, recording each request."""
+
+    def __init__(self):
+        self.requests = []
+
+    async def matrix(self, payload, profile="driving-car"):
+        locations = payload["locations"]
+        sources = [locations[i] for i in payload["sources"]]
+        destinations = [locations[j] for j in payload["destinations"]]
+        self.requests.append((len(sources), len(destinations)))
+        distances = haversine_matrix(sources, destinations)
+        return {"durations": (distances / 10).tolist(), "distances": distances.tolist()}
+
+
+def test_sparse_matrix_requests_only_missing_wanted_pairs(tmp_path):
+    store = TravelTimeStore(str(tmp_path / "travel.sqlite3"))
+    client = StraightLineClient()
+    sources = [[8.0 + i / 100, 49.0] for i in range(6)]
+    destinations = [[8.0 + j / 100, 49.1] for j in range(8)]
+    wanted = np.zeros((6, 8), dtype=bool)
+    wanted[0, :2] = wanted[1, 1] = wanted[5, 7] = True
+
+    result = asyncio.run(fetch_sparse_matrix(client, store, sources, destinations, wanted, max_elements=4))
+    assert all(rows * columns <= 4 for rows, columns in client.requests)
+    assert result["fetched_pairs"] < wanted.size and result["cached_pairs"] == 0
+    expected = haversine_matrix(sources, destinations)
+    assert np.allclose(result["distances"][wanted], expected[wanted])
+    assert np.isnan(result["durations"][~wanted]).all()
+
+    client.requests.clear()
+    wanted[2, 3] = True
+    again = asyncio.run(fetch_sparse_matrix(client, store, sources, destinations, wanted, max_elements=4))
+    assert client.requests == [(1, 1)]
+    assert (again["cached_pairs"], again["fetched_pairs"]) == (4, 1)
+
+
+def test_reachable_candidates_prune_far_pairs_and_reuse_stored_ones(server, run):
+    depots = [(8.68, 49.41), (8.80, 49.41)]
+    # The fake ORS drives at 11.1 m/s: about 45 s, 90 s and 9 minutes from the first depot
+    candidates = [offset_point(8.68, 49.41, 500, 0), offset_point(8.68, 49.41, 0, 1000), offset_point(8.68, 49.41, 0, 6000)]
+    result = run(server.find_reachable_candidates.fn(origins=depots, candidates=candidates, max_range=60))
+
+    assert list(result["reachable"]) == ["0"] and [c["index"] for c in result["reachable"]["0"]] == [0]
+    assert result["candidates"][0]["origin"] == 0 and result["unreachable_candidates"] == 2
+    stats = result["stats"]
+    # 60 s at the 150 km/h car bound is 2.5 km: only the two nearby candidates of the first depot survive
+    assert (stats["pairs"], stats["pruned_pairs"], stats["fetched_pairs"]) == (6, 4, 2)
+
+    again = run(server.find_reachable_candidates.fn(origins=depots, candidates=candidates, max_range=120))
+    assert [c["index"] for c in again["reachable"]["0"]] == [0, 1]
+    assert again["stats"]["cached_pairs"] == 2 and again["stats"]["tiles"] == 0
+
+    with pytest.raises(ValueError, match="Unknown range_type"):
+        run(server.find_reachable_candidates.fn(origins=depots, candidates=candidates, max_range=60, range_type="energy"))
@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+import pytest
+
+from ors_metrics import MetricsRegistry, ServerMetrics, upstream_endpoint
+
+
+def test_counters_and_gauges_render_in_prometheus_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("path",))
+    in_flight = registry.gauge("in_flight", "In flight")
+    requests.inc(path='/a"b')
+    requests.inc(2, path='/a"b')
+    in_flight.inc()
+    in_flight.dec(0.5)
+
+    text = registry.render_prometheus()
+    assert '# TYPE requests_total counter\nrequests_total{path="/a\\"b"} 3\n' in text
+    assert "in_flight 0.5\n" in text
+    with pytest.raises(ValueError, match="expects labels"):
+        requests.inc(route="/a")
+    with pytest.raises(ValueError, match="already registered"):
+        registry.gauge("in_flight", "Again")
+
+
+def test_histogram_buckets_are_cumulative_and_quantiles_interpolate():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(1.0, 2.0, 4.0))
+    for value in (0.5, 1.5, 1.5, 3.0, 10.0):
+        latency.observe(value)
+
+    lines = registry.render_prometheus().splitlines()
+    assert 'latency_seconds_bucket{le="2"} 3' in lines and 'latency_seconds_bucket{le="+Inf"} 5' in lines
+    assert "latency_seconds_sum 16.5" in lines and "latency_seconds_count 5" in lines
+
+    [snapshot] = latency.snapshot()
+    assert (snapshot["count"], snapshot["mean"]) == (5, 3.3)
+    # Rank 2.5 of 5 falls three quarters into the (1, 2] bucket holding ranks 2 and 3
+    assert snapshot["p50"] == pytest.approx(1.75)
+    assert snapshot["p99"] == 4.0  # +Inf bucket reports its lower bound
+
+
+def test_upstream_endpoint_labels():
+    assert upstream_endpoint("/v2/directions/driving-car/json") == "directions"
+    assert upstream_endpoint("/geocode/search") == "geocode"
+    assert upstream_endpoint("/") == "unknown"
+
+
+def test_track_tool_records_outcomes_and_response_sizes():
+    metrics = ServerMetrics()
+
+    @metrics.track_tool
+    async def lookup(fail=False):
+        if fail:
+            raise KeyError("missing")
+        return {"ok": True}
+
+    serialize = metrics.serializer(json.dumps)
+
+    async def calls():
+        serialize(await lookup())
+        with pytest.raises(KeyError):
+            await lookup(fail=True)
+
+    asyncio.run(calls())
+    outcomes = {entry["outcome"]: entry["count"] for entry in metrics.tool_latency.snapshot()}
+    assert outcomes == {"success": 1, "error": 1}
+    assert metrics.tool_errors.snapshot() == [{"tool": "lookup", "exception": "KeyError", "value": 1.0}]
+    assert metrics.tool_in_flight.snapshot() == [{"tool": "lookup", "value": 0.0}]
+    [size] = metrics.tool_response_bytes.snapshot()
+    assert (size["tool"], size["sum"]) == ("lookup", len(json.dumps({"ok": True})))
+
+
+def test_tools_called_from_another_tool_are_not_recorded_separately():
+    metrics = ServerMetrics()
+
+    @metrics.track_tool
+    async def inner():
+        return 1
+
+    @metrics.track_tool
+    async def outer():
+        return sum(await asyncio.gather(inner(), inner()))
+
+    async def calls():
+        assert await outer() == 2
+        await inner()
+
+    asyncio.run(calls())
+    counts = {entry["tool"]: entry["count"] for entry in metrics.tool_latency.snapshot()}
+    assert counts == {"outer": 1, "inner": 1}
+
+
+def test_server_tools_and_ors_requests_are_measured(server, run):
+    run(server.get_directions.fn(locations=[(8.68, 49.41), (8.69, 49.42)], use_cache=False))
+    snapshot = server.get_metrics.fn()
+    tools = {entry["tool"] for entry in snapshot["ors_mcp_tool_duration_seconds"]}
+    endpoints = {entry["endpoint"] for entry in snapshot["ors_upstream_duration_seconds"]}
+    assert "get_directions" in tools and "directions" in endpoints
+
+
+def test_batch_geocoding_counts_as_one_tool_call(server, run):
+    def geocode_calls():
+        snapshot = server.get_metrics.fn()["ors_mcp_tool_duration_seconds"]
+        return {entry["tool"]: entry["count"] for entry in snapshot if entry["tool"].startswith("geocode_address")}
+
+    before = geocode_calls()
+    run(server.geocode_addresses.fn(texts=["1 Metric Lane", "2 Metric Lane", "3 Metric Lane"], use_cache=False))
+    after = geocode_calls()
+    assert after["geocode_addresses"] == before.get("geocode_addresses", 0) + 1
+    assert after.get("geocode_address", 0) == before.get("geocode_address", 0)
@@ -0,0 +1,33 @@
+from ors_poi_categories import PoiCategoryIndex
+
+index = PoiCategoryIndex()
+
+
+def test_find_by_id_name_word_and_misspelling():
+    assert [(m["id"], m["match"]) for m in index.find("108")] == [(108, "id")]
+    assert index.find("hotel")[0]["id"] == 108
+    assert [(m["name"], m["match"]) for m in index.find("charging")] == [("charging_station", "prefix"), ("ev_charging", "word")]
+    assert index.find("restarant")[0]["name"] == "restaurant"
+
+
+def test_expand_group_into_children():
+    group = next(m for m in index.find("sustenance") if m["parent_id"] is None)
+    children = index.expand(group["id"])
+    assert children and all(child["parent_id"] == group["id"] for child in children)
+    assert index.expand(108) == []
+
+
+def test_get_pois_leaves_the_callers_filters_untouched(server, run):
+    filters = {"category_ids": 596}
+    result = run(server.get_pois.fn(coordinates=(8.68, 49.41), buffer=500, limit=50, filters=filters, use_cache=False))
+    assert filters == {"category_ids": 596}
+    assert result["type"] == "FeatureCollection"
+
+
+def test_blank_query_lists_the_groups_instead_of_everything(server, run):
+    groups = index.find("  ", limit=3)
+    assert len(groups) == len(index.taxonomy) and all(m["parent_id"] is None and m["match"] == "group" for m in groups)
+
+    result = run(server.find_poi_categories.fn(query=""))
+    assert result["category_ids"] == [] and len(result["category_group_ids"]) == len(index.taxonomy)
+    assert all("children" not in match for match in result["matches"])
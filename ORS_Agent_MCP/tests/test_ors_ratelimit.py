@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+from openrouteservice import exceptions as ors_exceptions
+
+from ors_ratelimit import EndpointLimiter, RateLimiter, RetryPolicy, TokenBucket, parse_quotas, parse_retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_remaining_follows_the_tighter_bucket_and_pauses():
+    clock = FakeClock()
+    limiter = EndpointLimiter("matrix", per_minute=40, per_day=50, clock=clock)
+    assert limiter.remaining() == 40
+    for bucket in limiter.buckets:
+        for _ in range(35):
+            bucket.reserve()
+    assert limiter.remaining() == 5
+
+    clock.now += 60
+    assert limiter.remaining() == 15  # the minute bucket is full again, the day bucket barely refilled
+
+    limiter.pause(10)
+    assert limiter.remaining() == 0
+
+
+def test_unlimited_endpoints_have_no_remaining_budget():
+    limiter = RateLimiter({"matrix": (40, 500)})
+    assert limiter.remaining("matrix") == 40
+    assert limiter.remaining("directions") is None
+    assert EndpointLimiter("pois", per_minute=0).remaining() is None
+
+
+def test_parse_quotas_and_retry_after():
+    assert parse_quotas(" directions=40/2000, geocode=100 ,") == {"directions": (40, 2000), "geocode": (100, 0)}
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", clock=lambda: 1445412480.0) == 30.0
+    assert parse_retry_after("soon") is None and parse_retry_after(None) is None
+
+
+def test_token_bucket_turns_a_deficit_into_a_wait():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    clock.now += 1.0
+    assert bucket.reserve() == 0.5
+
+
+def test_limiter_rejects_waits_beyond_max_wait_and_gives_the_token_back():
+    clock = FakeClock()
+    limiter = EndpointLimiter("isochrones", per_minute=1, max_wait=30, clock=clock)
+    assert asyncio.run(limiter.acquire()) == 0.0
+    with pytest.raises(ors_exceptions.ApiError) as excinfo:
+        asyncio.run(limiter.acquire())
+    assert excinfo.value.status == 429 and "wait limit" in str(excinfo.value)
+    # The rejected caller's reservation is released, so the balance is 0 and not -1
+    assert limiter.buckets[0].tokens == 0
+
+
+def test_limiter_spaces_out_concurrent_callers():
+    limiter = EndpointLimiter("pois", per_minute=600)  # one token every 0.1 s once the burst is used
+    for bucket in limiter.buckets:
+        bucket.tokens = 0
+
+    async def three():
+        return await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+
+    waits = asyncio.run(three())
+    assert waits == sorted(waits)
+    assert waits[0] == pytest.approx(0.1, abs=0.02) and waits[2] == pytest.approx(0.3, abs=0.02)
+
+
+def test_retry_policy_backs_off_only_for_retryable_answers():
+    policy = RetryPolicy(max_retries=2, base_delay=1.0, max_delay=10.0)
+    assert policy.delay(0, 400) is None
+    assert 0.0 <= policy.delay(1, 503) <= 2.0
+    assert policy.delay(0, 429, retry_after=5.0) >= 5.0
+    assert policy.delay(0, 429, retry_after=3600.0) is None
+    assert policy.delay(2, 503) is None
+    assert 0.0 <= policy.transport_delay(1) <= 2.0 and policy.transport_delay(2) is None
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from ors_singleflight import SingleFlight, canonical_key, gather_or_cancel
+
+
+def test_canonical_key_ignores_dict_order_and_tuple_list_spelling():
+    assert canonical_key({"a": 1, "b": [1, 2]}, (8.6, 49.4)) == canonical_key({"b": (1, 2), "a": 1}, [8.6, 49.4])
+    assert canonical_key({"a": 1}) != canonical_key({"a": 2})
+
+
+def test_concurrent_callers_share_one_request():
+    calls = []
+
+    async def scenario():
+        flights = SingleFlight()
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"routes": []}
+
+        results = await asyncio.gather(*(flights.run("key", fetch) for _ in range(5)))
+        assert all(result is results[0] for result in results)
+        assert flights.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+        await flights.run("key", fetch)  # finished flights are not reused
+        assert flights.leaders == 2
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_errors_reach_every_caller():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+
+        results = await asyncio.gather(*(flights.run("key", fail) for _ in range(3)), return_exceptions=True)
+        assert [type(result) for result in results] == [ValueError] * 3
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_caller_leaves_the_shared_request_running():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        cancelled = []
+
+        async def fetch():
+            try:
+                await release.wait()
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+            return "done"
+
+        first = asyncio.ensure_future(flights.run("key", fetch))
+        second = asyncio.ensure_future(flights.run("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert await second == "done" and first.cancelled() and not cancelled
+
+        # Once every caller has left, the request itself is cancelled and forgotten
+        release.clear()
+        lone = asyncio.ensure_future(flights.run("key", fetch))
+        await asyncio.sleep(0)
+        lone.cancel()
+        await asyncio.sleep(0.01)
+        assert cancelled == [1] and flights.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_gather_or_cancel_stops_siblings_on_the_first_failure():
+    async def scenario():
+        finished = []
+
+        async def slow():
+            await asyncio.sleep(1)
+            finished.append(1)
+
+        async def broken():
+            raise KeyError("tile")
+
+        with pytest.raises(KeyError):
+            await gather_or_cancel(slow(), broken(), slow())
+        await asyncio.sleep(0)
+        return finished
+
+    assert asyncio.run(scenario()) == []
+
+
+def test_identical_concurrent_geocodes_hit_ors_once(server, run, monkeypatch):
+    calls = []
+    pelias_search = server.ors_client.pelias_search
+
+    async def counting_search(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.01)
+        return await pelias_search(**kwargs)
+
+    async def two_lookups():
+        return await asyncio.gather(
+            server.geocode_address.fn(text="Heidelberg", use_cache=False),
+            server.geocode_address.fn(text="heidelberg ", use_cache=False),
+        )
+
+    monkeypatch.setattr(server.ors_client, "pelias_search", counting_search)
+    first, second = run(two_lookups())
+    assert len(calls) == 1 and first == second
@@ -0,0 +1,256 @@
+import asyncio
+import math
+import threading
+import time
+
+import numpy as np
+import pytest
+from openrouteservice import exceptions as ors_exceptions
+
+from ors_solver import (
+    path_cost, two_opt, or_opt, solve_tsp, route_feasible, cheapest_insertion, sweep_partition, kmeans_partition,
+    assign_clusters, merge_solutions
+)
+
+
+def euclidean(points):
+    points = np.asarray(points, dtype=float)
+    return np.linalg.norm(points[:, None, :] - points[None, :, :], axis=2)
+
+
+def circle(n):
+    return [(math.cos(2 * math.pi * k / n), math.sin(2 * math.pi * k / n)) for k in range(n)]
+
+
+def far_deadline():
+    return time.perf_counter() + 10
+
+
+def test_two_opt_uncrosses_a_path_on_a_line():
+    cost = euclidean([(x, 0) for x in range(6)])
+    path = two_opt(cost, [0, 3, 2, 1, 4, 5], far_deadline())
+    assert path == [0, 1, 2, 3, 4, 5]
+
+
+def test_two_opt_keeps_endpoints_and_never_worsens_asymmetric_paths():
+    rng = np.random.default_rng(7)
+    cost = rng.uniform(1, 100, size=(12, 12))
+    path = [0] + rng.permutation(np.arange(1, 11)).tolist() + [11]
+    improved = two_opt(cost, path, far_deadline())
+    assert improved[0] == 0 and improved[-1] == 11
+    assert sorted(improved) == list(range(12))
+    assert path_cost(cost, improved) <= path_cost(cost, path)
+
+
+def test_or_opt_moves_a_misplaced_node():
+    cost = euclidean([(x, 0) for x in range(6)])
+    assert or_opt(cost, [0, 1, 4, 2, 3, 5], far_deadline()) == [0, 1, 2, 3, 4, 5]
+
+
+def test_solve_tsp_finds_the_circle_tour():
+    points = circle(10)
+    cost = euclidean(points)
+    edge = cost[0, 1]
+    rng = np.random.default_rng(3)
+    visit = rng.permutation(np.arange(1, 10)).tolist()
+
+    order, total = solve_tsp(cost, visit, start=0, end=0, time_budget=1)
+    assert sorted(order) == list(range(1, 10))
+    assert total == pytest.approx(10 * edge)
+
+    order, total = solve_tsp(cost, list(range(10)), time_budget=1)
+    assert sorted(order) == list(range(10))
+    assert total == pytest.approx(9 * edge)
+
+
+
+def test_local_tsp_runs_off_the_event_loop(server, run, monkeypatch):
+    threads = []
+
+    def recording_solve_tsp(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return solve_tsp(*args, **kwargs)
+
+    monkeypatch.setattr(server, "solve_tsp", recording_solve_tsp)
+    result = run(server.optimize_traveling_salesman.fn(
+        locations=[(8.68, 49.41), (8.69, 49.42), (8.70, 49.40), (8.67, 49.39)],
+        start_location=(8.68, 49.40), solver="local", matrix_source="haversine"
+    ))
+    assert result["code"] == 0
+    assert len(result["routes"][0]["steps"]) == 6
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def line_jobs(n, **extra):
+    return [{"id": i + 1, "location": [i, 0], **extra} for i in range(n)]
+
+
+def test_route_feasible_checks_capacity_skills_and_time_windows():
+    cost = euclidean([(x, 0) for x in range(4)]) * 100
+    jobs = line_jobs(3, delivery=[1])
+    vehicle = {"id": 1, "capacity": [2]}
+    assert route_feasible(vehicle, jobs, [0, 1], cost, None, None)
+    assert not route_feasible(vehicle, jobs, [0, 1, 2], cost, None, None)
+
+    jobs[2]["skills"] = [7]
+    assert not route_feasible({"id": 1}, jobs, [2], cost, None, None)
+    assert route_feasible({"id": 1, "skills": [7]}, jobs, [2], cost, None, None)
+
+    # Node 1 must be reached by t=150; it is 200 s from node 3 and 100 s from node 2
+    timed = line_jobs(3)
+    timed[1]["time_windows"] = [[0, 150]]
+    assert not route_feasible({"id": 1}, timed, [1, 0], cost, 3, None)
+    assert not route_feasible({"id": 1}, timed, [0, 1], cost, 2, None)
+    assert route_feasible({"id": 1}, timed, [1, 0], cost, 2, None)
+    assert not route_feasible({"id": 1, "time_window": [0, 250]}, timed, [1, 0], cost, 2, 2)
+
+
+def test_cheapest_insertion_skips_infeasible_vehicles():
+    cost = euclidean([(x, 0) for x in range(5)])
+    jobs = line_jobs(4, delivery=[1])
+    vehicles = [{"id": 1, "capacity": [2]}, {"id": 2, "capacity": [5]}]
+    orders = [[0, 1], [3]]
+    v, position, added = cheapest_insertion(vehicles, jobs, orders, 2, [cost, cost], [4, 4], [4, 4])
+    assert (v, position) == (1, 0)
+    assert added == pytest.approx(2.0)
+    assert cheapest_insertion(vehicles[:1], jobs, orders[:1], 2, [cost], [4], [4]) is None
+
+
+def test_reoptimize_repairs_routes_off_the_event_loop(server, run, monkeypatch):
+    jobs = [{"id": i, "location": [8.68 + 0.01 * i, 49.41]} for i in range(1, 6)]
+    vehicles = [{"id": 1, "profile": "driving-car", "start": [8.68, 49.40], "end": [8.68, 49.40]}]
+    solved = run(server.optimize_vehicle_routes.fn(jobs=jobs, vehicles=vehicles))
+
+    threads = []
+    repair_routes = server._repair_routes
+
+    def recording_repair_routes(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return repair_routes(*args, **kwargs)
+
+    monkeypatch.setattr(server, "_repair_routes", recording_repair_routes)
+    result = run(server.reoptimize_routes.fn(
+        solution_id=solved["solution_id"], added_jobs=[{"id": 9, "location": [8.7, 49.42]}], removed_job_ids=[2]
+    ))
+    assert result["reoptimization"]["method"] == "incremental"
+    visited = [step["id"] for step in result["routes"][0]["steps"] if step["type"] == "job"]
+    assert sorted(visited) == [1, 3, 4, 5, 9]
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_sweep_partition_cuts_sectors_proportional_to_shares():
+    # Twelve points on a ring around Heidelberg, one every 30 degrees
+    center = np.array([8.68, 49.41])
+    points = center + 0.01 * np.array(circle(12))
+    groups = sweep_partition(points, [1, 2, 1], center=center)
+    assert [len(group) for group in groups] == [3, 6, 3]
+    assert sorted(sum(groups, [])) == list(range(12))
+    for group in groups:
+        # Each sector is a contiguous run of the ring
+        steps = {(b - a) % 12 for a, b in zip(group, group[1:])}
+        assert steps == {1} or steps == {11}
+
+    # Weighting the sweep balances the total weight rather than the point count
+    weights = np.array([4, 4, 4] + [1] * 9)
+
+    def imbalance(groups):
+        return abs(weights[groups[0]].sum() - weights[groups[1]].sum())
+
+    weighted = sweep_partition(points, [1, 1], center=center, weights=weights)
+    assert imbalance(weighted) <= 3 < imbalance(sweep_partition(points, [1, 1], center=center))
+
+
+def test_kmeans_partition_separates_distant_clusters():
+    rng = np.random.default_rng(0)
+    west = np.array([8.60, 49.40]) + rng.normal(0, 0.002, size=(8, 2))
+    east = np.array([8.90, 49.40]) + rng.normal(0, 0.002, size=(5, 2))
+    groups, centers = kmeans_partition(np.vstack((west, east)), 2)
+    assert sorted(map(sorted, groups)) == [list(range(8)), list(range(8, 13))]
+    west_group = 0 if 0 in groups[0] else 1
+    assert centers[west_group] == pytest.approx(west.mean(axis=0))
+    assert kmeans_partition(np.zeros((0, 2)), 3)[0] == [[], [], []]
+
+
+def test_assign_clusters_matches_each_cluster_to_a_distinct_depot():
+    clusters = np.array([[8.90, 49.40], [8.60, 49.40], [8.75, 49.50]])
+    depots = np.array([[8.61, 49.41], [8.74, 49.49], [8.89, 49.41]])
+    assert assign_clusters(clusters, depots) == [2, 0, 1]
+    assert assign_clusters(clusters[:2], depots[:1]) == [-1, 0]
+
+
+def test_merge_solutions_sums_summaries_and_keeps_the_slowest_phase():
+    first = {"routes": [{"vehicle": 1}], "unassigned": [], "summary": {
+        "cost": 10, "delivery": [1, 2], "computing_times": {"loading": 5, "solving": 40}}}
+    second = {"routes": [{"vehicle": 2}], "unassigned": [{"id": 4}], "summary": {
+        "cost": 7, "delivery": [3, 0], "computing_times": {"loading": 9, "solving": 10}}}
+    merged = merge_solutions([first, second], extra_unassigned=[{"id": 5}])
+    assert [route["vehicle"] for route in merged["routes"]] == [1, 2]
+    summary = merged["summary"]
+    assert (summary["cost"], summary["delivery"], summary["routes"], summary["unassigned"]) == (17, [4, 2], 2, 2)
+    assert summary["computing_times"] == {"loading": 9, "solving": 40}
+
+
+def test_decomposed_optimization_visits_every_job_once(server, run, monkeypatch):
+    payloads = []
+    optimization = server.ors_client.optimization
+
+    async def recording_optimization(payload):
+        payloads.append(payload)
+        return await optimization(payload)
+
+    monkeypatch.setattr(server.ors_client, "optimization", recording_optimization)
+    jobs = [{"id": i + 1, "location": list(point)} for i, point in enumerate(np.array([8.68, 49.41]) + 0.02 * np.array(circle(9)))]
+    vehicles = [{"id": v, "profile": "driving-car", "start": [8.68, 49.41], "end": [8.68, 49.41]} for v in (1, 2, 3)]
+    result = run(server.optimize_vehicle_routes.fn(jobs=jobs, vehicles=vehicles, decompose="sweep"))
+
+    assert len(payloads) == 3 and all(len(payload["vehicles"]) == 1 for payload in payloads)
+    visited = [step["id"] for route in result["routes"] for step in route["steps"] if step["type"] == "job"]
+    assert sorted(visited) == list(range(1, 10))
+    assert result["summary"]["routes"] == len(result["routes"])
+
+
+def ring_problem(n_vehicles, service):
+    # A distinct service time per test keeps the solution cache from answering
+    jobs = [{"id": i + 1, "location": list(point), "service": service} for i, point in enumerate(np.array([8.68, 49.41]) + 0.02 * np.array(circle(9)))]
+    vehicles = [{"id": v, "profile": "driving-car", "start": [8.68, 49.41], "end": [8.68, 49.41]} for v in range(1, n_vehicles + 1)]
+    return jobs, vehicles
+
+
+def test_decomposed_subproblem_network_failures_only_unassign_their_jobs(server, run, monkeypatch):
+    optimization = server.ors_client.optimization
+
+    async def flaky_optimization(payload):
+        vehicle_id = payload["vehicles"][0]["id"]
+        if vehicle_id == 2:
+            raise ors_exceptions.Timeout()
+        if vehicle_id == 3:
+            raise ors_exceptions.HTTPError(0)
+        return await optimization(payload)
+
+    monkeypatch.setattr(server.ors_client, "optimization", flaky_optimization)
+    jobs, vehicles = ring_problem(3, service=61)
+    result = run(server.optimize_vehicle_routes.fn(jobs=jobs, vehicles=vehicles, decompose="sweep"))
+
+    assert sorted(result["decomposition"]["failed_vehicles"]) == [2, 3]
+    visited = [step["id"] for route in result["routes"] for step in route["steps"] if step["type"] == "job"]
+    unassigned = [entry["id"] for entry in result["unassigned"]]
+    assert sorted(visited + unassigned) == list(range(1, 10)) and len(visited) == 3
+
+
+def test_unexpected_subproblem_error_cancels_the_other_solves(server, run, monkeypatch):
+    cancelled = []
+
+    async def broken_optimization(payload):
+        if payload["vehicles"][0]["id"] == 1:
+            raise RuntimeError("bug")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(payload["vehicles"][0]["id"])
+            raise
+
+    monkeypatch.setattr(server.ors_client, "optimization", broken_optimization)
+    jobs, vehicles = ring_problem(3, service=62)
+    with pytest.raises(RuntimeError, match="bug"):
+        run(asyncio.wait_for(server.optimize_vehicle_routes.fn(jobs=jobs, vehicles=vehicles, decompose="sweep"), 5))
+    assert sorted(cancelled) == [2, 3]